@@ -1,98 +1,525 @@
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
-from memory_profiler import memory_usage
-import time
-from .wrappers import Hypersphere, predict as ccp_predict, fuzzy_contribution as cpp_fuzzy_contribution
+from .instrumentation import Instrumentation, DISABLED
+from .landmarks import summarize, g_error, kmeans_plus_plus
+from .streaming import iter_chunks
+from .persistence import save_model, load_model
+from .transforms import Function, Transform, get_transform, transform_rows
+from .wrappers import _storage_dtype, Hypersphere, element_matrix, element_index, objective as cpp_objective, predict as ccp_predict, fuzzy_contribution_batch as cpp_fuzzy_contribution_batch, precompute_g as cpp_precompute_g
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+OPTIMIZERS = ("analytic", "approximate")
+OPTIMIZE_SCHEDULES = ("epoch", "batch", "threshold")
+INITS = ("random", "k-means++")
+
+
+def _check_schedule(schedule, batch_size, threshold):
+    if schedule not in OPTIMIZE_SCHEDULES:
+        raise ValueError(f"optimize_schedule must be one of {OPTIMIZE_SCHEDULES}, got {schedule!r}")
+    if batch_size < 1:
+        raise ValueError(f"optimize_batch_size must be at least 1, got {batch_size}")
+    if threshold < 0:
+        raise ValueError(f"optimize_threshold must not be negative, got {threshold}")
+
 
 class HyperionFuzzy:
-    def __init__(self, num_clusters=2, gamma=1.0, sigma=0.005, E=1e-7, max_iterations=5):
+    def __init__(self, num_clusters=2, gamma=1.0, sigma=0.005, E=1e-7, max_iterations=5,
+                 learning_rate=0.01, optimizer="analytic",
+                 optimize_schedule="epoch", optimize_batch_size=1024, optimize_threshold=0.05,
+                 num_landmarks=None, landmark_error_samples=256, g_tolerance=0.0, instrument=False,
+                 dtype=np.float64, init="random", n_init=1, random_state=None, restart_jobs=None,
+                 feature_transform="exp", transform_chunk_rows=None, cache_transformed=True):
+        """
+        `optimize_schedule` controls when hyperspheres are re-optimized during a fuzzy pass:
+        "epoch" once per pass, "batch" after every `optimize_batch_size` samples, and
+        "threshold" once per pass but only for spheres whose assignment count moved by more
+        than `optimize_threshold` (relative) since they were last optimized.
+
+        With `num_landmarks` set, each class is summarized into that many weighted k-means
+        landmarks and G is evaluated over them instead of every training row. The drift
+        from exact G, measured on `landmark_error_samples` rows per class, is stored in
+        `landmark_error`.
+
+        With `g_tolerance` > 0, G is evaluated through a KD-tree over each class and skips the
+        subtrees whose terms all fall below `g_tolerance`, so the truncated G is below the exact
+        value by at most `g_tolerance` times the total element weight. 0 keeps G exact.
+
+        With `instrument` True, `train` and `partial_fit` store per-phase timings, counters (G
+        evaluations, evaluated and pruned sphere kernels, fuzzy passes, optimizer calls and iterations) and the peak RSS in `stats`.
+        A callable `instrument` also receives each stats dict. When off, fits collect nothing.
+
+        `dtype=np.float32` keeps the transformed data and the initial elements in single precision
+        and sums G over them in float, halving their memory and bandwidth. Centers, radii, ux and
+        the optimizer stay in double. See "Single precision" in the README for the accuracy cost.
+
+        `init` places the first centers of each class on random rows ("random") or on k-means++
+        seeds ("k-means++"), which spread the spheres over the class. `random_state` seeds the
+        initialization; without it "random" draws from NumPy's global state as before. With
+        `n_init` > 1, `train` fits that many independently seeded restarts on `restart_jobs`
+        threads (-1 for all cores) and keeps the one with the lowest `objective`. Each restart
+        holds its own copy of the model while it trains.
+
+        `feature_transform` maps the rows before training and prediction: "exp" (the default),
+        "identity", a `transforms.Transform` or a function of one array. It runs on whole arrays,
+        `transform_chunk_rows` rows at a time when set to bound temporaries. With `cache_transformed`,
+        the transformed training matrix is kept, so training again on the same data object (e.g.
+        with another `gamma` or `sigma`) skips the transform; call `clear_transform_cache` after
+        modifying that object in place. `save` stores only the built-in transforms.
+        """
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"optimizer must be one of {OPTIMIZERS}, got {optimizer!r}")
+        _check_schedule(optimize_schedule, optimize_batch_size, optimize_threshold)
+        if init not in INITS:
+            raise ValueError(f"init must be one of {INITS}, got {init!r}")
+        if n_init < 1:
+            raise ValueError(f"n_init must be at least 1, got {n_init}")
+        get_transform(feature_transform)
         self.num_clusters = num_clusters
         self.gamma = gamma
         self.sigma = sigma
         self.E = E
         self.max_iterations = max_iterations
+        self.learning_rate = learning_rate
+        self.optimizer = optimizer
+        self.optimize_schedule = optimize_schedule
+        self.optimize_batch_size = optimize_batch_size
+        self.optimize_threshold = optimize_threshold
+        self.num_landmarks = num_landmarks
+        self.landmark_error_samples = landmark_error_samples
+        self.landmark_error = None
+        self.g_tolerance = g_tolerance
+        self.dtype = _storage_dtype(dtype)
+        self.instrument = instrument
+        self.init = init
+        self.n_init = n_init
+        self.random_state = random_state
+        self.restart_jobs = restart_jobs
+        self.restart_objectives = None
+        self.feature_transform = feature_transform
+        self.transform_chunk_rows = transform_chunk_rows
+        self.cache_transformed = cache_transformed
+        self._transformed_cache = None
+        self._element_buffers = {}
+        self.stats = None
+        self._instrumentation = DISABLED
         self.positive_hyperspheres = []
         self.negative_hyperspheres = []
+        self.optimization_log = []
+        self._optimized_counts = {}
 
-    def initialize_hyperspheres(self, data: pd.DataFrame, labels: pd.Series):
+    def initialize_hyperspheres(self, data: "np.ndarray | pd.DataFrame", labels: "np.ndarray | pd.Series"):
         """Initialize hyperspheres from labeled data."""
+        data = np.asarray(data, dtype=self.dtype)
+        labels = np.asarray(labels)
         class_p = data[labels == 1]
         class_n = data[labels == -1]
+        self.landmark_error = None
         
         if len(class_p) < self.num_clusters or len(class_n) < self.num_clusters:
             raise ValueError("Not enough data points to initialize clusters.")
         
         positive_hyperspheres = []
         negative_hyperspheres = []
+        rng = self._generator()
+
+        # Spheres of the same class share one native copy of the class matrix
+        elements_p = self._class_elements(class_p, "positive", rng)
+        elements_n = self._class_elements(class_n, "negative", rng)
 
-        for _ in range(self.num_clusters):
-            #  Fix: Convert Series to NumPy array
-            random_point_p = class_p.iloc[np.random.choice(class_p.shape[0])].to_numpy()
-            random_point_n = class_n.iloc[np.random.choice(class_n.shape[0])].to_numpy()
+        for random_point_p, random_point_n in zip(*self._initial_centers(class_p, class_n, rng)):
             radius = np.linalg.norm(random_point_p - random_point_n) / 2
             
-            positive_hyperspheres.append(Hypersphere(random_point_p, radius, class_p.to_numpy()))
-            negative_hyperspheres.append(Hypersphere(random_point_n, radius, class_n.to_numpy()))
+            positive_hyperspheres.append(Hypersphere(random_point_p, radius, elements_p))
+            negative_hyperspheres.append(Hypersphere(random_point_n, radius, elements_n))
+
+        self._attach_index(elements_p, positive_hyperspheres)
+        self._attach_index(elements_n, negative_hyperspheres)
 
         return positive_hyperspheres, negative_hyperspheres
 
+    def _generator(self):
+        """
+        Random generator of one initialization, seeded by `random_state`. Without one, "random" returns
+        None and keeps drawing from NumPy's global state, and "k-means++" seeds a generator from it.
+        """
+        if self.random_state is not None:
+            return np.random.default_rng(self.random_state)
+        if self.init == "random":
+            return None
+        return np.random.default_rng(np.random.randint(2**32 - 1))
+
+    def _initial_centers(self, class_p: np.ndarray, class_n: np.ndarray, rng):
+        """`num_clusters` initial centers for each class, following `init`."""
+        k = self.num_clusters
+        if self.init == "k-means++":
+            return kmeans_plus_plus(class_p, k, rng), kmeans_plus_plus(class_n, k, rng)
+        if rng is None:
+            # Global-state draws alternate between the classes, as they always have
+            picks = [(np.random.choice(class_p.shape[0]), np.random.choice(class_n.shape[0])) for _ in range(k)]
+            return class_p[[p for p, _ in picks]], class_n[[n for _, n in picks]]
+        return class_p[rng.choice(class_p.shape[0], k)], class_n[rng.choice(class_n.shape[0], k)]
+
+    def _attach_index(self, elements, hyperspheres):
+        """Share one KD-tree over a class's elements between its spheres when `g_tolerance` is set."""
+        if self.g_tolerance > 0:
+            index = element_index(elements, ux=hyperspheres[0].get_ux())
+            for hs in hyperspheres:
+                hs.set_element_index(index, self.g_tolerance)
+
+    def _class_elements(self, class_data: np.ndarray, name: str, rng=None):
+        """Initial elements of one class: every row, or weighted landmarks when `num_landmarks` is set."""
+        exact = element_matrix(class_data, dtype=self.dtype)
+        if self.num_landmarks is None:
+            return exact
+
+        landmarks, counts = summarize(class_data, self.num_landmarks, seed=rng)
+        summary = element_matrix(landmarks, counts, self.dtype)
+
+        sample_size = min(self.landmark_error_samples, class_data.shape[0])
+        random = np.random if rng is None else rng
+        sample = class_data[random.choice(class_data.shape[0], sample_size, replace=False)]
+        if self.landmark_error is None:
+            self.landmark_error = {}
+        self.landmark_error[name] = g_error(sample, exact, summary, self.E)
+        return summary
+
     def polynomial_mapping(self, x):
-        """Apply a polynomial transformation to the input."""
-        return np.exp(x)
+        """Apply the feature transform to the input."""
+        return get_transform(self.feature_transform)(x)
+
+    def _feature_transform(self) -> Transform:
+        # Subclasses that override polynomial_mapping keep it as their transform
+        if type(self).polynomial_mapping is not HyperionFuzzy.polynomial_mapping:
+            return Function(self.polynomial_mapping)
+        return get_transform(self.feature_transform)
+
+    def transform(self, data: "np.ndarray | pd.DataFrame", out: np.ndarray = None) -> np.ndarray:
+        """
+        Apply the feature transform to a 2D array or DataFrame and return a C-contiguous array of `dtype`.
+        `out` receives the result; passing `data` itself transforms a `dtype` array in place.
+        """
+        return transform_rows(self._feature_transform(), data, self.dtype, self.transform_chunk_rows, out)
+
+    def _transformed_training_data(self, data) -> np.ndarray:
+        """The transformed training matrix, reused while training runs on the same data object."""
+        key = (self._feature_transform(), self.dtype)
+        cache = self._transformed_cache
+        if cache is not None and cache[0] is data and cache[1] == key:
+            return cache[2]
+        transformed = self.transform(data)
+        self._transformed_cache = (data, key, transformed) if self.cache_transformed else None
+        return transformed
+
+    def _prime_transform_cache(self, data, transformed: np.ndarray):
+        """Use `transformed` as the transform of `data`, so training on `data` skips the transform."""
+        self._transformed_cache = (data, (self._feature_transform(), self.dtype), transformed)
+
+    def clear_transform_cache(self):
+        """Drop the cached transformed training matrix."""
+        self._transformed_cache = None
+
+    def train(self, data: "np.ndarray | pd.DataFrame", labels: "np.ndarray | pd.Series"):
+        """Train the model using labeled data, given as NumPy arrays or as a DataFrame and Series."""
+        if self.n_init > 1:
+            return self._train_restarts(data, labels)
+        instrumentation = self._start_instrumentation()
 
-    def train(self, data: pd.DataFrame, labels: pd.Series):
-        """Train the model using labeled data."""
-        start_time = time.time()
-        mem_usage_before = memory_usage()[0]
+        with instrumentation.phase("transform"):
+            transformed_data = self._transformed_training_data(data)
+            labels = np.asarray(labels)
 
-        # Fix: Use applymap() instead of map()
-        transformed_data = data.applymap(self.polynomial_mapping)
+        with instrumentation.phase("init"):
+            self.positive_hyperspheres, self.negative_hyperspheres = self.initialize_hyperspheres(transformed_data, labels)
 
-        self.positive_hyperspheres, self.negative_hyperspheres = self.initialize_hyperspheres(transformed_data, labels)
+            # Assignments index into this matrix, so it is wrapped once for the whole fit
+            training_matrix = element_matrix(transformed_data, dtype=self.dtype)
 
+            self.optimization_log = []
+            self._optimized_counts = {}
+
+            # G(x) of the training rows does not change across iterations
+            cpp_precompute_g(training_matrix, self.positive_hyperspheres + self.negative_hyperspheres, self.E)
+
+        assignments = self._fuzzy_passes(training_matrix)
+        self._finish_instrumentation(instrumentation)
+        return assignments
+
+    def _fuzzy_passes(self, data):
+        """Run up to `max_iterations` fuzzy passes over `data`, returning the assignments of the last one."""
+        assignments = None
         for i in range(self.max_iterations):
-            assignments = self.fuzzy(transformed_data)
+            assignments = self.fuzzy(data)
 
             # Stop training if no assignments are being made
-            if all(len(hs.assignments) == 0 for hs in self.positive_hyperspheres) or \
-               all(len(hs.assignments) == 0 for hs in self.negative_hyperspheres):
+            if all(hs.num_assignments == 0 for hs in self.positive_hyperspheres) or \
+               all(hs.num_assignments == 0 for hs in self.negative_hyperspheres):
                 break
+        return assignments
+
+    def _train_restarts(self, data, labels):
+        """
+        Train `n_init` copies from independently seeded initializations and keep the hyperspheres of the
+        one with the lowest objective. The native steps release the GIL, so restarts run concurrently.
+        """
+        instrumentation = self._start_instrumentation()
+
+        if isinstance(self.random_state, np.random.SeedSequence):
+            sequence = self.random_state
+        else:
+            seed = self.random_state if self.random_state is not None else np.random.randint(2**32 - 1)
+            sequence = np.random.SeedSequence(seed)
+        params = {name: getattr(self, name) for name in inspect.signature(type(self).__init__).parameters
+                  if name != "self"}
+        params.update(n_init=1, instrument=False)
+        restarts = [type(self)(**dict(params, random_state=child)) for child in sequence.spawn(self.n_init)]
+
+        # The restarts share one transformed copy of the training matrix
+        with instrumentation.phase("transform"):
+            transformed = self._transformed_training_data(data)
+        for model in restarts:
+            model._prime_transform_cache(data, transformed)
 
-        end_time = time.time()
-        mem_usage_after = memory_usage()[0]
+        jobs = self.restart_jobs or 1
+        if jobs < 0:
+            jobs = os.cpu_count() or 1
+        with instrumentation.phase("restarts"):
+            with ThreadPoolExecutor(min(jobs, self.n_init)) as pool:
+                results = list(pool.map(lambda model: model.train(data, labels), restarts))
 
-        print(f"Training Time: {end_time - start_time:.4f} seconds")
-        print(f"Memory Usage: {mem_usage_after - mem_usage_before:.4f} MiB")
+        self.restart_objectives = [model.objective() for model in restarts]
+        best = int(np.argmin(self.restart_objectives))
+        chosen = restarts[best]
+        self.positive_hyperspheres = chosen.positive_hyperspheres
+        self.negative_hyperspheres = chosen.negative_hyperspheres
+        self.optimization_log = chosen.optimization_log
+        self._optimized_counts = chosen._optimized_counts
+        self.landmark_error = chosen.landmark_error
+        instrumentation.count("restarts", self.n_init)
 
+        self._finish_instrumentation(instrumentation)
+        return results[best]
+
+    def objective(self) -> float:
+        """Objective the optimizer minimizes, summed over every hypersphere at its current center and radius."""
+        return (cpp_objective(self.positive_hyperspheres, self.negative_hyperspheres, self.gamma)
+                + cpp_objective(self.negative_hyperspheres, self.positive_hyperspheres, self.gamma))
+
+    def partial_fit(self, chunk, labels):
+        """
+        Train on one chunk of labeled rows, so datasets larger than memory can be fed piece by piece.
+
+        The first chunk initializes the hyperspheres and must hold `num_clusters` rows of each class.
+        Later chunks are merged into each class's initial elements, and ux follows their running
+        mean: with `num_landmarks` set the elements stay a summary of at most that many weighted
+        landmarks, so memory is bounded by the chunk size; otherwise every row is kept. Each call
+        runs one fuzzy pass over the chunk, whose assignments drive the optimization.
+        """
+        instrumentation = self._start_instrumentation()
+
+        with instrumentation.phase("transform"):
+            transformed = self.transform(chunk)
+            labels = np.asarray(labels)
+
+        with instrumentation.phase("init"):
+            if not self.positive_hyperspheres or not self.negative_hyperspheres:
+                self.positive_hyperspheres, self.negative_hyperspheres = self.initialize_hyperspheres(transformed, labels)
+            else:
+                self._merge_elements(transformed[labels == 1], self.positive_hyperspheres, "positive")
+                self._merge_elements(transformed[labels == -1], self.negative_hyperspheres, "negative")
+
+            chunk_matrix = element_matrix(transformed, dtype=self.dtype)
+            cpp_precompute_g(chunk_matrix, self.positive_hyperspheres + self.negative_hyperspheres, self.E)
+
+        assignments = self.fuzzy(chunk_matrix)
+        self._finish_instrumentation(instrumentation)
         return assignments
 
-    def predict(self, new_data: pd.DataFrame):
-        """Predict class labels for new data."""
-        transformed_data = new_data.applymap(self.polynomial_mapping)
+    def update(self, new_data: "np.ndarray | pd.DataFrame", labels: "np.ndarray | pd.Series"):
+        """
+        Refresh a trained model with new labeled rows instead of training again from scratch.
+
+        The rows are appended to the initial elements of their class and ux moves to the running
+        mean, without a pass over the existing elements. Only the classes that received rows drop
+        their G caches and element index. Training then resumes from the current centers and radii
+        with up to `max_iterations` fuzzy passes over the new rows.
+        """
+        if not self.positive_hyperspheres or not self.negative_hyperspheres:
+            raise ValueError("update needs a trained model, call train first")
+        instrumentation = self._start_instrumentation()
+
+        with instrumentation.phase("transform"):
+            transformed = self.transform(new_data)
+            labels = np.asarray(labels)
+
+        with instrumentation.phase("init"):
+            self._merge_elements(transformed[labels == 1], self.positive_hyperspheres, "positive")
+            self._merge_elements(transformed[labels == -1], self.negative_hyperspheres, "negative")
+
+            update_matrix = element_matrix(transformed, dtype=self.dtype)
+            cpp_precompute_g(update_matrix, self.positive_hyperspheres + self.negative_hyperspheres, self.E)
+
+        assignments = self._fuzzy_passes(update_matrix)
+        self._finish_instrumentation(instrumentation)
+        return assignments
+
+    def _start_instrumentation(self):
+        """Instrumentation for one fit, the shared no-op instance unless `instrument` is set."""
+        if not self.instrument:
+            self._instrumentation = DISABLED
+            return DISABLED
+        self._instrumentation = Instrumentation(self.instrument if callable(self.instrument) else None)
+        self._instrumentation.start()
+        return self._instrumentation
+
+    def _finish_instrumentation(self, instrumentation):
+        if instrumentation.enabled:
+            self.stats = instrumentation.finish()
+        self._instrumentation = DISABLED
+
+    def _merge_elements(self, class_rows: np.ndarray, hyperspheres, name: str):
+        """
+        Fold new rows of a class into the initial elements its spheres share. ux moves to the running
+        weighted mean of the old elements and the new rows, so the old elements are not read again.
+        """
+        if not class_rows.shape[0]:
+            return
+        current = hyperspheres[0].instance.get_initial_elements()
+        ux = hyperspheres[0].get_ux()
+        total_weight = current.rows if current.weights is None else current.weights.sum()
+        new_sum = class_rows.sum(axis=0, dtype=np.float64)
+        ux = ux + (new_sum - class_rows.shape[0] * ux) / (total_weight + class_rows.shape[0])
+
+        if self.num_landmarks is None:
+            elements = self._append_elements(current, class_rows, name)
+        else:
+            current_weights = current.weights if current.weights is not None else np.ones(current.rows)
+            rows = np.concatenate([np.asarray(current), class_rows])
+            weights = np.concatenate([current_weights, np.ones(class_rows.shape[0])])
+            elements = element_matrix(*summarize(rows, self.num_landmarks, weights=weights), self.dtype)
+        for hs in hyperspheres:
+            hs.set_initial_elements(elements, ux)
+        self._attach_index(elements, hyperspheres)
 
-        predictions = ccp_predict(transformed_data, self.positive_hyperspheres, self.negative_hyperspheres, self.sigma)
-        return np.array(predictions)
+    def _append_elements(self, current, class_rows: np.ndarray, name: str):
+        """
+        Initial elements holding `current` followed by `class_rows`. Rows go into a per-class buffer
+        with spare capacity, so the existing elements are only copied when the buffer grows.
+        """
+        rows = np.asarray(current)
+        count, needed = rows.shape[0], rows.shape[0] + class_rows.shape[0]
+        buffer = self._element_buffers.get(name)
+        # The buffer is only reused while the current elements are its first rows
+        if buffer is None or buffer.dtype != rows.dtype or \
+                buffer.__array_interface__["data"][0] != rows.__array_interface__["data"][0]:
+            buffer = None
+        if buffer is None or buffer.shape[0] < needed:
+            grown = np.empty((max(2 * needed, 16), rows.shape[1]), dtype=rows.dtype)
+            grown[:count] = rows
+            buffer = grown
+        buffer[count:needed] = class_rows
+        self._element_buffers[name] = buffer
+
+        weights = None
+        if current.weights is not None:
+            weights = np.concatenate([current.weights, np.ones(class_rows.shape[0])])
+        return element_matrix(buffer[:needed], weights, rows.dtype)
+
+    def fit_stream(self, source, labels=None, chunk_size=10000, label_column="label"):
+        """
+        Train from a memory-mapped `.npy` file, a CSV file or an array, `chunk_size` rows at a time.
+        See `streaming.iter_chunks` for the accepted sources and `partial_fit` for the update.
+        """
+        self.positive_hyperspheres = []
+        self.negative_hyperspheres = []
+        self.optimization_log = []
+        self._optimized_counts = {}
+        for chunk, chunk_labels in iter_chunks(source, labels, chunk_size, label_column):
+            self.partial_fit(chunk, chunk_labels)
+        return self
+
+    def predict(self, new_data: "np.ndarray | pd.DataFrame", n_jobs=None):
+        """Predict class labels for new data, scoring rows on `n_jobs` native threads (-1 for all cores)."""
+        transformed_data = self.transform(new_data)
+
+        return ccp_predict(transformed_data, self.positive_hyperspheres, self.negative_hyperspheres,
+                           self.sigma, n_jobs)
     
-    def fuzzy(self, data: pd.DataFrame):
-        """Perform the fuzzy contribution step and optimize hyperspheres."""
-        assignments = []
+    def save(self, path):
+        """Save the hyperparameters and trained hyperspheres to a versioned binary file."""
+        save_model(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Load a model written by `save`. With `mmap`, initial elements are memory-mapped instead of read."""
+        return load_model(cls, path, mmap)
+
+    def fuzzy(self, data):
+        """
+        Perform the fuzzy contribution step and optimize hyperspheres following `optimize_schedule`.
+        A summary of the optimization work done in the pass is appended to `optimization_log`.
+        """
+        # The schedule may have been changed since __init__
+        _check_schedule(self.optimize_schedule, self.optimize_batch_size, self.optimize_threshold)
 
         #  Reset assignments
         for hs in self.positive_hyperspheres + self.negative_hyperspheres:
-            hs.assignments = []
-
-        for x in data.to_numpy():
-            #  Fix: Capture return values
-            assigned_class, contribution = cpp_fuzzy_contribution(
-                x, self.positive_hyperspheres, self.negative_hyperspheres, 
-                self.gamma, self.sigma, self.E
-            )
-
-            #  Fix: Add missing arguments for optimization
-            for pos_hs, neg_hs in zip(self.positive_hyperspheres, self.negative_hyperspheres):
-                if pos_hs.assignments:
-                    pos_hs.optimize(self.negative_hyperspheres, self.gamma, 0.01, self.max_iterations, 1e-6)
-                if neg_hs.assignments:
-                    neg_hs.optimize(self.positive_hyperspheres, self.gamma, 0.01, self.max_iterations, 1e-6)
-
-        return assignments
\ No newline at end of file
+            hs.clear_assignments()
+
+        # Wrapped once, so every block assigns against the same source and reuses its G cache
+        if not hasattr(data, "rows"):
+            data = element_matrix(data, dtype=self.dtype)
+        num_samples = data.rows
+        block_size = int(self.optimize_batch_size) if self.optimize_schedule == "batch" else max(num_samples, 1)
+
+        assigned_classes = np.empty(num_samples, dtype=np.int32)
+        contributions = np.empty(num_samples, dtype=np.float64)
+        report = {"schedule": self.optimize_schedule, "samples": num_samples, "blocks": 0,
+                  "optimize_calls": 0, "skipped_spheres": 0, "optimizer_iterations": 0}
+
+        for start in range(0, num_samples, block_size):
+            stop = min(start + block_size, num_samples)
+
+            # Assign the block of samples in a single native call
+            with self._instrumentation.phase("contribution"):
+                assigned_classes[start:stop], contributions[start:stop] = cpp_fuzzy_contribution_batch(
+                    data, self.positive_hyperspheres, self.negative_hyperspheres,
+                    self.gamma, self.sigma, self.E, start, stop
+                )
+            report["blocks"] += 1
+
+            if self.optimize_schedule == "batch" or stop == num_samples:
+                with self._instrumentation.phase("optimize"):
+                    self._optimize_hyperspheres(report)
+
+        self.optimization_log.append(report)
+        self._instrumentation.count("fuzzy_passes")
+        self._instrumentation.count("samples", num_samples)
+        self._instrumentation.count("optimize_calls", report["optimize_calls"])
+        self._instrumentation.count("optimizer_iterations", report["optimizer_iterations"])
+        return assigned_classes, contributions
+
+    def _optimize_hyperspheres(self, report):
+        """Optimize every sphere the schedule selects against the spheres of the other class."""
+        for spheres, others in ((self.positive_hyperspheres, self.negative_hyperspheres),
+                                (self.negative_hyperspheres, self.positive_hyperspheres)):
+            for hs in spheres:
+                count = hs.num_assignments
+                if not count:
+                    continue
+                if self.optimize_schedule == "threshold":
+                    previous = self._optimized_counts.get(id(hs))
+                    if previous is not None and abs(count - previous) <= self.optimize_threshold * max(previous, 1):
+                        report["skipped_spheres"] += 1
+                        continue
+                    self._optimized_counts[id(hs)] = count
+
+                report["optimizer_iterations"] += hs.optimize(
+                    others, self.gamma, self.learning_rate, self.max_iterations, 1e-6, self.optimizer
+                )
+                report["optimize_calls"] += 1
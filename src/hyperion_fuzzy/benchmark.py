@@ -0,0 +1,214 @@
+"""
+Benchmarks for the hot paths of HyperionFuzzy on synthetic data.
+
+Every benchmark is timed while one scale axis (rows, dimensions, clusters or threads) is varied and
+the others stay at their base values. Each case runs in a fresh process so its peak memory can be
+reported. Run with `python -m hyperion_fuzzy.benchmark --output results.json`.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import __version__
+from .HyperionFuzzy import HyperionFuzzy
+from .wrappers import compute_g, compute_kernel, element_matrix, fuzzy_contribution_batch, precompute_g
+
+SCHEMA = "hyperion-fuzzy-benchmark/1"
+
+BASE = {"n": 2000, "dim": 4, "num_clusters": 2, "threads": 1}
+AXES = {
+    "n": [1000, 2000, 4000, 8000],
+    "dim": [2, 4, 8, 16],
+    "num_clusters": [2, 4, 8],
+    "threads": [1, 2, 4],
+}
+QUICK_BASE = {"n": 500, "dim": 2, "num_clusters": 2, "threads": 1}
+QUICK_AXES = {"n": [250, 500], "dim": [2, 4], "num_clusters": [2, 3], "threads": [1, 2]}
+
+# Only predict scores rows on several threads, the other benchmarks skip the threads axis
+THREADED = {"predict"}
+
+
+def make_dataset(n: int, dim: int, seed: int = 0):
+    """Two shuffled Gaussian blobs of n // 2 rows each, labeled 1 and -1."""
+    rng = np.random.default_rng(seed)
+    half = n // 2
+    data = np.vstack([rng.normal(-0.5, 0.5, (half, dim)), rng.normal(0.5, 0.5, (n - half, dim))])
+    labels = np.r_[np.ones(half), -np.ones(n - half)]
+    order = rng.permutation(n)
+    return pd.DataFrame(data[order]), pd.Series(labels[order])
+
+
+def _trained_model(data, labels, num_clusters, seed):
+    np.random.seed(seed)
+    model = HyperionFuzzy(num_clusters=num_clusters, sigma=0.5, max_iterations=2)
+    model.train(data, labels)
+    return model
+
+
+def _setup_train(data, labels, params, seed):
+    def run():
+        np.random.seed(seed)
+        model = HyperionFuzzy(num_clusters=params["num_clusters"], sigma=0.5, max_iterations=2)
+        model.train(data, labels)
+    return run
+
+
+def _setup_predict(data, labels, params, seed):
+    model = _trained_model(data, labels, params["num_clusters"], seed)
+    return lambda: model.predict(data, n_jobs=params["threads"])
+
+
+def _setup_g(data, labels, params, seed):
+    model = _trained_model(data, labels, params["num_clusters"], seed)
+    transformed = np.exp(data.to_numpy())
+
+    def run():
+        for hs in model.positive_hyperspheres + model.negative_hyperspheres:
+            compute_g(transformed, hs, model.E)
+    return run
+
+
+def _setup_kernel(data, labels, params, seed):
+    model = _trained_model(data, labels, params["num_clusters"], seed)
+    transformed = np.exp(data.to_numpy())
+
+    def run():
+        for hs in model.positive_hyperspheres + model.negative_hyperspheres:
+            compute_kernel(transformed, hs, model.sigma, model.E)
+    return run
+
+
+def _setup_optimize(data, labels, params, seed):
+    model = _trained_model(data, labels, params["num_clusters"], seed)
+    spheres = model.positive_hyperspheres + model.negative_hyperspheres
+    matrix = element_matrix(np.exp(data.to_numpy()))
+    precompute_g(matrix, spheres, model.E)
+    fuzzy_contribution_batch(matrix, model.positive_hyperspheres, model.negative_hyperspheres,
+                             model.gamma, model.sigma, model.E)
+    start = [(hs.get_center(), hs.get_radius()) for hs in spheres]
+
+    def run():
+        # Every repeat starts from the same centers and radii
+        for hs, (center, radius) in zip(spheres, start):
+            hs.set_center(center)
+            hs.set_radius(radius)
+        for spheres_, others in ((model.positive_hyperspheres, model.negative_hyperspheres),
+                                 (model.negative_hyperspheres, model.positive_hyperspheres)):
+            for hs in spheres_:
+                hs.optimize(others, model.gamma, model.learning_rate, model.max_iterations, 1e-6, model.optimizer)
+    return run
+
+
+BENCHMARKS = {
+    "train": _setup_train,
+    "predict": _setup_predict,
+    "g": _setup_g,
+    "kernel": _setup_kernel,
+    "optimize": _setup_optimize,
+}
+
+
+def run_case(name: str, params: dict, repeat: int = 3, seed: int = 0) -> dict:
+    """Time one benchmark at one point of the scale axes and report the peak resident memory of the process."""
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    data, labels = make_dataset(params["n"], params["dim"], seed)
+    run = BENCHMARKS[name](data, labels, params, seed)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "benchmark": name,
+        "params": dict(params),
+        "seconds": {"min": min(timings), "median": statistics.median(timings), "runs": timings},
+        "peak_rss_kib": peak_kib,
+        "peak_rss_delta_kib": peak_kib - baseline_kib,
+    }
+
+
+def _run_isolated(args):
+    return run_case(*args)
+
+
+def cases(benchmarks=None, base=None, axes=None):
+    """Yield (benchmark, params) for every benchmark along every axis, deduplicating the base point."""
+    base = BASE if base is None else base
+    axes = AXES if axes is None else axes
+    for name in benchmarks or BENCHMARKS:
+        seen = set()
+        for axis, values in axes.items():
+            if axis == "threads" and name not in THREADED:
+                values = [base["threads"]]
+            for value in values:
+                params = dict(base, **{axis: value})
+                key = tuple(sorted(params.items()))
+                if key not in seen:
+                    seen.add(key)
+                    yield name, params
+
+
+def run(benchmarks=None, quick: bool = False, repeat: int = 3, seed: int = 0, isolate: bool = True) -> dict:
+    """Run the suite and return the results with a description of the machine they were measured on."""
+    base, axes = (QUICK_BASE, QUICK_AXES) if quick else (BASE, AXES)
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name, params in cases(benchmarks, base, axes):
+        if isolate:
+            # A fresh process per case keeps ru_maxrss from carrying over between cases
+            with context.Pool(1) as pool:
+                results.append(pool.apply(_run_isolated, ((name, params, repeat, seed),)))
+        else:
+            results.append(run_case(name, params, repeat, seed))
+
+    return {
+        "schema": SCHEMA,
+        "version": __version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS),
+                        help="benchmark to run, may be repeated (default: all)")
+    parser.add_argument("--quick", action="store_true", help="use small sizes for a smoke run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data and initialization")
+    parser.add_argument("--no-isolate", action="store_true", help="run every case in this process")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(args.benchmark, args.quick, args.repeat, args.seed, not args.no_isolate)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+#include "element_matrix.h"
+#include <stdexcept>
+#include <utility>
+
+ElementMatrix::ElementMatrix()
+    : values(nullptr), float_values(nullptr), row_weights(nullptr), num_rows(0), num_cols(0) {}
+
+ElementMatrix::ElementMatrix(std::vector<double> data, int rows, int cols, std::vector<double> weights)
+    : storage(std::move(data)), weight_storage(std::move(weights)),
+      values(nullptr), float_values(nullptr), row_weights(nullptr), num_rows(rows), num_cols(cols) {
+    if (storage.size() != static_cast<size_t>(rows) * cols) {
+        throw std::invalid_argument("ElementMatrix data does not match its shape");
+    }
+    if (!weight_storage.empty() && weight_storage.size() != static_cast<size_t>(rows)) {
+        throw std::invalid_argument("ElementMatrix needs one weight per row");
+    }
+    values = storage.data();
+    row_weights = weight_storage.empty() ? nullptr : weight_storage.data();
+}
+
+ElementMatrix::ElementMatrix(const double* data, int rows, int cols, std::shared_ptr<void> owner,
+                             const double* weights)
+    : owner(std::move(owner)), values(data), float_values(nullptr), row_weights(weights),
+      num_rows(rows), num_cols(cols) {}
+
+ElementMatrix::ElementMatrix(const float* data, int rows, int cols, std::shared_ptr<void> owner,
+                             const double* weights)
+    : owner(std::move(owner)), values(nullptr), float_values(data), row_weights(weights),
+      num_rows(rows), num_cols(cols) {}
+
+const double* ElementMatrix::rowAsDouble(int i, double* buffer) const {
+    if (!float_values) {
+        return row(i);
+    }
+    const float* source = floatRow(i);
+    for (int j = 0; j < num_cols; ++j) {
+        buffer[j] = source[j];
+    }
+    return buffer;
+}
+
+double ElementMatrix::totalWeight() const {
+    if (!row_weights) {
+        return num_rows;
+    }
+    double total = 0.0;
+    for (int i = 0; i < num_rows; ++i) {
+        total += row_weights[i];
+    }
+    return total;
+}
+
+// Mean of the rows, weighted when the rows carry weights
+std::vector<double> ElementMatrix::mean() const {
+    std::vector<double> result(num_cols, 0.0);
+    if (num_rows == 0) {
+        return result;
+    }
+    for (int r = 0; r < num_rows; ++r) {
+        double w = weight(r);
+        for (int i = 0; i < num_cols; ++i) {
+            result[i] += w * value(r, i);
+        }
+    }
+    double total_weight = totalWeight();
+    for (int i = 0; i < num_cols; ++i) {
+        result[i] /= total_weight;
+    }
+    return result;
+}
+
+ElementMatrix ElementMatrix::fromRows(const std::vector<std::vector<double>>& rows) {
+    if (rows.empty()) {
+        return ElementMatrix();
+    }
+    int num_rows = static_cast<int>(rows.size());
+    int num_cols = static_cast<int>(rows[0].size());
+    std::vector<double> data;
+    data.reserve(static_cast<size_t>(num_rows) * num_cols);
+    for (const auto& row : rows) {
+        if (static_cast<int>(row.size()) != num_cols) {
+            throw std::invalid_argument("All initial elements must have the same dimension");
+        }
+        data.insert(data.end(), row.begin(), row.end());
+    }
+    return ElementMatrix(std::move(data), num_rows, num_cols);
+}
\ No newline at end of file
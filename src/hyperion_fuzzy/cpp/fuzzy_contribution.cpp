@@ -1,8 +1,16 @@
 #include <cmath>
 #include <limits>
 #include <algorithm>
+#include <utility>
+#include <thread>
+#include <functional>
+#include <atomic>
+#include <mutex>
 #include "../include/fuzzy_contribution.h"
 #include <iostream>
+#ifdef HYPERION_USE_CBLAS
+#include <cblas.h>
+#endif
 
 // Compute squared Euclidean distance
 double squared_norm(const double* x, const double* x_prime, int dim) {
@@ -20,23 +28,276 @@ double rbf_kernel(const double* x, const double* x_prime, double sigma, int dim)
     return std::exp(-squared_dist / (2 * sigma * sigma));
 }
 
+// Truncated G(x) over the index subtrees that can hold terms above the sphere's tolerance
+static double G_truncated(const double* x, const Hypersphere& hypersphere, const KDTree& index, double E) {
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+
+    double sum = 0.0;
+    index.search(x, E, hypersphere.getIndexTolerance(), [&](int i, double distance2, double ux_distance2) {
+        sum += initial_elements.weight(i) * std::exp(-distance2 / (ux_distance2 + E));
+    });
+    return sum;
+}
+
+// Opt-in counts of G and kernel evaluations, a relaxed load of the flag is all they cost when disabled
+static std::atomic<bool> counting{false};
+static std::atomic<long long> g_evaluation_count{0};
+static std::atomic<long long> kernel_evaluation_count{0};
+static std::atomic<long long> pruned_kernel_count{0};
+
+void set_counting(bool enabled) {
+    counting.store(enabled, std::memory_order_relaxed);
+}
+
+long long g_evaluations() {
+    return g_evaluation_count.load(std::memory_order_relaxed);
+}
+
+long long kernel_evaluations() {
+    return kernel_evaluation_count.load(std::memory_order_relaxed);
+}
+
+long long pruned_kernels() {
+    return pruned_kernel_count.load(std::memory_order_relaxed);
+}
+
+void reset_counters() {
+    g_evaluation_count.store(0, std::memory_order_relaxed);
+    kernel_evaluation_count.store(0, std::memory_order_relaxed);
+    pruned_kernel_count.store(0, std::memory_order_relaxed);
+}
+
+// G(x) over single precision elements. The exponents of a block of elements are computed in
+// float and exponentiated in a separate pass so both loops can vectorize; block sums are
+// accumulated in double
+static double G_single(const double* x, const Hypersphere& hypersphere, int dim, double E) {
+    constexpr int block_size = 256;
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+    const std::vector<double>& ux = hypersphere.getUx();
+    std::vector<float> x_single(x, x + dim);
+    std::vector<float> ux_single(ux.begin(), ux.end());
+    float E_single = static_cast<float>(E);
+    int num_elements = initial_elements.rows();
+
+    float exponents[block_size];
+    double sum = 0.0;
+    for (int begin = 0; begin < num_elements; begin += block_size) {
+        int count = std::min(block_size, num_elements - begin);
+        for (int b = 0; b < count; ++b) {
+            const float* element = initial_elements.floatRow(begin + b);
+            float distance2 = 0.0f;
+            float ux_distance2 = 0.0f;
+            for (int j = 0; j < dim; j++) {
+                float diff = element[j] - x_single[j];
+                distance2 += diff * diff;
+                float ux_diff = ux_single[j] - element[j];
+                ux_distance2 += ux_diff * ux_diff;
+            }
+            exponents[b] = -distance2 / (ux_distance2 + E_single);
+        }
+        float block_sum = 0.0f;
+        if (initial_elements.weights()) {
+            for (int b = 0; b < count; ++b) {
+                sum += initial_elements.weight(begin + b) * std::exp(exponents[b]);
+            }
+        } else {
+            for (int b = 0; b < count; ++b) {
+                block_sum += std::exp(exponents[b]);
+            }
+        }
+        sum += block_sum;
+    }
+    return sum;
+}
+
+// Rows and elements per block of the blocked squared distances
+constexpr int query_block_size = 64;
+constexpr int element_block_size = 256;
+
+// |e|^2 and |ux - e|^2 of every initial element, cached on the hypersphere. Callers that evaluate G
+// on several threads compute them up front, like the other caches (see prepare_for_scoring)
+static const ElementTerms& element_terms(const Hypersphere& hypersphere, int dim) {
+    const ElementTerms* cached = hypersphere.getElementTerms();
+    if (cached) {
+        return *cached;
+    }
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+    const double* ux = hypersphere.getUx().data();
+    int num_elements = initial_elements.rows();
+    ElementTerms terms;
+    terms.norms.resize(num_elements);
+    terms.ux_distance2.resize(num_elements);
+    for (int i = 0; i < num_elements; i++) {
+        const double* element = initial_elements.row(i);
+        double norm = 0.0;
+        for (int j = 0; j < dim; j++) {
+            norm += element[j] * element[j];
+        }
+        terms.norms[i] = norm;
+        terms.ux_distance2[i] = squared_norm(ux, element, dim);
+    }
+    hypersphere.setElementTerms(std::move(terms));
+    return *hypersphere.getElementTerms();
+}
+
+// G over exact double precision elements goes through the blocked squared distances
+static bool blocked_G(const Hypersphere& hypersphere) {
+    return hypersphere.getElementIndex() == nullptr && !hypersphere.getInitialElements().isSinglePrecision();
+}
+
+// |x - e|^2 as |x|^2 + |e|^2 - 2 x.e. The identity cancels when x and e are close relative to their
+// norms: its rounding error is below (2 dim + 4) eps (|x|^2 + |e|^2), so results under 1e12 times that,
+// where the relative error could exceed 1e-12, and negative results are computed directly instead
+static inline double distance2_from_dot(double dot, double x_norm, double e_norm, double threshold,
+                                        const double* x, const double* element, int dim) {
+    double distance2 = x_norm + e_norm - 2.0 * dot;
+    if (distance2 < threshold * (x_norm + e_norm)) {
+        return squared_norm(x, element, dim);
+    }
+    return distance2;
+}
+
+static double cancellation_threshold(int dim) {
+    return (2.0 * dim + 4.0) * 1e12 * std::numeric_limits<double>::epsilon();
+}
+
+// Dot products of `num_rows` rows of X with `num_elements` rows of `elements` (both row-major with dim
+// columns) into dots (num_rows x num_elements). Without CBLAS the elements are packed column-major into
+// `packed` so the loop over them is contiguous; each dot still sums over j in order, as G does
+static void block_dots(const double* X, int num_rows, const double* elements, int num_elements, int dim,
+                       double* dots, double* packed) {
+#ifdef HYPERION_USE_CBLAS
+    (void)packed;
+    cblas_dgemm(CblasRowMajor, CblasNoTrans, CblasTrans, num_rows, num_elements, dim,
+                1.0, X, dim, elements, dim, 0.0, dots, num_elements);
+#else
+    for (int b = 0; b < num_elements; ++b) {
+        for (int j = 0; j < dim; ++j) {
+            packed[static_cast<size_t>(j) * num_elements + b] = elements[static_cast<size_t>(b) * dim + j];
+        }
+    }
+    // Tiles of tile x tile dot products are accumulated in registers, one j at a time
+    constexpr int tile = 4;
+    for (int r0 = 0; r0 < num_rows; r0 += tile) {
+        int tile_rows = std::min(tile, num_rows - r0);
+        for (int b0 = 0; b0 < num_elements; b0 += tile) {
+            int tile_elements = std::min(tile, num_elements - b0);
+            double acc[tile][tile] = {};
+            if (tile_rows == tile && tile_elements == tile) {
+                for (int j = 0; j < dim; ++j) {
+                    const double* column = packed + static_cast<size_t>(j) * num_elements + b0;
+                    for (int r = 0; r < tile; ++r) {
+                        double x = X[static_cast<size_t>(r0 + r) * dim + j];
+                        for (int b = 0; b < tile; ++b) {
+                            acc[r][b] += x * column[b];
+                        }
+                    }
+                }
+            } else {
+                for (int j = 0; j < dim; ++j) {
+                    const double* column = packed + static_cast<size_t>(j) * num_elements + b0;
+                    for (int r = 0; r < tile_rows; ++r) {
+                        double x = X[static_cast<size_t>(r0 + r) * dim + j];
+                        for (int b = 0; b < tile_elements; ++b) {
+                            acc[r][b] += x * column[b];
+                        }
+                    }
+                }
+            }
+            for (int r = 0; r < tile_rows; ++r) {
+                for (int b = 0; b < tile_elements; ++b) {
+                    dots[static_cast<size_t>(r0 + r) * num_elements + b0 + b] = acc[r][b];
+                }
+            }
+        }
+    }
+#endif
+}
+
+// G(x) of `num_rows` rows of X (row-major, dim columns) for each of `num_E` values of E, written to
+// values[k * stride + r]. The squared distances of a block of rows to a block of elements come from
+// one product of the two blocks and the precomputed norms, and are shared by every E. Only for
+// spheres where blocked_G holds; the element terms must be computed when running on several threads
+static void G_block(const double* X, int num_rows, int dim, const Hypersphere& hypersphere,
+                    const double* Es, int num_E, double* values, size_t stride) {
+    if (counting.load(std::memory_order_relaxed)) {
+        g_evaluation_count.fetch_add(static_cast<long long>(num_rows) * num_E, std::memory_order_relaxed);
+    }
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+    const ElementTerms& terms = element_terms(hypersphere, dim);
+    int num_elements = initial_elements.rows();
+    double threshold = cancellation_threshold(dim);
+
+    std::vector<double> x_norms(query_block_size);
+    std::vector<double> dots(static_cast<size_t>(query_block_size) * element_block_size);
+    std::vector<double> packed(static_cast<size_t>(dim) * element_block_size);
+    for (int begin = 0; begin < num_rows; begin += query_block_size) {
+        int count = std::min(query_block_size, num_rows - begin);
+        const double* rows = X + static_cast<size_t>(begin) * dim;
+        for (int r = 0; r < count; ++r) {
+            const double* x = rows + static_cast<size_t>(r) * dim;
+            double norm = 0.0;
+            for (int j = 0; j < dim; ++j) {
+                norm += x[j] * x[j];
+            }
+            x_norms[r] = norm;
+            for (int k = 0; k < num_E; ++k) {
+                values[k * stride + begin + r] = 0.0;
+            }
+        }
+
+        for (int element_begin = 0; element_begin < num_elements; element_begin += element_block_size) {
+            int element_count = std::min(element_block_size, num_elements - element_begin);
+            block_dots(rows, count, initial_elements.row(element_begin), element_count, dim, dots.data(), packed.data());
+            for (int r = 0; r < count; ++r) {
+                const double* x = rows + static_cast<size_t>(r) * dim;
+                const double* row_dots = &dots[static_cast<size_t>(r) * element_count];
+                for (int b = 0; b < element_count; ++b) {
+                    int i = element_begin + b;
+                    double distance2 = distance2_from_dot(row_dots[b], x_norms[r], terms.norms[i], threshold, x,
+                                                          initial_elements.row(i), dim);
+                    double weight = initial_elements.weight(i);
+                    for (int k = 0; k < num_E; ++k) {
+                        values[k * stride + begin + r] += weight * std::exp(-distance2 / (terms.ux_distance2[i] + Es[k]));
+                    }
+                }
+            }
+        }
+    }
+}
+
 // Compute the conformal factor G(x)
 double G(const double* x, const Hypersphere& hypersphere, int dim, double E) {
-    const std::vector<std::vector<double>>& initial_elements = hypersphere.getInitialElements();
-    const std::vector<double>& ux = hypersphere.getUx();
-    int num_elements = static_cast<int>(initial_elements.size());
+    if (counting.load(std::memory_order_relaxed)) {
+        g_evaluation_count.fetch_add(1, std::memory_order_relaxed);
+    }
+    const KDTree* index = hypersphere.getElementIndex();
+    if (index) {
+        return G_truncated(x, hypersphere, *index, E);
+    }
+    if (hypersphere.getInitialElements().isSinglePrecision()) {
+        return G_single(x, hypersphere, dim, E);
+    }
+
+    // The same distances as G_block, so a row gets the same G whichever path evaluates it
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+    const ElementTerms& terms = element_terms(hypersphere, dim);
+    int num_elements = initial_elements.rows();
+    double threshold = cancellation_threshold(dim);
+    double x_norm = 0.0;
+    for (int j = 0; j < dim; j++) {
+        x_norm += x[j] * x[j];
+    }
 
     double sum = 0.0;
     for (int i = 0; i < num_elements; i++) {
-        double distance2 = 0.0;
-        double ux_distance2 = 0.0;
+        const double* element = initial_elements.row(i);
+        double dot = 0.0;
         for (int j = 0; j < dim; j++) {
-            double diff = initial_elements[i][j] - x[j];
-            distance2 += diff * diff;
-            double ux_diff = ux[j] - initial_elements[i][j];
-            ux_distance2 += ux_diff * ux_diff;
+            dot += x[j] * element[j];
         }
-        sum += std::exp(-distance2 / (ux_distance2 + E));
+        double distance2 = distance2_from_dot(dot, x_norm, terms.norms[i], threshold, x, element, dim);
+        sum += initial_elements.weight(i) * std::exp(-distance2 / (terms.ux_distance2[i] + E));
     }
     return sum;
 }
@@ -49,36 +310,394 @@ double conformal_kernel(const double* x, const double* x_prime, const Hyperspher
     return G_x * rbf * G_x_prime;
 }
 
-// Fuzzy Contribution Function
-void fuzzy_contribution(
-    const double* x,
-    std::vector<Hypersphere>& positive_hyperspheres, std::vector<Hypersphere>& negative_hyperspheres,
-    double gamma, double sigma, double E,
-    int& assigned_class, double& contribution, int dim
-    ) {
-    double min_positive = std::numeric_limits<double>::infinity();
-    double min_negative = std::numeric_limits<double>::infinity();
-    int assigned_hypersphere_p = -1;
-    int assigned_hypersphere_n = -1;
+// Conformal factor of a hypersphere's center, cached until the center moves
+double center_G(const Hypersphere& hypersphere, int dim, double E) {
+    double G_center;
+    if (!hypersphere.getCenterG(E, G_center)) {
+        G_center = G(hypersphere.getCenter().data(), hypersphere, dim, E);
+        hypersphere.setCenterG(E, G_center);
+    }
+    return G_center;
+}
+
+// Conformal kernel between x and the hypersphere's center, given a precomputed G(x)
+double conformal_kernel_to_center(const double* x, double G_x, const Hypersphere& hypersphere, double sigma, double E, int dim) {
+    double G_center = center_G(hypersphere, dim, E);
+    double rbf = rbf_kernel(x, hypersphere.getCenter().data(), sigma, dim);
+    return G_x * rbf * G_center;
+}
+
+// G(x) for every row of a (num_samples x dim) matrix
+void compute_G_values(const double* data, int num_samples, int dim, const Hypersphere& hypersphere, double E,
+                      double* values) {
+    if (blocked_G(hypersphere)) {
+        G_block(data, num_samples, dim, hypersphere, &E, 1, values, num_samples);
+        return;
+    }
+    for (int i = 0; i < num_samples; ++i) {
+        values[i] = G(&data[static_cast<size_t>(i) * dim], hypersphere, dim, E);
+    }
+}
+
+// Conformal kernel between every row and the center of the hypersphere
+void compute_kernel_values(const double* data, int num_samples, int dim, const Hypersphere& hypersphere,
+                           double sigma, double E, double* values) {
+    compute_G_values(data, num_samples, dim, hypersphere, E, values);
+    for (int i = 0; i < num_samples; ++i) {
+        const double* x = &data[static_cast<size_t>(i) * dim];
+        values[i] = conformal_kernel_to_center(x, values[i], hypersphere, sigma, E, dim);
+    }
+}
+
+// G(x) of every row of `data` on the hypersphere
+static std::vector<double> G_values(const ElementMatrix& data, const Hypersphere& hypersphere, double E) {
+    int num_samples = data.rows();
+    int dim = data.cols();
+    std::vector<double> values(num_samples);
+    if (!data.isSinglePrecision()) {
+        compute_G_values(data.data(), num_samples, dim, hypersphere, E, values.data());
+    } else {
+        std::vector<double> row_buffer(dim);
+        for (int i = 0; i < num_samples; ++i) {
+            values[i] = G(data.rowAsDouble(i, row_buffer.data()), hypersphere, dim, E);
+        }
+    }
+    return values;
+}
+
+// Store G(x) for every training row on each hypersphere. Spheres with the same G, such as the
+// spheres of one class, share a single cache computed once
+void compute_G_cache(const std::shared_ptr<const ElementMatrix>& data, const std::vector<Hypersphere*>& hyperspheres,
+                     double E) {
+    std::vector<std::pair<const Hypersphere*, std::shared_ptr<const std::vector<double>>>> computed;
+    for (Hypersphere* hypersphere : hyperspheres) {
+        std::shared_ptr<const std::vector<double>> values;
+        for (const auto& [other, other_values] : computed) {
+            if (hypersphere->sharesG(*other)) {
+                values = other_values;
+                break;
+            }
+        }
+        if (!values) {
+            values = std::make_shared<const std::vector<double>>(G_values(*data, *hypersphere, E));
+            computed.emplace_back(hypersphere, values);
+        }
+        hypersphere->setGCache(data, values, E);
+    }
+}
+
+// Kernel evaluations and prunings of one call, added to the process counters when counting is enabled
+struct KernelCounts {
+    long long evaluated = 0;
+    long long pruned = 0;
+};
+
+static void add_kernel_counts(const KernelCounts& counts) {
+    if (counting.load(std::memory_order_relaxed)) {
+        kernel_evaluation_count.fetch_add(counts.evaluated, std::memory_order_relaxed);
+        pruned_kernel_count.fetch_add(counts.pruned, std::memory_order_relaxed);
+    }
+}
+
+// Terms of a lower bound of G for E, cached on the hypersphere until its elements or index change.
+// With y = x - ux, z_i = e_i - ux and s_i = |z_i|^2 + E, Jensen's inequality over the weights gives
+// G(x) >= W exp(-(a |y|^2 - 2 y.b + c) / W) for a = sum w_i / s_i, b = sum w_i z_i / s_i,
+// c = sum w_i |z_i|^2 / s_i and W = sum w_i
+static const GBound& g_bound(const Hypersphere& hypersphere, int dim, double E) {
+    const GBound* cached = hypersphere.getGBound(E);
+    if (cached) {
+        return *cached;
+    }
+
+    GBound bound;
+    bound.E = E;
+    const ElementMatrix& initial_elements = hypersphere.getInitialElements();
+    // Single precision G rounds each term in float, too coarsely for the margins below
+    if (!initial_elements.isSinglePrecision() && initial_elements.rows() > 0) {
+        const double* ux = hypersphere.getUx().data();
+        int num_elements = initial_elements.rows();
+        std::vector<double> b_abs(dim, 0.0);
+        bound.b.assign(dim, 0.0);
+        bool valid = true;
+        for (int i = 0; i < num_elements && valid; i++) {
+            const double* element = initial_elements.row(i);
+            double ux_distance2 = 0.0;
+            for (int j = 0; j < dim; j++) {
+                double ux_diff = ux[j] - element[j];
+                ux_distance2 += ux_diff * ux_diff;
+            }
+            double s = ux_distance2 + E;
+            double w = initial_elements.weight(i);
+            // G divides by s, an element at ux with E = 0 makes its term undefined
+            valid = s > 0.0 && w >= 0.0;
+            bound.total_weight += w;
+            bound.a += w / s;
+            bound.c += w * ux_distance2 / s;
+            for (int j = 0; j < dim; j++) {
+                double z = element[j] - ux[j];
+                bound.b[j] += w * z / s;
+                b_abs[j] += w * std::abs(z) / s;
+            }
+        }
+        double b_abs_norm2 = 0.0;
+        for (int j = 0; j < dim; j++) {
+            b_abs_norm2 += b_abs[j] * b_abs[j];
+        }
+        bound.b_abs_norm = std::sqrt(b_abs_norm2);
+
+        // Margins for rounding in the bound terms and in the exact G they are compared against,
+        // whose exponents are off by up to dim ulps, or 1e-12 relative for the squared distances
+        // from dot products, of values up to ~745 before exp underflows
+        constexpr double eps = std::numeric_limits<double>::epsilon();
+        bound.relative_error = 1e-9 + 8.0 * (num_elements + dim) * eps;
+        bound.shrink = 1.0 - 1e-6 - 4.0 * (num_elements + 1000.0 * dim) * eps;
+        const KDTree* index = hypersphere.getElementIndex();
+        bound.slack = index ? hypersphere.getIndexTolerance() * bound.total_weight : 0.0;
+        bound.usable = valid && bound.shrink > 0.0 && bound.total_weight > 0.0 && std::isfinite(bound.total_weight)
+                       && std::isfinite(bound.a) && std::isfinite(bound.c) && std::isfinite(bound.b_abs_norm);
+    }
+    hypersphere.setGBound(std::move(bound));
+    return *hypersphere.getGBound(E);
+}
+
+// Lower bound of G(x) as computed by G, including truncation by the sphere's index
+static double G_lower_bound(const double* x, const Hypersphere& hypersphere, const GBound& bound, int dim) {
+    const double* ux = hypersphere.getUx().data();
+    double y2 = 0.0;
+    double yb = 0.0;
+    for (int j = 0; j < dim; j++) {
+        double y = x[j] - ux[j];
+        y2 += y * y;
+        yb += y * bound.b[j];
+    }
+    double scale = bound.a * y2 + 2.0 * std::sqrt(y2) * bound.b_abs_norm + bound.c;
+    double q = std::max(0.0, bound.a * y2 - 2.0 * yb + bound.c + bound.relative_error * scale);
+    double lower = bound.total_weight * std::exp(-q / bound.total_weight) * bound.shrink - bound.slack;
+    return std::max(0.0, lower);
+}
 
-    // Compute conformal kernel for positive hyperspheres
-    for (int i = 0; i < positive_hyperspheres.size(); ++i) {
-        double k = conformal_kernel(x, positive_hyperspheres[i].getCenter().data(),
-                                    positive_hyperspheres[i], sigma, E, dim);
-        if (k < min_positive) {
-            min_positive = k;
-            assigned_hypersphere_p = i;
+// Spheres with the same initial elements, ux and index have the same G(x); each sphere is mapped to
+// the first sphere of its group
+static std::vector<int> g_groups(const std::vector<Hypersphere*>& hyperspheres) {
+    std::vector<int> groups(hyperspheres.size());
+    for (size_t j = 0; j < hyperspheres.size(); ++j) {
+        const Hypersphere& hs = *hyperspheres[j];
+        groups[j] = static_cast<int>(j);
+        for (size_t i = 0; i < j; ++i) {
+            const Hypersphere& other = *hyperspheres[i];
+            if (groups[i] == static_cast<int>(i) && &other.getInitialElements() == &hs.getInitialElements()
+                && other.getElementIndex() == hs.getElementIndex()
+                && other.getIndexTolerance() == hs.getIndexTolerance() && other.getUx() == hs.getUx()) {
+                groups[j] = static_cast<int>(i);
+                break;
+            }
         }
     }
+    return groups;
+}
+
+// The hyperspheres of one class, scored against one row at a time. G(x) is evaluated at most once
+// per group of spheres sharing it, and only for spheres whose kernel lower bound can still reach
+// the minimum
+class SphereSet {
+public:
+    SphereSet(const std::vector<Hypersphere*>& hyperspheres, double sigma, double E, int dim)
+        : hyperspheres(hyperspheres), groups(g_groups(hyperspheres)), sigma(sigma), E(E), dim(dim),
+          g_values(hyperspheres.size()), g_lower(hyperspheres.size()), rbf(hyperspheres.size()),
+          lower(hyperspheres.size()), g_known(hyperspheres.size()), g_lower_known(hyperspheres.size()),
+          exact(hyperspheres.size()), order(hyperspheres.size()) {}
+
+    size_t size() const {
+        return hyperspheres.size();
+    }
+
+    // G(x) of every row for all the spheres, indexed by the row given to setRow, e.g. from compute_G_tables
+    void setGValues(const double* values) {
+        shared_g = values;
+    }
+
+    // The sphere whose G every sphere of the set shares, when it can be evaluated blocked
+    const Hypersphere* blockedGSphere() const {
+        for (size_t j = 0; j < size(); ++j) {
+            if (groups[j] != 0) {
+                return nullptr;
+            }
+        }
+        return size() > 0 && blocked_G(*hyperspheres[0]) ? hyperspheres[0] : nullptr;
+    }
+
+    Hypersphere& operator[](size_t j) const {
+        return *hyperspheres[j];
+    }
+
+    // Start scoring x, row `row` of `source`, whose G caches are used when given
+    void setRow(const double* x_, int row_, const ElementMatrix* source_) {
+        x = x_;
+        row = row_;
+        source = source_;
+        std::fill(g_known.begin(), g_known.end(), 0);
+        std::fill(g_lower_known.begin(), g_lower_known.end(), 0);
+        for (size_t j = 0; j < size(); ++j) {
+            rbf[j] = -1.0;
+        }
+    }
+
+    // Conformal kernel between x and the center of sphere j
+    double kernel(int j) {
+        ++counts.evaluated;
+        const Hypersphere& hs = *hyperspheres[j];
+        double G_center = center_G(hs, dim, E);
+        return G_x(j) * rbf_to_center(j) * G_center;
+    }
+
+    // Smallest kernel and the first sphere with it. Spheres are visited in order of their kernel lower
+    // bound and the rest are pruned once the bound shows they can neither beat the minimum nor exceed
+    // `cutoff`; when the search stops at the cutoff, min_kernel is only known to be above it.
+    // Returns false without a result when a sphere has no usable bound
+    bool prunedMin(double cutoff, double& min_kernel, int& index) {
+        long long exact_kernels = 0;
+        for (size_t j = 0; j < size(); ++j) {
+            const Hypersphere& hs = *hyperspheres[j];
+            exact[j] = cachedG(j) != nullptr || g_known[groups[j]];
+            double G_bound = exact[j] ? G_x(j) : groupLowerBound(j);
+            if (G_bound < 0.0) {
+                return false;
+            }
+            // Rounding is monotone, so a smaller G gives a kernel no larger than the exact one
+            double G_center = center_G(hs, dim, E);
+            lower[j] = G_bound * rbf_to_center(j) * G_center;
+            if (!std::isfinite(lower[j])) {
+                return false;
+            }
+            exact_kernels += exact[j];
+        }
+        counts.evaluated += exact_kernels;
+
+        for (size_t j = 0; j < size(); ++j) {
+            order[j] = static_cast<int>(j);
+        }
+        std::sort(order.begin(), order.end(), [&](int i, int j) {
+            return lower[i] < lower[j] || (lower[i] == lower[j] && i < j);
+        });
+
+        double best = std::numeric_limits<double>::infinity();
+        int best_index = -1;
+        for (size_t position = 0; position < size(); ++position) {
+            int j = order[position];
+            double bound = lower[j];
+            if (bound > cutoff || (best_index >= 0 && (bound > best || (bound == best && j > best_index)))) {
+                for (size_t rest = position; rest < size(); ++rest) {
+                    counts.pruned += !exact[order[rest]];
+                }
+                best = std::min(best, bound);
+                break;
+            }
+            double k = exact[j] ? bound : kernel(j);
+            if (k < best || (k == best && best_index >= 0 && j < best_index)) {
+                best = k;
+                best_index = j;
+            }
+        }
+        min_kernel = best;
+        index = best_index;
+        return true;
+    }
+
+    KernelCounts counts;
+
+private:
+    const double* cachedG(int j) const {
+        if (shared_g) {
+            return shared_g;
+        }
+        return hyperspheres[j]->getGCache(source, E);
+    }
 
-    // Compute conformal kernel for negative hyperspheres
-    for (int i = 0; i < negative_hyperspheres.size(); ++i) {
-        double k = conformal_kernel(x, negative_hyperspheres[i].getCenter().data(),
-                                    negative_hyperspheres[i], sigma, E, dim);
-        if (k < min_negative) {
-            min_negative = k;
-            assigned_hypersphere_n = i;
+    double G_x(int j) {
+        const double* g_cache = cachedG(j);
+        if (g_cache) {
+            return g_cache[row];
+        }
+        int group = groups[j];
+        if (!g_known[group]) {
+            g_values[group] = G(x, *hyperspheres[j], dim, E);
+            g_known[group] = 1;
         }
+        return g_values[group];
+    }
+
+    // Lower bound of G(x) shared by the group of sphere j, negative when there is none
+    double groupLowerBound(int j) {
+        int group = groups[j];
+        if (!g_lower_known[group]) {
+            const Hypersphere& hs = *hyperspheres[j];
+            const GBound& bound = g_bound(hs, dim, E);
+            g_lower[group] = bound.usable ? G_lower_bound(x, hs, bound, dim) : -1.0;
+            g_lower_known[group] = 1;
+        }
+        return g_lower[group];
+    }
+
+    double rbf_to_center(int j) {
+        if (rbf[j] < 0.0) {
+            rbf[j] = rbf_kernel(x, hyperspheres[j]->getCenter().data(), sigma, dim);
+        }
+        return rbf[j];
+    }
+
+    const std::vector<Hypersphere*>& hyperspheres;
+    std::vector<int> groups;
+    double sigma;
+    double E;
+    int dim;
+    const double* x = nullptr;
+    int row = 0;
+    const ElementMatrix* source = nullptr;
+    const double* shared_g = nullptr;
+    std::vector<double> g_values;
+    std::vector<double> g_lower;
+    std::vector<double> rbf;
+    std::vector<double> lower;
+    std::vector<char> g_known;
+    std::vector<char> g_lower_known;
+    std::vector<char> exact;
+    std::vector<int> order;
+};
+
+// Smallest kernel and the first sphere with it, evaluating every sphere
+static void min_kernel(SphereSet& hyperspheres, double& min_kernel, int& index) {
+    min_kernel = std::numeric_limits<double>::infinity();
+    index = -1;
+    for (size_t i = 0; i < hyperspheres.size(); ++i) {
+        double k = hyperspheres.kernel(static_cast<int>(i));
+        if (k < min_kernel) {
+            min_kernel = k;
+            index = static_cast<int>(i);
+        }
+    }
+}
+
+// Fuzzy Contribution for row `row` of the training matrix `source`, nullptr bypasses the G cache
+static void fuzzy_contribution_row(
+    const double* x, int row, const ElementMatrix* source,
+    SphereSet& positive_hyperspheres, SphereSet& negative_hyperspheres,
+    double gamma, int& assigned_class, double& contribution
+    ) {
+    double min_positive;
+    double min_negative;
+    int assigned_hypersphere_p;
+    int assigned_hypersphere_n;
+    double no_cutoff = std::numeric_limits<double>::infinity();
+
+    positive_hyperspheres.setRow(x, row, source);
+    negative_hyperspheres.setRow(x, row, source);
+
+    // Smallest conformal kernel to the positive and negative hyperspheres
+    if (!positive_hyperspheres.prunedMin(no_cutoff, min_positive, assigned_hypersphere_p)) {
+        min_kernel(positive_hyperspheres, min_positive, assigned_hypersphere_p);
+    }
+    if (!negative_hyperspheres.prunedMin(no_cutoff, min_negative, assigned_hypersphere_n)) {
+        min_kernel(negative_hyperspheres, min_negative, assigned_hypersphere_n);
     }
 
     if (min_positive < min_negative) {
@@ -88,9 +707,7 @@ void fuzzy_contribution(
         double c_to_boundary = 1 - 1 / std::sqrt(d_to_other_boundary + gamma);
         contribution = std::max(c_to_cen, c_to_boundary);
         assigned_class = 1;
-        positive_hyperspheres[assigned_hypersphere_p].addAssignment(
-            std::vector<double>(x, x + dim), 1, contribution
-        );
+        positive_hyperspheres[assigned_hypersphere_p].addAssignment(row, 1, contribution);
 
     } else if (min_positive > min_negative) {
         const Hypersphere& ps_sphere = positive_hyperspheres[assigned_hypersphere_p];
@@ -99,37 +716,112 @@ void fuzzy_contribution(
         double c_to_boundary = 1 - 1 / std::sqrt(d_to_other_boundary + gamma);
         contribution = std::max(c_to_cen, c_to_boundary);
         assigned_class = -1;
-        negative_hyperspheres[assigned_hypersphere_n].addAssignment(
-            std::vector<double>(x, x + dim), -1, contribution
-        );
+        negative_hyperspheres[assigned_hypersphere_n].addAssignment(row, -1, contribution);
     } else {
         contribution = 1.0;
         assigned_class = 0;
     }
 }
-// Prediction Function
-void predict(
-    const double* transformed_data, int num_samples, int dim,
-    const std::vector<Hypersphere>& positive_hyperspheres,
-    const std::vector<Hypersphere>& negative_hyperspheres,
-    double sigma, int* predictions
+
+// Fuzzy Contribution Function, `index` is the row of x in the spheres' assignment source
+void fuzzy_contribution(
+    const double* x, int index,
+    std::vector<Hypersphere*>& positive_hyperspheres, std::vector<Hypersphere*>& negative_hyperspheres,
+    double gamma, double sigma, double E,
+    int& assigned_class, double& contribution, int dim
     ) {
-    for (int i = 0; i < num_samples; ++i) {
-        const double* x = &transformed_data[i * dim];
+    SphereSet positive(positive_hyperspheres, sigma, E, dim);
+    SphereSet negative(negative_hyperspheres, sigma, E, dim);
+    fuzzy_contribution_row(x, index, nullptr, positive, negative, gamma, assigned_class, contribution);
+    add_kernel_counts(positive.counts);
+    add_kernel_counts(negative.counts);
+}
 
-        std::vector<double> memberships_p(positive_hyperspheres.size());
-        std::vector<double> memberships_n(negative_hyperspheres.size());
+// Batched Fuzzy Contribution over rows [start, stop) of the training matrix,
+// outputs are indexed from start
+void fuzzy_contribution_batch(
+    const std::shared_ptr<const ElementMatrix>& data, int start, int stop,
+    std::vector<Hypersphere*>& positive_hyperspheres, std::vector<Hypersphere*>& negative_hyperspheres,
+    double gamma, double sigma, double E,
+    int* assigned_classes, double* contributions
+    ) {
+    int num_samples = data->rows();
 
-        for (int j = 0; j < positive_hyperspheres.size(); ++j) {
-            memberships_p[j] = conformal_kernel(x, positive_hyperspheres[j].getCenter().data(), positive_hyperspheres[j], sigma, 0.0, dim);
+    // Assignments are stored as row indices into the training matrix
+    for (Hypersphere* hs : positive_hyperspheres) {
+        hs->setAssignmentSource(data);
+        hs->reserveAssignments(num_samples);
+    }
+    for (Hypersphere* hs : negative_hyperspheres) {
+        hs->setAssignmentSource(data);
+        hs->reserveAssignments(num_samples);
+    }
+
+    SphereSet positive(positive_hyperspheres, sigma, E, data->cols());
+    SphereSet negative(negative_hyperspheres, sigma, E, data->cols());
+    // Single precision rows are widened into this buffer one at a time
+    std::vector<double> row_buffer(data->cols());
+    for (int i = start; i < stop; ++i) {
+        fuzzy_contribution_row(data->rowAsDouble(i, row_buffer.data()), i, data.get(), positive, negative,
+                               gamma, assigned_classes[i - start], contributions[i - start]);
+    }
+    add_kernel_counts(positive.counts);
+    add_kernel_counts(negative.counts);
+}
+
+// Smallest conformal kernel between x and the hypersphere centers, infinity when there are none
+static double min_kernel_to_centers(SphereSet& hyperspheres) {
+    double min_kernel = std::numeric_limits<double>::infinity();
+    for (size_t j = 0; j < hyperspheres.size(); ++j) {
+        double k = hyperspheres.kernel(static_cast<int>(j));
+        if (j == 0 || k < min_kernel) {
+            min_kernel = k;
         }
+    }
+    return min_kernel;
+}
+
+static void predict_rows(
+    const double* transformed_data, int begin, int end, int dim,
+    const std::vector<Hypersphere*>& positive_hyperspheres,
+    const std::vector<Hypersphere*>& negative_hyperspheres,
+    double sigma, int* predictions, const double* positive_g, const double* negative_g
+    ) {
+    SphereSet positive(positive_hyperspheres, sigma, 0.0, dim);
+    SphereSet negative(negative_hyperspheres, sigma, 0.0, dim);
+    positive.setGValues(positive_g);
+    negative.setGValues(negative_g);
 
-        for (int j = 0; j < negative_hyperspheres.size(); ++j) {
-            memberships_n[j] = conformal_kernel(x, negative_hyperspheres[j].getCenter().data(), negative_hyperspheres[j], sigma, 0.0, dim);
+    // G of the positive class is needed for every row, so when its spheres share G it is evaluated for a
+    // block of rows at a time and indexed by the row in the block. The negative class keeps evaluating
+    // G per row, as its kernels are often pruned once the positive minimum is known
+    const Hypersphere* positive_blocked = positive_g ? nullptr : positive.blockedGSphere();
+    std::vector<double> positive_block(positive_blocked ? query_block_size : 0);
+    if (positive_blocked) {
+        positive.setGValues(positive_block.data());
+    }
+    const double E = 0.0;
+
+    int index;
+    for (int i = begin; i < end; ++i) {
+        const double* x = &transformed_data[static_cast<size_t>(i) * dim];
+        int block_row = (i - begin) % query_block_size;
+        if (positive_blocked && block_row == 0) {
+            G_block(x, std::min(query_block_size, end - i), dim, *positive_blocked, &E, 1, positive_block.data(),
+                    query_block_size);
         }
+        positive.setRow(x, positive_blocked ? block_row : i, nullptr);
+        negative.setRow(x, i, nullptr);
 
-        double max_membership_p = memberships_p.empty() ? std::numeric_limits<double>::infinity() : *std::min_element(memberships_p.begin(), memberships_p.end());
-        double max_membership_n = memberships_n.empty() ? std::numeric_limits<double>::infinity() : *std::min_element(memberships_n.begin(), memberships_n.end());
+        double max_membership_p;
+        if (!positive.prunedMin(std::numeric_limits<double>::infinity(), max_membership_p, index)) {
+            max_membership_p = min_kernel_to_centers(positive);
+        }
+        // Only which side of max_membership_p the negative minimum falls on matters
+        double max_membership_n;
+        if (!negative.prunedMin(max_membership_p, max_membership_n, index)) {
+            max_membership_n = min_kernel_to_centers(negative);
+        }
 
         if (max_membership_p < max_membership_n) {
             predictions[i] = 1;
@@ -139,4 +831,144 @@ void predict(
             predictions[i] = 0;
         }
     }
+    add_kernel_counts(positive.counts);
+    add_kernel_counts(negative.counts);
+}
+
+// Fill the center G and bound caches up front so worker threads only read shared state. Calls
+// scoring the same spheres at once, e.g. predict from two Python threads, take turns filling them
+static void prepare_for_scoring(const std::vector<Hypersphere*>& hyperspheres, int dim) {
+    for (const Hypersphere* hs : hyperspheres) {
+        std::lock_guard<std::mutex> lock(hs->getCacheMutex());
+        if (blocked_G(*hs)) {
+            element_terms(*hs, dim);
+        }
+        center_G(*hs, dim, 0.0);
+        g_bound(*hs, dim, 0.0);
+    }
+}
+
+// Run score_rows(begin, end) over rows [0, num_samples) split across num_threads threads
+// (<= 0 uses every hardware thread)
+static void parallel_rows(int num_samples, int num_threads, const std::function<void(int, int)>& score_rows) {
+    if (num_threads <= 0) {
+        num_threads = std::max(1u, std::thread::hardware_concurrency());
+    }
+    num_threads = std::max(1, std::min(num_threads, num_samples));
+
+    if (num_threads == 1) {
+        score_rows(0, num_samples);
+        return;
+    }
+
+    std::vector<std::thread> workers;
+    workers.reserve(num_threads);
+    int rows_per_thread = (num_samples + num_threads - 1) / num_threads;
+    for (int t = 0; t < num_threads; ++t) {
+        int begin = t * rows_per_thread;
+        int end = std::min(num_samples, begin + rows_per_thread);
+        if (begin >= end) {
+            break;
+        }
+        workers.emplace_back(score_rows, begin, end);
+    }
+    for (std::thread& worker : workers) {
+        worker.join();
+    }
+}
+
+// Prediction Function, rows are split across num_threads threads (<= 0 uses every hardware thread).
+// Known G(x) at E = 0 of the rows for each class, shared by all its spheres, can be passed in
+// positive_g and negative_g so it is not evaluated again
+void predict(
+    const double* transformed_data, int num_samples, int dim,
+    const std::vector<Hypersphere*>& positive_hyperspheres,
+    const std::vector<Hypersphere*>& negative_hyperspheres,
+    double sigma, int* predictions, int num_threads, const double* positive_g, const double* negative_g
+    ) {
+    prepare_for_scoring(positive_hyperspheres, dim);
+    prepare_for_scoring(negative_hyperspheres, dim);
+
+    parallel_rows(num_samples, num_threads, [&](int begin, int end) {
+        predict_rows(transformed_data, begin, end, dim, positive_hyperspheres, negative_hyperspheres,
+                     sigma, predictions, positive_g, negative_g);
+    });
+}
+
+// One-vs-rest scores of every row, row-major (num_samples x num_classes). The score of class c is the
+// smallest kernel to its negative spheres minus the smallest kernel to its positive spheres, so it is
+// positive exactly when the binary model of class c predicts 1
+void class_scores(
+    const double* transformed_data, int num_samples, int dim,
+    const std::vector<std::vector<Hypersphere*>>& positive_hyperspheres,
+    const std::vector<std::vector<Hypersphere*>>& negative_hyperspheres,
+    double sigma, double* scores, int num_threads
+    ) {
+    size_t num_classes = positive_hyperspheres.size();
+    for (size_t c = 0; c < num_classes; ++c) {
+        prepare_for_scoring(positive_hyperspheres[c], dim);
+        prepare_for_scoring(negative_hyperspheres[c], dim);
+    }
+
+    parallel_rows(num_samples, num_threads, [&](int begin, int end) {
+        std::vector<SphereSet> positive;
+        std::vector<SphereSet> negative;
+        positive.reserve(num_classes);
+        negative.reserve(num_classes);
+        for (size_t c = 0; c < num_classes; ++c) {
+            positive.emplace_back(positive_hyperspheres[c], sigma, 0.0, dim);
+            negative.emplace_back(negative_hyperspheres[c], sigma, 0.0, dim);
+        }
+
+        int index;
+        for (int i = begin; i < end; ++i) {
+            const double* x = &transformed_data[static_cast<size_t>(i) * dim];
+            for (size_t c = 0; c < num_classes; ++c) {
+                positive[c].setRow(x, i, nullptr);
+                negative[c].setRow(x, i, nullptr);
+                double min_positive;
+                double min_negative;
+                if (!positive[c].prunedMin(std::numeric_limits<double>::infinity(), min_positive, index)) {
+                    min_positive = min_kernel_to_centers(positive[c]);
+                }
+                if (!negative[c].prunedMin(std::numeric_limits<double>::infinity(), min_negative, index)) {
+                    min_negative = min_kernel_to_centers(negative[c]);
+                }
+                scores[static_cast<size_t>(i) * num_classes + c] = min_negative - min_positive;
+            }
+        }
+        for (size_t c = 0; c < num_classes; ++c) {
+            add_kernel_counts(positive[c].counts);
+            add_kernel_counts(negative[c].counts);
+        }
+    });
+}
+
+// G(x) of every row for each E in `Es`, row-major (Es x num_samples). Over exact double precision
+// elements, the blocked squared distances are shared by every E; truncated and single precision G are
+// evaluated once per E as G computes them
+void compute_G_tables(const ElementMatrix& data, const Hypersphere& hypersphere, const std::vector<double>& Es,
+                      double* values, int num_threads) {
+    int num_samples = data.rows();
+    int dim = data.cols();
+    int num_E = static_cast<int>(Es.size());
+    bool blocked = blocked_G(hypersphere) && !data.isSinglePrecision();
+    if (blocked_G(hypersphere)) {
+        std::lock_guard<std::mutex> lock(hypersphere.getCacheMutex());
+        element_terms(hypersphere, dim);
+    }
+
+    parallel_rows(num_samples, num_threads, [&](int begin, int end) {
+        if (blocked) {
+            G_block(data.row(begin), end - begin, dim, hypersphere, Es.data(), num_E, values + begin, num_samples);
+            return;
+        }
+        std::vector<double> row_buffer(dim);
+        for (int r = begin; r < end; ++r) {
+            const double* x = data.rowAsDouble(r, row_buffer.data());
+            for (int k = 0; k < num_E; ++k) {
+                values[static_cast<size_t>(k) * num_samples + r] = G(x, hypersphere, dim, Es[k]);
+            }
+        }
+    });
 }
\ No newline at end of file
@@ -1,17 +1,36 @@
 #include "hypersphere.h"
 #include <numeric>
+#include <cstddef>
+#include <utility>
+#include <stdexcept>
 
 Hypersphere::Hypersphere(const std::vector<double>& center, double radius,
-                         const std::vector<std::vector<double>>& initial_elements)
-    : center(center), radius(radius), initial_elements(initial_elements) {
+                         std::shared_ptr<const ElementMatrix> initial_elements)
+    : initial_elements(initial_elements ? std::move(initial_elements) : std::make_shared<const ElementMatrix>()),
+      center(center), radius(radius) {
     computeUx();
 }
 
+// Restore a sphere with an already known ux, which skips the pass over the initial elements
+Hypersphere::Hypersphere(const std::vector<double>& center, double radius,
+                         std::shared_ptr<const ElementMatrix> initial_elements, std::vector<double> ux)
+    : initial_elements(initial_elements ? std::move(initial_elements) : std::make_shared<const ElementMatrix>()),
+      center(center), radius(radius), ux(std::move(ux)) {
+    if (this->ux.size() != center.size()) {
+        throw std::invalid_argument("ux must have the same dimension as the center");
+    }
+}
+
+Hypersphere::Hypersphere(const std::vector<double>& center, double radius,
+                         const std::vector<std::vector<double>>& initial_elements)
+    : Hypersphere(center, radius, std::make_shared<const ElementMatrix>(ElementMatrix::fromRows(initial_elements))) {}
+
 void Hypersphere::setCenter(const std::vector<double>& new_center) {
     center = new_center;
+    center_g_valid = false;
 }
 
-std::vector<double> Hypersphere::getCenter() const {
+const std::vector<double>& Hypersphere::getCenter() const {
     return center;
 }
 
@@ -24,39 +43,228 @@ double Hypersphere::getRadius() const {
 }
 
 void Hypersphere::computeUx() {
-    int num_elements = initial_elements.size();
-    if (num_elements == 0) {
+    if (initial_elements->rows() == 0) {
         ux = std::vector<double>(center.size(), 0.0);
         return;
     }
-    int element_size = initial_elements[0].size();
-    ux = std::vector<double>(element_size, 0.0);
-    for (const auto& elem : initial_elements) {
-        for (size_t i = 0; i < element_size; ++i) {
-            ux[i] += elem[i];
-        }
-    }
-    for (size_t i = 0; i < element_size; ++i) {
-        ux[i] /= num_elements;
-    }
+    ux = initial_elements->mean();
 }
 
-std::vector<double> Hypersphere::getUx() const {
+const std::vector<double>& Hypersphere::getUx() const {
     return ux;
 }
 
-const std::vector<std::vector<double>>& Hypersphere::getInitialElements() const {
+// Replace the initial elements, e.g. with a summary updated by another chunk of data. ux is
+// recomputed and the G caches and element index, which depend on the old elements, are dropped
+void Hypersphere::setInitialElements(std::shared_ptr<const ElementMatrix> elements) {
+    initial_elements = elements ? std::move(elements) : std::make_shared<const ElementMatrix>();
+    computeUx();
+    resetElementState();
+}
+
+// Replace the initial elements with a known ux, e.g. a running mean updated with appended rows
+void Hypersphere::setInitialElements(std::shared_ptr<const ElementMatrix> elements, std::vector<double> new_ux) {
+    if (new_ux.size() != center.size()) {
+        throw std::invalid_argument("ux must have the same dimension as the center");
+    }
+    initial_elements = elements ? std::move(elements) : std::make_shared<const ElementMatrix>();
+    ux = std::move(new_ux);
+    resetElementState();
+}
+
+// Drop the element index and the G caches, which depend on the initial elements and ux
+void Hypersphere::resetElementState() {
+    element_index.reset();
+    index_tolerance = 0.0;
+    center_g_valid = false;
+    g_bound_valid = false;
+    element_terms_valid = false;
+    element_terms = ElementTerms();
+    clearGCache();
+}
+
+const ElementMatrix& Hypersphere::getInitialElements() const {
+    return *initial_elements;
+}
+
+std::shared_ptr<const ElementMatrix> Hypersphere::getSharedInitialElements() const {
     return initial_elements;
 }
 
-const std::vector<std::tuple<std::vector<double>, int, double>>& Hypersphere::getAssignments() const {
-    return assignments;
+// Training matrix that assignment indices refer to, switching it drops the current assignments
+void Hypersphere::setAssignmentSource(std::shared_ptr<const ElementMatrix> source) {
+    if (source != assignment_source) {
+        clearAssignments();
+        assignment_source = std::move(source);
+    }
+}
+
+const ElementMatrix* Hypersphere::getAssignmentSource() const {
+    return assignment_source.get();
+}
+
+// Storage that was handed out by shareAssignments is never changed again: before the first change,
+// the sphere moves to storage of its own, copying the assignments when `keep` is set
+void Hypersphere::ownAssignments(bool keep) {
+    if (assignments.use_count() == 1) {
+        return;
+    }
+    auto own = std::make_shared<Assignments>();
+    size_t capacity = assignments->indices.capacity();
+    own->indices.reserve(capacity);
+    own->labels.reserve(capacity);
+    own->weights.reserve(capacity);
+    if (keep) {
+        own->indices = assignments->indices;
+        own->labels = assignments->labels;
+        own->weights = assignments->weights;
+    }
+    assignments = std::move(own);
+}
+
+void Hypersphere::reserveAssignments(int capacity) {
+    ownAssignments(true);
+    assignments->indices.reserve(capacity);
+    assignments->labels.reserve(capacity);
+    assignments->weights.reserve(capacity);
 }
 
-void Hypersphere::addAssignment(const std::vector<double>& array, int value, double weight) {
-    assignments.emplace_back(array, value, weight);
+void Hypersphere::addAssignment(int index, int value, double weight) {
+    if (!assignment_source || index < 0 || index >= assignment_source->rows()) {
+        throw std::out_of_range("Assignment index is outside the assignment source matrix");
+    }
+    ownAssignments(true);
+    assignments->indices.push_back(index);
+    assignments->labels.push_back(value);
+    assignments->weights.push_back(weight);
 }
 
+// Keeps the capacity so the next pass does not reallocate
 void Hypersphere::clearAssignments() {
-    assignments.clear();
+    ownAssignments(false);
+    assignments->indices.clear();
+    assignments->labels.clear();
+    assignments->weights.clear();
+}
+
+int Hypersphere::numAssignments() const {
+    return static_cast<int>(assignments->indices.size());
+}
+
+// Point of assignment k as doubles, widened into `buffer` when the source is single precision
+const double* Hypersphere::getAssignmentPoint(int k, double* buffer) const {
+    return assignment_source->rowAsDouble(assignments->indices[k], buffer);
+}
+
+const std::vector<int>& Hypersphere::getAssignmentIndices() const {
+    return assignments->indices;
+}
+
+const std::vector<int>& Hypersphere::getAssignmentLabels() const {
+    return assignments->labels;
+}
+
+const std::vector<double>& Hypersphere::getAssignmentWeights() const {
+    return assignments->weights;
+}
+
+// The current assignments, which stay as they are while the caller holds them
+std::shared_ptr<const Assignments> Hypersphere::shareAssignments() const {
+    return assignments;
+}
+
+// Attach a KD-tree built over this sphere's initial elements. With tolerance > 0, G skips the
+// subtrees whose terms are all below tolerance, so each skipped element loses less than
+// tolerance times its weight; 0 disables truncation
+void Hypersphere::setElementIndex(std::shared_ptr<const KDTree> index, double tolerance) {
+    if (index && (index->getSharedElements() != initial_elements || index->getUx() != ux)) {
+        throw std::invalid_argument("The element index was built over a different matrix");
+    }
+    if (tolerance < 0.0 || tolerance >= 1.0) {
+        throw std::invalid_argument("The index tolerance must lie in [0, 1)");
+    }
+    element_index = std::move(index);
+    index_tolerance = tolerance;
+    center_g_valid = false;
+    g_bound_valid = false;
+    clearGCache();
+}
+
+const KDTree* Hypersphere::getElementIndex() const {
+    return index_tolerance > 0.0 ? element_index.get() : nullptr;
+}
+
+double Hypersphere::getIndexTolerance() const {
+    return index_tolerance;
+}
+
+// Whether G is the same function on both spheres: same initial elements, ux and truncation
+bool Hypersphere::sharesG(const Hypersphere& other) const {
+    return initial_elements == other.initial_elements && ux == other.ux
+        && getElementIndex() == other.getElementIndex() && index_tolerance == other.index_tolerance;
+}
+
+// Cache `values` as G of every row of `source` for E
+void Hypersphere::setGCache(std::shared_ptr<const ElementMatrix> source, std::shared_ptr<const std::vector<double>> values,
+                            double E) {
+    if (!source || !values || static_cast<int>(values->size()) != source->rows()) {
+        throw std::invalid_argument("The G cache must hold one value per row of its source matrix");
+    }
+    g_cache = std::move(values);
+    g_cache_E = E;
+    g_cache_source = std::move(source);
+}
+
+// Cached G values of the rows of `source`, or nullptr if they were computed for another matrix or E
+const double* Hypersphere::getGCache(const ElementMatrix* source, double E) const {
+    if (!g_cache || source == nullptr || source != g_cache_source.get() || g_cache_E != E) {
+        return nullptr;
+    }
+    return g_cache->data();
+}
+
+void Hypersphere::clearGCache() {
+    g_cache.reset();
+    g_cache_source.reset();
+}
+
+bool Hypersphere::getCenterG(double E, double& value) const {
+    if (!center_g_valid || center_g_E != E) {
+        return false;
+    }
+    value = center_g;
+    return true;
+}
+
+void Hypersphere::setCenterG(double E, double value) const {
+    center_g = value;
+    center_g_E = E;
+    center_g_valid = true;
+}
+
+// Bound terms for E, or nullptr if they were computed for another E or the elements changed
+const GBound* Hypersphere::getGBound(double E) const {
+    if (!g_bound_valid || g_bound.E != E) {
+        return nullptr;
+    }
+    return &g_bound;
+}
+
+void Hypersphere::setGBound(GBound bound) const {
+    g_bound = std::move(bound);
+    g_bound_valid = true;
+}
+
+// Element terms of the current elements and ux, or nullptr if they were not computed since they changed
+const ElementTerms* Hypersphere::getElementTerms() const {
+    return element_terms_valid ? &element_terms : nullptr;
+}
+
+void Hypersphere::setElementTerms(ElementTerms terms) const {
+    element_terms = std::move(terms);
+    element_terms_valid = true;
+}
+
+std::mutex& Hypersphere::getCacheMutex() const {
+    return cache_mutex;
 }
\ No newline at end of file
@@ -0,0 +1,109 @@
+#include "kd_tree.h"
+#include <algorithm>
+#include <limits>
+#include <numeric>
+#include <stdexcept>
+#include <utility>
+
+KDTree::KDTree(std::shared_ptr<const ElementMatrix> elements, int leaf_size)
+    : KDTree(elements, elements->mean(), leaf_size) {}
+
+// Index with a known ux, e.g. a running mean kept up to date as elements are appended
+KDTree::KDTree(std::shared_ptr<const ElementMatrix> elements, std::vector<double> ux, int leaf_size)
+    : elements(std::move(elements)), ux(std::move(ux)), leaf_size(std::max(1, leaf_size)) {
+    if (static_cast<int>(this->ux.size()) != this->elements->cols()) {
+        throw std::invalid_argument("ux must have one entry per column of the elements");
+    }
+    int num_rows = this->elements->rows();
+    order.resize(num_rows);
+    std::iota(order.begin(), order.end(), 0);
+    if (num_rows > 0) {
+        nodes.reserve(2 * (num_rows / this->leaf_size + 1));
+        build(0, num_rows);
+    }
+
+    // |ux - e|^2 in tree order, then the per-node maxima bottom-up (children come after parents)
+    int dim = this->elements->cols();
+    ux_distance2.resize(num_rows);
+    for (int k = 0; k < num_rows; ++k) {
+        double distance2 = 0.0;
+        for (int j = 0; j < dim; ++j) {
+            double diff = this->ux[j] - this->elements->value(order[k], j);
+            distance2 += diff * diff;
+        }
+        ux_distance2[k] = distance2;
+    }
+    for (int n = static_cast<int>(nodes.size()) - 1; n >= 0; --n) {
+        Node& node = nodes[n];
+        if (node.left < 0) {
+            node.max_ux_distance2 = *std::max_element(ux_distance2.begin() + node.begin, ux_distance2.begin() + node.end);
+        } else {
+            node.max_ux_distance2 = std::max(nodes[node.left].max_ux_distance2, nodes[node.right].max_ux_distance2);
+        }
+    }
+}
+
+// Builds the subtree over order[begin, end) and returns its node index
+int KDTree::build(int begin, int end) {
+    int dim = elements->cols();
+    int index = static_cast<int>(nodes.size());
+    nodes.push_back({begin, end, -1, -1, 0.0});
+
+    // Bounding box of the node, stored as dim lows followed by dim highs
+    bounds.resize(bounds.size() + 2 * static_cast<size_t>(dim));
+    double* low = &bounds[2 * static_cast<size_t>(index) * dim];
+    double* high = low + dim;
+    std::fill(low, low + dim, std::numeric_limits<double>::infinity());
+    std::fill(high, high + dim, -std::numeric_limits<double>::infinity());
+    for (int k = begin; k < end; ++k) {
+        for (int j = 0; j < dim; ++j) {
+            double value = elements->value(order[k], j);
+            low[j] = std::min(low[j], value);
+            high[j] = std::max(high[j], value);
+        }
+    }
+
+    if (end - begin <= leaf_size) {
+        return index;
+    }
+
+    // Split at the median of the widest dimension
+    int split_dim = 0;
+    double widest = -1.0;
+    for (int j = 0; j < dim; ++j) {
+        if (high[j] - low[j] > widest) {
+            widest = high[j] - low[j];
+            split_dim = j;
+        }
+    }
+    if (widest <= 0.0) {
+        return index;
+    }
+    int middle = begin + (end - begin) / 2;
+    std::nth_element(order.begin() + begin, order.begin() + middle, order.begin() + end,
+                     [&](int a, int b) { return elements->value(a, split_dim) < elements->value(b, split_dim); });
+
+    int left = build(begin, middle);
+    int right = build(middle, end);
+    nodes[index].left = left;
+    nodes[index].right = right;
+    return index;
+}
+
+// Squared distance from x to the node's bounding box, 0 when x is inside it
+double KDTree::boxDistance2(int node, const double* x) const {
+    int dim = elements->cols();
+    const double* low = &bounds[2 * static_cast<size_t>(node) * dim];
+    const double* high = low + dim;
+    double distance2 = 0.0;
+    for (int j = 0; j < dim; ++j) {
+        double diff = 0.0;
+        if (x[j] < low[j]) {
+            diff = low[j] - x[j];
+        } else if (x[j] > high[j]) {
+            diff = x[j] - high[j];
+        }
+        distance2 += diff * diff;
+    }
+    return distance2;
+}
\ No newline at end of file
@@ -26,20 +26,18 @@ double objective(const dlib::matrix<double, 0, 1>& params,
     }
 
     // Positive part of the objective function
-    double pos_part = c * std::accumulate(hypersphere.getAssignments().begin(), hypersphere.getAssignments().end(), 0.0,
-        [](double sum, const std::tuple<std::vector<double>, int, double>& assignment) {
-            return sum + std::get<2>(assignment);
-        });
+    const std::vector<double>& weights = hypersphere.getAssignmentWeights();
+    double pos_part = c * std::accumulate(weights.begin(), weights.end(), 0.0);
 
     // Negative part of the objective function
     double neg_part = 0.0;
     int total_elements = 0;
+    std::vector<double> point_buffer(center.size());
     for (const auto& hs : other_hyperspheres) {
-        neg_part += std::accumulate(hs->getAssignments().begin(), hs->getAssignments().end(), 0.0,
-            [&](double sum, const std::tuple<std::vector<double>, int, double>& assignment) {
-                const std::vector<double>& array = std::get<0>(assignment);
-                return sum + std::sqrt(squared_norm(array.data(), center.data(), center.size()));
-            });
+        for (int k = 0; k < hs->numAssignments(); ++k) {
+            const double* point = hs->getAssignmentPoint(k, point_buffer.data());
+            neg_part += std::sqrt(squared_norm(point, center.data(), center.size()));
+        }
         total_elements += 1;
     }
 
@@ -50,27 +48,167 @@ double objective(const dlib::matrix<double, 0, 1>& params,
     return radius * radius + pos_part - neg_part;
 }
 
-void optimize(Hypersphere* hypersphere,
-              std::vector<Hypersphere*>& other_hyperspheres,
-              double c,
-              double learning_rate,
-              int max_iterations,
-              double tolerance,
-              int dim) {
+// Assignment points of the other hyperspheres gathered into one contiguous block,
+// with the constant parts of the objective hoisted out of the iterations
+struct ObjectiveTerms {
+    std::vector<double> points;
+    int num_points = 0;
+    double pos_part = 0.0;
+    double neg_scale = 0.0;
+};
+
+static ObjectiveTerms gather_objective_terms(const Hypersphere& hypersphere,
+                                             const std::vector<Hypersphere*>& other_hyperspheres,
+                                             double c, int dim) {
+    ObjectiveTerms terms;
+    const std::vector<double>& weights = hypersphere.getAssignmentWeights();
+    terms.pos_part = c * std::accumulate(weights.begin(), weights.end(), 0.0);
+
+    int total_points = 0;
+    for (const auto& hs : other_hyperspheres) {
+        total_points += hs->numAssignments();
+    }
+    terms.points.resize(static_cast<size_t>(total_points) * dim);
+    double* out = terms.points.data();
+    for (const auto& hs : other_hyperspheres) {
+        for (int k = 0; k < hs->numAssignments(); ++k) {
+            // Single precision sources are widened straight into the block
+            const double* point = hs->getAssignmentPoint(k, out);
+            if (point != out) {
+                std::copy(point, point + dim, out);
+            }
+            out += dim;
+        }
+    }
+    terms.num_points = total_points;
+    terms.neg_scale = other_hyperspheres.empty() ? 0.0 : 1.0 / other_hyperspheres.size();
+    return terms;
+}
+
+// Objective value and its closed-form gradient w.r.t. the center in a single pass over the points
+static double objective_and_gradient(double radius, const double* center, const ObjectiveTerms& terms,
+                                     int dim, double& radius_gradient, double* center_gradient) {
+    std::fill(center_gradient, center_gradient + dim, 0.0);
+    double distance_sum = 0.0;
+    for (int k = 0; k < terms.num_points; ++k) {
+        const double* point = &terms.points[static_cast<size_t>(k) * dim];
+        double distance = std::sqrt(squared_norm(point, center, dim));
+        distance_sum += distance;
+        if (distance > 0.0) {
+            double inv_distance = 1.0 / distance;
+            for (int j = 0; j < dim; ++j) {
+                center_gradient[j] += (point[j] - center[j]) * inv_distance;
+            }
+        }
+    }
+    for (int j = 0; j < dim; ++j) {
+        center_gradient[j] *= terms.neg_scale;
+    }
+    radius_gradient = 2.0 * radius;
+    return radius * radius + terms.pos_part - terms.neg_scale * distance_sum;
+}
+
+// Objective of every hypersphere at its current center and radius against the other class, summed
+double total_objective(const std::vector<Hypersphere*>& hyperspheres,
+                       const std::vector<Hypersphere*>& other_hyperspheres,
+                       double c,
+                       int dim) {
+    if (hyperspheres.empty()) {
+        return 0.0;
+    }
+    // The points of the other class are the same for every sphere, only the positive part differs
+    ObjectiveTerms terms = gather_objective_terms(*hyperspheres[0], other_hyperspheres, c, dim);
+    std::vector<double> center_gradient(dim);
+    double radius_gradient;
+    double total = 0.0;
+    for (const Hypersphere* hs : hyperspheres) {
+        const std::vector<double>& weights = hs->getAssignmentWeights();
+        terms.pos_part = c * std::accumulate(weights.begin(), weights.end(), 0.0);
+        total += objective_and_gradient(hs->getRadius(), hs->getCenter().data(), terms, dim,
+                                        radius_gradient, center_gradient.data());
+    }
+    return total;
+}
+
+// Gradient descent with the analytic gradient, `learning_rate` step for at most `max_iterations`
+static int optimize_analytic(Hypersphere* hypersphere,
+                             std::vector<Hypersphere*>& other_hyperspheres,
+                             double c,
+                             double learning_rate,
+                             int max_iterations,
+                             double tolerance,
+                             int dim) {
+    ObjectiveTerms terms = gather_objective_terms(*hypersphere, other_hyperspheres, c, dim);
+
+    double radius = hypersphere->getRadius();
+    std::vector<double> center = hypersphere->getCenter();
+    std::vector<double> center_gradient(dim);
+    double radius_gradient;
+
+    double value = objective_and_gradient(radius, center.data(), terms, dim, radius_gradient, center_gradient.data());
+    int iteration = 0;
+    while (iteration < max_iterations) {
+        ++iteration;
+        radius -= learning_rate * radius_gradient;
+        for (int j = 0; j < dim; ++j) {
+            center[j] -= learning_rate * center_gradient[j];
+        }
+
+        double new_value = objective_and_gradient(radius, center.data(), terms, dim, radius_gradient, center_gradient.data());
+        bool converged = std::abs(value - new_value) < tolerance;
+        value = new_value;
+        if (converged) {
+            break;
+        }
+    }
+
+    hypersphere->setRadius(radius);
+    hypersphere->setCenter(center);
+    return iteration;
+}
+
+// objective_delta_stop_strategy that also counts the iterations dlib runs
+class counting_stop_strategy {
+public:
+    counting_stop_strategy(double tolerance, int max_iterations, int& iterations)
+        : inner(tolerance, max_iterations), iterations(iterations) {}
+
+    template <typename T>
+    bool should_continue_search(const T& x, const double funct_value, const T& funct_derivative) {
+        bool keep_going = inner.should_continue_search(x, funct_value, funct_derivative);
+        if (keep_going) {
+            ++iterations;
+        }
+        return keep_going;
+    }
+
+private:
+    dlib::objective_delta_stop_strategy inner;
+    int& iterations;
+};
+
+// BFGS with finite-difference derivatives, each gradient costs dim + 1 objective evaluations
+static int optimize_approximate(Hypersphere* hypersphere,
+                                std::vector<Hypersphere*>& other_hyperspheres,
+                                double c,
+                                int max_iterations,
+                                double tolerance,
+                                int dim) {
     dlib::matrix<double, 0, 1> initial_params(dim + 1);
     initial_params(0) = hypersphere->getRadius();
-    std::vector<double> center = hypersphere->getCenter();
+    const std::vector<double>& center = hypersphere->getCenter();
     for (int i = 0; i < dim; ++i) {
         initial_params(i + 1) = center[i];
     }
 
-   auto objective_wrapper = [&](const dlib::matrix<double, 0, 1>& params) -> double {
+    auto objective_wrapper = [&](const dlib::matrix<double, 0, 1>& params) -> double {
         return objective(params, *hypersphere, other_hyperspheres, c);
     };
 
+    int iterations = 0;
     dlib::find_min_using_approximate_derivatives(
         dlib::bfgs_search_strategy(),
-        dlib::objective_delta_stop_strategy(tolerance).be_verbose(),
+        counting_stop_strategy(tolerance, max_iterations, iterations),
         objective_wrapper,
         initial_params,
         -1
@@ -82,4 +220,19 @@ void optimize(Hypersphere* hypersphere,
         new_center[i] = initial_params(i + 1);
     }
     hypersphere->setCenter(new_center);
+    return iterations;
+}
+
+int optimize(Hypersphere* hypersphere,
+             std::vector<Hypersphere*>& other_hyperspheres,
+             double c,
+             double learning_rate,
+             int max_iterations,
+             double tolerance,
+             int dim,
+             OptimizerMode mode) {
+    if (mode == OptimizerMode::Approximate) {
+        return optimize_approximate(hypersphere, other_hyperspheres, c, max_iterations, tolerance, dim);
+    }
+    return optimize_analytic(hypersphere, other_hyperspheres, c, learning_rate, max_iterations, tolerance, dim);
 }
\ No newline at end of file
@@ -0,0 +1,65 @@
+#ifndef ELEMENT_MATRIX_H
+#define ELEMENT_MATRIX_H
+
+#include <cstddef>
+#include <memory>
+#include <vector>
+
+// Row-major (rows x cols) block of doubles or, in single precision mode, floats. It either
+// owns its storage or views a buffer kept alive by `owner` (e.g. a NumPy array), so it can be
+// shared between hyperspheres without copying. Rows may carry weights, e.g. landmarks standing
+// in for the points they summarize; without weights every row counts once.
+class ElementMatrix {
+private:
+    std::vector<double> storage;
+    std::vector<double> weight_storage;
+    std::shared_ptr<void> owner;
+    const double* values;
+    const float* float_values;
+    const double* row_weights;
+    int num_rows;
+    int num_cols;
+
+public:
+    ElementMatrix();
+    ElementMatrix(std::vector<double> data, int rows, int cols, std::vector<double> weights = {});
+    ElementMatrix(const double* data, int rows, int cols, std::shared_ptr<void> owner,
+                  const double* weights = nullptr);
+    ElementMatrix(const float* data, int rows, int cols, std::shared_ptr<void> owner,
+                  const double* weights = nullptr);
+
+    // `values` and `row_weights` may point into the owned storage, so copies would alias the source buffer
+    ElementMatrix(const ElementMatrix&) = delete;
+    ElementMatrix& operator=(const ElementMatrix&) = delete;
+    ElementMatrix(ElementMatrix&&) = default;
+    ElementMatrix& operator=(ElementMatrix&&) = default;
+
+    static ElementMatrix fromRows(const std::vector<std::vector<double>>& rows);
+
+    bool isSinglePrecision() const { return float_values != nullptr; }
+
+    // Typed access, data()/row() for double matrices and floatData()/floatRow() for single precision ones
+    const double* data() const { return values; }
+    const double* row(int i) const { return values + static_cast<size_t>(i) * num_cols; }
+    const float* floatData() const { return float_values; }
+    const float* floatRow(int i) const { return float_values + static_cast<size_t>(i) * num_cols; }
+
+    // Precision independent access, widening floats to double
+    double value(int i, int j) const {
+        size_t offset = static_cast<size_t>(i) * num_cols + j;
+        return float_values ? float_values[offset] : values[offset];
+    }
+    // Row i as doubles: a pointer into the matrix, or `buffer` (num_cols values) filled with the widened row
+    const double* rowAsDouble(int i, double* buffer) const;
+
+    int rows() const { return num_rows; }
+    int cols() const { return num_cols; }
+    bool empty() const { return num_rows == 0; }
+
+    const double* weights() const { return row_weights; }
+    double weight(int i) const { return row_weights ? row_weights[i] : 1.0; }
+    double totalWeight() const;
+    std::vector<double> mean() const;
+};
+
+#endif // ELEMENT_MATRIX_H
\ No newline at end of file
@@ -1,6 +1,7 @@
 #ifndef FUZZY_CONTRIBUTION_H
 #define FUZZY_CONTRIBUTION_H
 
+#include <memory>
 #include <vector>
 #include "hypersphere.h"
 
@@ -11,20 +12,57 @@ double rbf_kernel(const double* x, const double* x_prime, double sigma, int dim)
 
 double G(const double* x, const Hypersphere& hypersphere, int dim, double E);
 
+void set_counting(bool enabled);
+long long g_evaluations();
+long long kernel_evaluations();
+long long pruned_kernels();
+void reset_counters();
+
 double conformal_kernel(const double* x, const double* x_prime, const Hypersphere& hypersphere, double sigma, double E, int dim);
 
+double center_G(const Hypersphere& hypersphere, int dim, double E);
+
+double conformal_kernel_to_center(const double* x, double G_x, const Hypersphere& hypersphere, double sigma, double E, int dim);
+
+void compute_G_values(const double* data, int num_samples, int dim, const Hypersphere& hypersphere, double E,
+                      double* values);
+
+void compute_kernel_values(const double* data, int num_samples, int dim, const Hypersphere& hypersphere,
+                           double sigma, double E, double* values);
+
+void compute_G_cache(const std::shared_ptr<const ElementMatrix>& data, const std::vector<Hypersphere*>& hyperspheres,
+                     double E);
+
+void compute_G_tables(const ElementMatrix& data, const Hypersphere& hypersphere, const std::vector<double>& Es,
+                      double* values, int num_threads = 1);
+
 void fuzzy_contribution(
-    const double* x,
-    std::vector<Hypersphere>& positive_hyperspheres, std::vector<Hypersphere>& negative_hyperspheres,
+    const double* x, int index,
+    std::vector<Hypersphere*>& positive_hyperspheres, std::vector<Hypersphere*>& negative_hyperspheres,
     double gamma, double sigma, double E,
     int& assigned_class, double& contribution, int dim
 );
 
+void fuzzy_contribution_batch(
+    const std::shared_ptr<const ElementMatrix>& data, int start, int stop,
+    std::vector<Hypersphere*>& positive_hyperspheres, std::vector<Hypersphere*>& negative_hyperspheres,
+    double gamma, double sigma, double E,
+    int* assigned_classes, double* contributions
+);
+
 void predict(
     const double* transformed_data, int num_samples, int dim,
-    const std::vector<Hypersphere>& positive_hyperspheres,
-    const std::vector<Hypersphere>& negative_hyperspheres,
-    double sigma, int* predictions
+    const std::vector<Hypersphere*>& positive_hyperspheres,
+    const std::vector<Hypersphere*>& negative_hyperspheres,
+    double sigma, int* predictions, int num_threads = 1,
+    const double* positive_g = nullptr, const double* negative_g = nullptr
+);
+
+void class_scores(
+    const double* transformed_data, int num_samples, int dim,
+    const std::vector<std::vector<Hypersphere*>>& positive_hyperspheres,
+    const std::vector<std::vector<Hypersphere*>>& negative_hyperspheres,
+    double sigma, double* scores, int num_threads = 1
 );
 
 #endif // FUZZY_CONTRIBUTION_H
\ No newline at end of file
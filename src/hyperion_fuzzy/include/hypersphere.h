@@ -1,34 +1,129 @@
 #ifndef HYPERSPHERE_H
 #define HYPERSPHERE_H
 
+#include <memory>
+#include <mutex>
 #include <vector>
-#include <tuple>
+#include "element_matrix.h"
+#include "kd_tree.h"
+
+// Terms of the lower bound of G used to prune kernel evaluations, computed for one E
+// (see G_lower_bound in fuzzy_contribution.cpp)
+struct GBound {
+    double E = 0.0;
+    bool usable = false;
+    double total_weight = 0.0;
+    double a = 0.0;
+    std::vector<double> b;
+    // Norm of sum w_i |z_i| / s_i, which bounds the rounding of y.b
+    double b_abs_norm = 0.0;
+    double c = 0.0;
+    double relative_error = 0.0;
+    double shrink = 1.0;
+    // Truncated G may fall this far below the exact value
+    double slack = 0.0;
+};
+
+// |e|^2 and |ux - e|^2 of every initial element, the element side of the blocked squared distances
+// (see G_block in fuzzy_contribution.cpp)
+struct ElementTerms {
+    std::vector<double> norms;
+    std::vector<double> ux_distance2;
+};
+
+// Assignments as rows of the training matrix they point into, stored as parallel arrays
+struct Assignments {
+    std::vector<int> indices;
+    std::vector<int> labels;
+    std::vector<double> weights;
+};
 
 class Hypersphere {
 private:
-    std::vector<std::vector<double>> initial_elements;
+    std::shared_ptr<const ElementMatrix> initial_elements;
     std::vector<double> center;
     double radius;
-    std::vector<std::tuple<std::vector<double>, int, double>> assignments;
+    std::shared_ptr<const ElementMatrix> assignment_source;
+    // Shared with the arrays handed out by shareAssignments, see ownAssignments
+    std::shared_ptr<Assignments> assignments = std::make_shared<Assignments>();
     std::vector<double> ux;
 
+    // Conformal factor caches, G only depends on initial_elements and ux. g_cache is shared by
+    // spheres with the same G (see sharesG)
+    std::shared_ptr<const std::vector<double>> g_cache;
+    double g_cache_E = 0.0;
+    // Matrix whose rows g_cache holds G of, kept alive so no other matrix can take its address
+    std::shared_ptr<const ElementMatrix> g_cache_source;
+    mutable double center_g = 0.0;
+    mutable double center_g_E = 0.0;
+    mutable bool center_g_valid = false;
+    mutable GBound g_bound;
+    mutable bool g_bound_valid = false;
+    mutable ElementTerms element_terms;
+    mutable bool element_terms_valid = false;
+    // Held while filling the caches above for scoring on several threads (see prepare_for_scoring)
+    mutable std::mutex cache_mutex;
+
+    // Optional spatial index over initial_elements for truncated evaluation of G
+    std::shared_ptr<const KDTree> element_index;
+    double index_tolerance = 0.0;
+
     void computeUx();
+    void resetElementState();
+    void ownAssignments(bool keep);
 
 public:
+    Hypersphere(const std::vector<double>& center, double radius,
+                std::shared_ptr<const ElementMatrix> initial_elements);
+    Hypersphere(const std::vector<double>& center, double radius,
+                std::shared_ptr<const ElementMatrix> initial_elements, std::vector<double> ux);
     Hypersphere(const std::vector<double>& center, double radius, 
                 const std::vector<std::vector<double>>& initial_elements);
 
     void setCenter(const std::vector<double>& new_center);
-    std::vector<double> getCenter() const;
+    const std::vector<double>& getCenter() const;
 
     void setRadius(double new_radius);
     double getRadius() const;
 
-    std::vector<double> getUx() const;
-    const std::vector<std::vector<double>>& getInitialElements() const;
-    const std::vector<std::tuple<std::vector<double>, int, double>>& getAssignments() const;
+    const std::vector<double>& getUx() const;
+    void setInitialElements(std::shared_ptr<const ElementMatrix> elements);
+    void setInitialElements(std::shared_ptr<const ElementMatrix> elements, std::vector<double> ux);
+    const ElementMatrix& getInitialElements() const;
+    std::shared_ptr<const ElementMatrix> getSharedInitialElements() const;
 
-    void addAssignment(const std::vector<double>& array, int value, double weight);
+    void setAssignmentSource(std::shared_ptr<const ElementMatrix> source);
+    const ElementMatrix* getAssignmentSource() const;
+    void reserveAssignments(int capacity);
+    void addAssignment(int index, int value, double weight);
     void clearAssignments();
+
+    int numAssignments() const;
+    const double* getAssignmentPoint(int k, double* buffer) const;
+    const std::vector<int>& getAssignmentIndices() const;
+    const std::vector<int>& getAssignmentLabels() const;
+    const std::vector<double>& getAssignmentWeights() const;
+    std::shared_ptr<const Assignments> shareAssignments() const;
+
+    void setElementIndex(std::shared_ptr<const KDTree> index, double tolerance);
+    const KDTree* getElementIndex() const;
+    double getIndexTolerance() const;
+
+    bool sharesG(const Hypersphere& other) const;
+    void setGCache(std::shared_ptr<const ElementMatrix> source, std::shared_ptr<const std::vector<double>> values,
+                   double E);
+    const double* getGCache(const ElementMatrix* source, double E) const;
+    void clearGCache();
+
+    bool getCenterG(double E, double& value) const;
+    void setCenterG(double E, double value) const;
+
+    const GBound* getGBound(double E) const;
+    void setGBound(GBound bound) const;
+
+    const ElementTerms* getElementTerms() const;
+    void setElementTerms(ElementTerms terms) const;
+
+    std::mutex& getCacheMutex() const;
 };
 #endif // HYPERSPHERE_H
\ No newline at end of file
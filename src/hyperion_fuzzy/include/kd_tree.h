@@ -0,0 +1,89 @@
+#ifndef KD_TREE_H
+#define KD_TREE_H
+
+#include <cmath>
+#include <memory>
+#include <vector>
+#include "element_matrix.h"
+
+// KD-tree over the rows of an ElementMatrix for truncated evaluation of the conformal
+// factor G. Besides its bounding box, every node keeps the largest |ux - e|^2 of its
+// elements, which bounds the G terms of the whole subtree.
+class KDTree {
+private:
+    struct Node {
+        int begin;
+        int end;
+        int left;
+        int right;
+        double max_ux_distance2;
+    };
+
+    std::shared_ptr<const ElementMatrix> elements;
+    std::vector<double> ux;
+    std::vector<int> order;
+    std::vector<double> ux_distance2;
+    std::vector<Node> nodes;
+    std::vector<double> bounds;
+    int leaf_size;
+
+    int build(int begin, int end);
+    double boxDistance2(int node, const double* x) const;
+
+    template <typename T>
+    static double squaredDistance(const T* element, const double* x, int dim) {
+        double distance2 = 0.0;
+        for (int j = 0; j < dim; ++j) {
+            double diff = element[j] - x[j];
+            distance2 += diff * diff;
+        }
+        return distance2;
+    }
+
+public:
+    explicit KDTree(std::shared_ptr<const ElementMatrix> elements, int leaf_size = 16);
+    KDTree(std::shared_ptr<const ElementMatrix> elements, std::vector<double> ux, int leaf_size = 16);
+
+    const ElementMatrix& getElements() const { return *elements; }
+    std::shared_ptr<const ElementMatrix> getSharedElements() const { return elements; }
+    const std::vector<double>& getUx() const { return ux; }
+
+    // Calls visit(row, squared_distance, squared_ux_distance) for every element of the subtrees
+    // that may hold a term exp(-|e - x|^2 / (|ux - e|^2 + E)) of at least `cutoff`
+    template <typename Visitor>
+    void search(const double* x, double E, double cutoff, Visitor&& visit) const;
+};
+
+template <typename Visitor>
+void KDTree::search(const double* x, double E, double cutoff, Visitor&& visit) const {
+    if (nodes.empty()) {
+        return;
+    }
+    int dim = elements->cols();
+    double log_cutoff = std::log(cutoff);
+
+    // Balanced median splits keep the depth below 64 for any int-sized matrix
+    int stack[128];
+    int top = 0;
+    stack[top++] = 0;
+    while (top > 0) {
+        int node_index = stack[--top];
+        const Node& node = nodes[node_index];
+        // Every term in the subtree is at most exp(-box_distance2 / (max_ux_distance2 + E))
+        if (boxDistance2(node_index, x) > -(node.max_ux_distance2 + E) * log_cutoff) {
+            continue;
+        }
+        if (node.left < 0) {
+            for (int k = node.begin; k < node.end; ++k) {
+                double distance2 = elements->isSinglePrecision() ? squaredDistance(elements->floatRow(order[k]), x, dim)
+                                                                 : squaredDistance(elements->row(order[k]), x, dim);
+                visit(order[k], distance2, ux_distance2[k]);
+            }
+            continue;
+        }
+        stack[top++] = node.right;
+        stack[top++] = node.left;
+    }
+}
+
+#endif // KD_TREE_H
\ No newline at end of file
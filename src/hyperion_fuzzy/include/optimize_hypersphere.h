@@ -4,13 +4,27 @@
 #include <vector>
 #include "hypersphere.h"
 
-// Declare the optimize function
-void optimize(Hypersphere* hypersphere,
-              std::vector<Hypersphere*>& other_hyperspheres,
-              double c,
-              double learning_rate,
-              int max_iterations,
-              double tolerance,
-              int dim);
+// Analytic: gradient descent with the closed-form gradient, honoring learning_rate
+// Approximate: dlib BFGS with finite-difference derivatives
+enum class OptimizerMode {
+    Analytic,
+    Approximate
+};
+
+// Declare the optimize function, returns the number of iterations run
+int optimize(Hypersphere* hypersphere,
+             std::vector<Hypersphere*>& other_hyperspheres,
+             double c,
+             double learning_rate,
+             int max_iterations,
+             double tolerance,
+             int dim,
+             OptimizerMode mode = OptimizerMode::Analytic);
+
+// Sum of the objective of every hypersphere at its current center and radius
+double total_objective(const std::vector<Hypersphere*>& hyperspheres,
+                       const std::vector<Hypersphere*>& other_hyperspheres,
+                       double c,
+                       int dim);
 
 #endif // OPTIMIZE_HYPERSPHERE_H
\ No newline at end of file
@@ -0,0 +1,83 @@
+import contextlib
+import sys
+import time
+
+from .wrappers import count_evaluations, evaluation_counts
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def peak_rss_kib():
+    """Peak resident set size of the process in KiB, or None where getrusage is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Instrumentation:
+    """
+    Collects per-phase wall time, counters and the peak RSS of one fit.
+    `finish` returns the stats and hands them to `callback` when one is set.
+    """
+
+    enabled = True
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.phases = {}
+        self.counters = {}
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        count_evaluations(True)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self) -> dict:
+        count_evaluations(False, reset=False)
+        self.counters.update(evaluation_counts())
+        stats = {
+            "seconds": time.perf_counter() - self._start,
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "peak_rss_kib": peak_rss_kib(),
+        }
+        if self.callback is not None:
+            self.callback(stats)
+        return stats
+
+
+class _DisabledInstrumentation:
+    """Stand-in used when instrumentation is off, every hook is a no-op."""
+
+    enabled = False
+
+    def start(self):
+        pass
+
+    def phase(self, name: str):
+        return contextlib.nullcontext()
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def finish(self):
+        return None
+
+
+DISABLED = _DisabledInstrumentation()
\ No newline at end of file
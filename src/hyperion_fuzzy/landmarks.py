@@ -0,0 +1,59 @@
+import numpy as np
+
+from .wrappers import Hypersphere, element_matrix, compute_g
+
+
+def summarize(data: np.ndarray, num_landmarks: int, seed=None, weights: np.ndarray = None):
+    """
+    Summarize the rows of `data` into at most `num_landmarks` weighted landmarks.
+    Returns k-means centroids and the number of rows each one stands for, so the
+    weighted mean of the landmarks is the mean of `data`. Rows with `weights` count
+    as that many rows, which lets landmarks be merged with new data.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    weights = np.ones(data.shape[0]) if weights is None else np.asarray(weights, dtype=np.float64)
+    if num_landmarks >= data.shape[0]:
+        return data, weights
+
+    # SciPy is only needed here, importing it up front would slow down every import of the package
+    from scipy.cluster.vq import kmeans2
+
+    _, labels = kmeans2(data, num_landmarks, minit="++", seed=seed)
+
+    # Recompute the centroids from the final labels so they are exact (weighted) cluster means
+    counts = np.bincount(labels, weights=weights, minlength=num_landmarks)
+    sums = np.zeros((num_landmarks, data.shape[1]))
+    np.add.at(sums, labels, data * weights[:, None])
+    keep = counts > 0
+    return np.ascontiguousarray(sums[keep] / counts[keep, None]), counts[keep]
+
+
+def kmeans_plus_plus(data: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Pick k rows of `data` by k-means++ seeding: the first uniformly, each next one with probability
+    proportional to its squared distance to the closest row picked so far.
+    """
+    picks = [rng.integers(data.shape[0])]
+    closest = np.einsum("ij,ij->i", data - data[picks[0]], data - data[picks[0]])
+    for _ in range(1, k):
+        total = closest.sum()
+        # Once every row coincides with a pick, fall back to uniform draws
+        pick = rng.choice(data.shape[0], p=closest / total) if total > 0 else rng.integers(data.shape[0])
+        picks.append(pick)
+        diff = data - data[pick]
+        closest = np.minimum(closest, np.einsum("ij,ij->i", diff, diff))
+    return data[picks]
+
+
+def g_error(sample: np.ndarray, exact_elements, landmark_elements, E: float) -> dict:
+    """Relative error of G over the landmarks against exact G over every element, at the rows of `sample`."""
+    sample = np.ascontiguousarray(sample, dtype=np.float64)
+    origin = np.zeros(sample.shape[1])
+    exact = compute_g(sample, Hypersphere(origin, 0.0, exact_elements), E)
+    approximate = compute_g(sample, Hypersphere(origin, 0.0, landmark_elements), E)
+
+    relative_error = np.abs(approximate - exact) / np.maximum(exact, np.finfo(np.float64).tiny)
+    return {
+        "max_relative_error": float(relative_error.max(initial=0.0)),
+        "mean_relative_error": float(relative_error.mean()) if relative_error.size else 0.0,
+    }
\ No newline at end of file
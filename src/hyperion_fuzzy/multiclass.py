@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .HyperionFuzzy import HyperionFuzzy
+from .wrappers import class_scores
+
+
+def _share(array: np.ndarray):
+    """Copy `array` into a new shared memory block, returning the block and what a worker needs to attach to it."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _fit_class(transformed, codes, code, seed, params):
+    """Train the binary model of class `code` on transformed rows, its rows labeled 1 and every other row -1."""
+    model = HyperionFuzzy(random_state=int(seed), **params)
+    model._prime_transform_cache(transformed, transformed)
+    model.train(transformed, np.where(codes == code, 1, -1))
+    return model
+
+
+def _fit_shared(data_spec, codes_spec, code, seed, params, path):
+    """Worker side of `OneVsRestHyperionFuzzy.fit`: train on the shared arrays and save the model to `path`."""
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in (data_spec, codes_spec)]
+    try:
+        transformed, codes = (np.ndarray(shape, dtype, buffer=block.buf)
+                              for block, (_, shape, dtype) in zip(blocks, (data_spec, codes_spec)))
+        model = _fit_class(transformed, codes, code, seed, params)
+        # The parent restores `params` on the loaded model, so a transform `save` cannot store is left out
+        model.feature_transform = "exp"
+        model.save(path)
+        # The views must go before the blocks can be closed
+        del transformed, codes
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class OneVsRestHyperionFuzzy:
+    """
+    Multi-class HyperionFuzzy: one binary model per class, trained with that class labeled 1 and
+    every other class -1. `params` are passed to each HyperionFuzzy.
+    """
+
+    def __init__(self, n_jobs=None, random_state=None, **params):
+        """
+        `n_jobs` classes are trained at once in worker processes (-1 for one per core, None for
+        in this process). Workers read the transformed training rows from shared memory instead of receiving
+        a pickled copy each. `random_state` seeds the initialization of every class, so results
+        do not depend on `n_jobs`.
+        """
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.params = params
+        self.classes_ = None
+        self.models = []
+
+    def fit(self, data, labels):
+        """
+        Train one model per distinct label, given as NumPy arrays or as a DataFrame and Series.
+        The rows are transformed once and every class trains on the same transformed matrix.
+        """
+        transformed = HyperionFuzzy(**self.params).transform(data)
+        classes, codes = np.unique(np.asarray(labels), return_inverse=True)
+        if len(classes) < 2:
+            raise ValueError("labels must hold at least two classes")
+        seeds = np.random.SeedSequence(self.random_state).generate_state(len(classes))
+
+        processes = self._num_processes(len(classes))
+        if processes == 1:
+            self.models = [_fit_class(transformed, codes, code, seed, self.params) for code, seed in enumerate(seeds)]
+        else:
+            self.models = self._fit_pool(transformed, codes, seeds, processes)
+        self.classes_ = classes
+        return self
+
+    def _num_processes(self, num_classes: int) -> int:
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return min(os.cpu_count() or 1, num_classes)
+        return max(min(int(self.n_jobs), num_classes), 1)
+
+    def _fit_pool(self, transformed, codes, seeds, processes):
+        """Train the classes in `processes` worker processes, which hand their models back as saved files."""
+        data_block, data_spec = _share(transformed)
+        codes_block, codes_spec = _share(codes)
+        try:
+            with tempfile.TemporaryDirectory() as directory, \
+                    ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+                paths = [os.path.join(directory, f"class_{code}.hfz") for code in range(len(seeds))]
+                futures = [pool.submit(_fit_shared, data_spec, codes_spec, code, int(seed), self.params, path)
+                           for code, (seed, path) in enumerate(zip(seeds, paths))]
+                for future in futures:
+                    future.result()
+                models = [HyperionFuzzy.load(path) for path in paths]
+        finally:
+            for block in (data_block, codes_block):
+                block.close()
+                block.unlink()
+        # Callables such as the feature transform or an instrument callback do not survive `save`
+        template = HyperionFuzzy(**self.params)
+        for model in models:
+            for name in self.params:
+                setattr(model, name, getattr(template, name))
+        return models
+
+    def decision_function(self, new_data, n_jobs=None) -> np.ndarray:
+        """
+        Score every class for every row in one native pass, split across `n_jobs` threads. A class
+        scores above 0 where its binary model would predict 1.
+        """
+        transformed_data = self.models[0].transform(new_data)
+        return class_scores(transformed_data, [(m.positive_hyperspheres, m.negative_hyperspheres) for m in self.models],
+                            self.models[0].sigma, n_jobs)
+
+    def predict(self, new_data, n_jobs=None) -> np.ndarray:
+        """Predict the class with the highest score, the first of them on ties."""
+        return self.classes_[np.argmax(self.decision_function(new_data, n_jobs), axis=1)]
\ No newline at end of file
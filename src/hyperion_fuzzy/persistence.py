@@ -0,0 +1,160 @@
+import inspect
+import json
+
+import numpy as np
+
+from .transforms import TRANSFORMS
+from .wrappers import Hypersphere, element_index, element_matrix
+
+# File layout: MAGIC, little-endian uint32 format version and header length, the JSON header,
+# then every array as little-endian float64 (float32 for single precision elements), each
+# starting on an ALIGNMENT byte boundary
+MAGIC = b"HYPFUZZ\0"
+FORMAT_VERSION = 2
+# Version 1 files predate single precision and hold float64 arrays only
+READABLE_VERSIONS = (1, 2)
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _stored_seed(random_state):
+    """
+    `random_state` as the int or None a header can hold. A root SeedSequence is stored as its entropy;
+    the state of a Generator or of a spawned SeedSequence cannot be written as a seed and is dropped.
+    """
+    if isinstance(random_state, (int, np.integer)) and not isinstance(random_state, bool):
+        return int(random_state)
+    if isinstance(random_state, np.random.SeedSequence) and not random_state.spawn_key \
+            and isinstance(random_state.entropy, int):
+        return random_state.entropy
+    return None
+
+
+def _stored_transform(transform) -> str:
+    """The name a built-in `feature_transform` is saved under; other transforms cannot be stored."""
+    if isinstance(transform, str):
+        return transform
+    for name, builtin in TRANSFORMS.items():
+        if type(transform) is type(builtin):
+            return name
+    raise ValueError(f"Cannot save feature_transform {transform!r}, only the built-in {tuple(TRANSFORMS)} can be "
+                     "stored")
+
+
+def save_model(model, path):
+    """
+    Write the hyperparameters and hyperspheres of a trained HyperionFuzzy to `path`.
+    Initial elements shared by several spheres are stored once. `random_state` is saved as an int,
+    or as None when it is a Generator or spawned SeedSequence (see `_stored_seed`). `feature_transform`
+    is saved by name, and a transform other than the built-in ones raises ValueError.
+    """
+    arrays = []
+    element_blocks = {}
+
+    def add_array(values, dtype="<f8"):
+        values = np.ascontiguousarray(values, dtype=dtype)
+        arrays.append(values)
+        return {"array": len(arrays) - 1, "shape": list(values.shape), "dtype": values.dtype.str}
+
+    def add_elements(hs):
+        matrix = hs.instance.get_initial_elements()
+        rows = np.asarray(matrix)
+        key = rows.__array_interface__["data"][0]
+        if key not in element_blocks:
+            element_blocks[key] = {
+                "rows": add_array(rows, rows.dtype.newbyteorder("<")),
+                "weights": None if matrix.weights is None else add_array(matrix.weights),
+            }
+        return list(element_blocks).index(key)
+
+    spheres = []
+    for name, hyperspheres in (("positive", model.positive_hyperspheres), ("negative", model.negative_hyperspheres)):
+        for hs in hyperspheres:
+            spheres.append({
+                "class": name,
+                "radius": hs.get_radius(),
+                "center": add_array(hs.get_center()),
+                "ux": add_array(hs.get_ux()),
+                "elements": add_elements(hs),
+            })
+
+    # Callables (e.g. an instrumentation callback) cannot be stored and fall back to their defaults
+    parameters = {name: getattr(model, name) for name in inspect.signature(type(model).__init__).parameters
+                  if name != "self" and (name == "feature_transform" or not callable(getattr(model, name)))}
+    if "feature_transform" in parameters:
+        parameters["feature_transform"] = _stored_transform(parameters["feature_transform"])
+    if "dtype" in parameters:
+        parameters["dtype"] = np.dtype(parameters["dtype"]).name
+    if "random_state" in parameters:
+        parameters["random_state"] = _stored_seed(parameters["random_state"])
+    header = {"parameters": parameters, "landmark_error": model.landmark_error,
+              "elements": list(element_blocks.values()), "spheres": spheres, "arrays": []}
+
+    # Array offsets are relative to the aligned end of the header, so they do not depend on its length
+    offset = 0
+    for values in arrays:
+        header["arrays"].append({"offset": offset, "nbytes": values.nbytes})
+        offset = _align(offset + values.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.array([FORMAT_VERSION, len(header_bytes)], dtype="<u4").tobytes())
+        file.write(header_bytes)
+        for values, entry in zip(arrays, header["arrays"]):
+            file.seek(data_start + entry["offset"])
+            file.write(values.tobytes())
+
+
+def load_model(cls, path, mmap: bool = False):
+    """
+    Rebuild a model of class `cls` saved by `save_model`. With `mmap`, initial elements stay in the
+    memory-mapped file and are used by the native hyperspheres without being copied or read up front.
+    """
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a saved HyperionFuzzy model")
+    version, header_length = np.frombuffer(buffer, dtype="<u4", count=2, offset=len(MAGIC))
+    if version not in READABLE_VERSIONS:
+        raise ValueError(f"Unsupported model format version {version}, expected one of {READABLE_VERSIONS}")
+    header_start = len(MAGIC) + 8
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode("utf-8"))
+    data_start = _align(header_start + int(header_length))
+
+    def get_array(ref):
+        entry = header["arrays"][ref["array"]]
+        dtype = np.dtype(ref.get("dtype", "<f8"))
+        values = np.frombuffer(buffer, dtype=dtype, count=entry["nbytes"] // dtype.itemsize,
+                               offset=data_start + entry["offset"])
+        return values.reshape(ref["shape"])
+
+    model = cls(**header["parameters"])
+    model.landmark_error = header["landmark_error"]
+    elements = [element_matrix(get_array(block["rows"]), None if block["weights"] is None else get_array(block["weights"]),
+                               get_array(block["rows"]).dtype)
+                for block in header["elements"]]
+
+    for sphere in header["spheres"]:
+        hs = Hypersphere(np.array(get_array(sphere["center"])), sphere["radius"], elements[sphere["elements"]],
+                         get_array(sphere["ux"]))
+        (model.positive_hyperspheres if sphere["class"] == "positive" else model.negative_hyperspheres).append(hs)
+
+    if model.g_tolerance > 0:
+        hyperspheres = model.positive_hyperspheres + model.negative_hyperspheres
+        for i, matrix in enumerate(elements):
+            users = [hs for sphere, hs in zip(header["spheres"], hyperspheres) if sphere["elements"] == i]
+            if not users:
+                continue
+            # The saved ux may be a running mean (see `update`), not bit for bit the mean of the matrix
+            index = element_index(matrix, ux=users[0].get_ux())
+            for hs in users:
+                hs.set_element_index(index, model.g_tolerance)
+    return model
\ No newline at end of file
@@ -2,17 +2,21 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/numpy.h>
+#include <optional>
 #include <vector>
 
 namespace py = pybind11;
 
-PYBIND11_MODULE(fuzzy_contribution_module, m) {
+// Known G(x) of every row, one value per row
+using GValues = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+PYBIND11_MODULE(fuzzy_module, m) {
     m.doc() = "Fuzzy contribution module";
 
     // Wrap the fuzzy_contribution function
-    m.def("fuzzy_contribution", [](const py::array_t<double>& x,
-                                   std::vector<Hypersphere>& positive_hyperspheres,
-                                   std::vector<Hypersphere>& negative_hyperspheres,
+    m.def("fuzzy_contribution", [](const py::array_t<double>& x, int index,
+                                   std::vector<Hypersphere*>& positive_hyperspheres,
+                                   std::vector<Hypersphere*>& negative_hyperspheres,
                                    double gamma, double sigma, double E) {
         py::buffer_info x_buf = x.request();
         if (x_buf.ndim != 1) {
@@ -24,19 +28,114 @@ PYBIND11_MODULE(fuzzy_contribution_module, m) {
         int assigned_class;
         double contribution;
 
-        fuzzy_contribution(x_ptr, positive_hyperspheres, negative_hyperspheres,
+        fuzzy_contribution(x_ptr, index, positive_hyperspheres, negative_hyperspheres,
                           gamma, sigma, E, assigned_class, contribution, dim);
 
         return py::make_tuple(assigned_class, contribution);
-    }, py::arg("x"), py::arg("positive_hyperspheres"), py::arg("negative_hyperspheres"),
+    }, py::arg("x"), py::arg("index"), py::arg("positive_hyperspheres"), py::arg("negative_hyperspheres"),
        py::arg("gamma"), py::arg("sigma"), py::arg("E"),
        "This function assigns a class based on fuzzy contribution.");
 
+    // Wrap the batched fuzzy_contribution function
+    m.def("fuzzy_contribution_batch", [](std::shared_ptr<ElementMatrix> data,
+                                         std::vector<Hypersphere*>& positive_hyperspheres,
+                                         std::vector<Hypersphere*>& negative_hyperspheres,
+                                         double gamma, double sigma, double E, int start, int stop) {
+        int num_samples = data->rows();
+        if (stop < 0 || stop > num_samples) {
+            stop = num_samples;
+        }
+        if (start < 0 || start > stop) {
+            throw std::out_of_range("start must lie in [0, stop]");
+        }
+        std::shared_ptr<const ElementMatrix> matrix(std::move(data));
+
+        py::array_t<int> assigned_classes(stop - start);
+        py::array_t<double> contributions(stop - start);
+        int* classes_ptr = assigned_classes.mutable_data();
+        double* contributions_ptr = contributions.mutable_data();
+
+        {
+            py::gil_scoped_release release;
+            fuzzy_contribution_batch(matrix, start, stop, positive_hyperspheres, negative_hyperspheres,
+                                     gamma, sigma, E, classes_ptr, contributions_ptr);
+        }
+
+        return py::make_tuple(assigned_classes, contributions);
+    }, py::arg("data"), py::arg("positive_hyperspheres"), py::arg("negative_hyperspheres"),
+       py::arg("gamma"), py::arg("sigma"), py::arg("E"), py::arg("start") = 0, py::arg("stop") = -1,
+       "This function assigns classes and contributions for rows [start, stop) of an ElementMatrix in one call.");
+
+    // Wrap the conformal factor G over a batch of rows
+    m.def("compute_g", [](const py::array_t<double, py::array::c_style | py::array::forcecast>& data,
+                          const Hypersphere& hypersphere, double E) {
+        py::buffer_info data_buf = data.request();
+        if (data_buf.ndim != 2) {
+            throw std::runtime_error("data must be a 2D array");
+        }
+        int num_samples = data_buf.shape[0];
+        int dim = data_buf.shape[1];
+        const double* data_ptr = static_cast<double*>(data_buf.ptr);
+
+        py::array_t<double> values(num_samples);
+        double* values_ptr = values.mutable_data();
+        {
+            py::gil_scoped_release release;
+            compute_G_values(data_ptr, num_samples, dim, hypersphere, E, values_ptr);
+        }
+        return values;
+    }, py::arg("data"), py::arg("hypersphere"), py::arg("E"),
+       "This function evaluates the conformal factor G of the hypersphere at every row of data.");
+
+    // Wrap the conformal kernel to the center over a batch of rows
+    m.def("compute_kernel", [](const py::array_t<double, py::array::c_style | py::array::forcecast>& data,
+                               const Hypersphere& hypersphere, double sigma, double E) {
+        py::buffer_info data_buf = data.request();
+        if (data_buf.ndim != 2) {
+            throw std::runtime_error("data must be a 2D array");
+        }
+        int num_samples = data_buf.shape[0];
+        int dim = data_buf.shape[1];
+        const double* data_ptr = static_cast<double*>(data_buf.ptr);
+
+        py::array_t<double> values(num_samples);
+        double* values_ptr = values.mutable_data();
+        {
+            py::gil_scoped_release release;
+            compute_kernel_values(data_ptr, num_samples, dim, hypersphere, sigma, E, values_ptr);
+        }
+        return values;
+    }, py::arg("data"), py::arg("hypersphere"), py::arg("sigma"), py::arg("E"),
+       "This function evaluates the conformal kernel between every row of data and the hypersphere center.");
+
+    // Wrap the G cache precomputation
+    m.def("compute_g_cache", [](std::shared_ptr<ElementMatrix> data, const std::vector<Hypersphere*>& hyperspheres,
+                                double E) {
+        std::shared_ptr<const ElementMatrix> matrix(std::move(data));
+        py::gil_scoped_release release;
+        compute_G_cache(matrix, hyperspheres, E);
+    }, py::arg("data"), py::arg("hyperspheres"), py::arg("E"),
+       "This function caches the conformal factor G of every row of the training matrix on the hyperspheres, once for spheres with the same G.");
+
+    // Wrap the G tables of several E values
+    m.def("compute_g_tables", [](std::shared_ptr<ElementMatrix> data, const Hypersphere& hypersphere,
+                                 const std::vector<double>& Es, int num_threads) {
+        py::array_t<double> values({static_cast<py::ssize_t>(Es.size()), static_cast<py::ssize_t>(data->rows())});
+        double* values_ptr = values.mutable_data();
+        {
+            py::gil_scoped_release release;
+            compute_G_tables(*data, hypersphere, Es, values_ptr, num_threads);
+        }
+        return values;
+    }, py::arg("data"), py::arg("hypersphere"), py::arg("Es"), py::arg("num_threads") = 1,
+       "This function evaluates the conformal factor G of every row of the matrix for each E, sharing the distances between them.");
+
     // Wrap the predict function
-    m.def("predict", [](const py::array_t<double>& transformed_data,
-                        const std::vector<Hypersphere>& positive_hyperspheres,
-                        const std::vector<Hypersphere>& negative_hyperspheres,
-                        double sigma) {
+    m.def("predict", [](const py::array_t<double, py::array::c_style | py::array::forcecast>& transformed_data,
+                        const std::vector<Hypersphere*>& positive_hyperspheres,
+                        const std::vector<Hypersphere*>& negative_hyperspheres,
+                        double sigma, int num_threads, std::optional<GValues> positive_g,
+                        std::optional<GValues> negative_g) {
         py::buffer_info data_buf = transformed_data.request();
         if (data_buf.ndim != 2) {
             throw std::runtime_error("transformed_data must be a 2D array");
@@ -44,12 +143,67 @@ PYBIND11_MODULE(fuzzy_contribution_module, m) {
         int num_samples = data_buf.shape[0];
         int dim = data_buf.shape[1];
         const double* data_ptr = static_cast<double*>(data_buf.ptr);
+        for (const std::optional<GValues>* g : {&positive_g, &negative_g}) {
+            if (*g && (*g)->size() != num_samples) {
+                throw std::runtime_error("G values must have one entry per row of transformed_data");
+            }
+        }
+        const double* positive_g_ptr = positive_g ? positive_g->data() : nullptr;
+        const double* negative_g_ptr = negative_g ? negative_g->data() : nullptr;
 
-        std::vector<int> predictions(num_samples);
-        predict(data_ptr, num_samples, dim, positive_hyperspheres, negative_hyperspheres, sigma, predictions.data());
+        py::array_t<int> predictions(num_samples);
+        int* predictions_ptr = predictions.mutable_data();
+
+        {
+            py::gil_scoped_release release;
+            predict(data_ptr, num_samples, dim, positive_hyperspheres, negative_hyperspheres, sigma,
+                    predictions_ptr, num_threads, positive_g_ptr, negative_g_ptr);
+        }
 
         return predictions;
     }, py::arg("transformed_data"), py::arg("positive_hyperspheres"), py::arg("negative_hyperspheres"),
-       py::arg("sigma"),
-       "This function predicts classes for transformed data.");
+       py::arg("sigma"), py::arg("num_threads") = 1, py::arg("positive_g") = py::none(),
+       py::arg("negative_g") = py::none(),
+       "This function predicts classes for transformed data, splitting rows across num_threads threads.");
+
+    // Wrap the one-vs-rest scoring of several binary models
+    m.def("class_scores", [](const py::array_t<double, py::array::c_style | py::array::forcecast>& transformed_data,
+                             const std::vector<std::vector<Hypersphere*>>& positive_hyperspheres,
+                             const std::vector<std::vector<Hypersphere*>>& negative_hyperspheres,
+                             double sigma, int num_threads) {
+        py::buffer_info data_buf = transformed_data.request();
+        if (data_buf.ndim != 2) {
+            throw std::runtime_error("transformed_data must be a 2D array");
+        }
+        if (positive_hyperspheres.size() != negative_hyperspheres.size()) {
+            throw std::runtime_error("every class needs both positive and negative hyperspheres");
+        }
+        int num_samples = data_buf.shape[0];
+        int dim = data_buf.shape[1];
+        const double* data_ptr = static_cast<double*>(data_buf.ptr);
+
+        py::array_t<double> scores({static_cast<py::ssize_t>(num_samples),
+                                    static_cast<py::ssize_t>(positive_hyperspheres.size())});
+        double* scores_ptr = scores.mutable_data();
+
+        {
+            py::gil_scoped_release release;
+            class_scores(data_ptr, num_samples, dim, positive_hyperspheres, negative_hyperspheres, sigma,
+                         scores_ptr, num_threads);
+        }
+
+        return scores;
+    }, py::arg("transformed_data"), py::arg("positive_hyperspheres"), py::arg("negative_hyperspheres"),
+       py::arg("sigma"), py::arg("num_threads") = 1,
+       "This function scores every class of a one-vs-rest model for transformed data in one pass over the rows.");
+
+    // Process-wide counters of G and kernel evaluations, only incremented while counting is enabled
+    m.def("set_counting", &set_counting, py::arg("enabled"),
+          "This function enables or disables counting G and kernel evaluations.");
+    m.def("g_evaluations", &g_evaluations, "This function returns the number of G evaluations counted.");
+    m.def("kernel_evaluations", &kernel_evaluations,
+          "This function returns the number of kernels to sphere centers evaluated while searching for the nearest sphere.");
+    m.def("pruned_kernels", &pruned_kernels,
+          "This function returns the number of kernels to sphere centers skipped because their bound ruled the sphere out.");
+    m.def("reset_counters", &reset_counters, "This function resets the evaluation counters.");
 }
\ No newline at end of file
@@ -1,23 +1,161 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include <optional>
+#include <utility>
 #include "../include/hypersphere.h"
 
 namespace py = pybind11;
 
+using DoubleArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+using FloatArray = py::array_t<float, py::array::c_style | py::array::forcecast>;
+
+// Read-only NumPy view of one array of `assignments`, which the view keeps alive. The sphere
+// never changes storage it has shared, so the view outlives later passes unchanged
+template <typename T>
+static py::array assignment_view(std::shared_ptr<const Assignments> assignments,
+                                 const std::vector<T> Assignments::*member) {
+    const std::vector<T>& values = (*assignments).*member;
+    py::capsule base(new std::shared_ptr<const Assignments>(std::move(assignments)), [](void* ptr) {
+        delete static_cast<std::shared_ptr<const Assignments>*>(ptr);
+    });
+    py::array_t<T> view(static_cast<py::ssize_t>(values.size()), values.data(), base);
+    view.attr("setflags")(py::arg("write") = false);
+    return view;
+}
+
+// View a 2D NumPy array (and optional per-row weights) as an ElementMatrix,
+// keeping the arrays alive instead of copying them
+template <typename T>
+static std::shared_ptr<ElementMatrix> element_matrix_view(const py::array_t<T, py::array::c_style | py::array::forcecast>& array,
+                                                          const std::optional<DoubleArray>& weights) {
+    using Arrays = std::pair<py::array_t<T, py::array::c_style | py::array::forcecast>, std::optional<DoubleArray>>;
+    if (array.ndim() != 2) {
+        throw std::runtime_error("initial_elements must be a 2D array");
+    }
+    if (weights && (weights->ndim() != 1 || weights->shape(0) != array.shape(0))) {
+        throw std::runtime_error("weights must be a 1D array with one entry per row");
+    }
+    auto* arrays = new Arrays(array, weights);
+    std::shared_ptr<void> owner(arrays, [](void* ptr) {
+        py::gil_scoped_acquire acquire;
+        delete static_cast<Arrays*>(ptr);
+    });
+    return std::make_shared<ElementMatrix>(array.data(), static_cast<int>(array.shape(0)),
+                                           static_cast<int>(array.shape(1)), std::move(owner),
+                                           weights ? weights->data() : nullptr);
+}
+
+// float32 arrays stay in single precision, anything else is viewed (or converted) as float64
+static std::shared_ptr<ElementMatrix> element_matrix_from_array(const py::object& data,
+                                                                const std::optional<DoubleArray>& weights) {
+    py::array array = py::array::ensure(data);
+    if (array && array.dtype().is(py::dtype::of<float>())) {
+        return element_matrix_view<float>(FloatArray::ensure(array), weights);
+    }
+    DoubleArray values = DoubleArray::ensure(data);
+    if (!values) {
+        throw py::type_error("initial_elements must be convertible to a float array");
+    }
+    return element_matrix_view<double>(values, weights);
+}
+
 PYBIND11_MODULE(hypersphere_module, m) {
     m.doc() = "Python bindings for Hypersphere class";
 
+    py::class_<ElementMatrix, std::shared_ptr<ElementMatrix>>(m, "ElementMatrix", py::buffer_protocol())
+        .def(py::init(&element_matrix_from_array), py::arg("array"), py::arg("weights") = py::none())
+        .def_property_readonly("rows", &ElementMatrix::rows)
+        .def_property_readonly("cols", &ElementMatrix::cols)
+        .def_property_readonly("weights", [](py::object self) -> py::object {
+            const ElementMatrix& matrix = self.cast<const ElementMatrix&>();
+            if (!matrix.weights()) {
+                return py::none();
+            }
+            py::array_t<double> view(matrix.rows(), matrix.weights(), self);
+            view.attr("setflags")(py::arg("write") = false);
+            return view;
+        })
+        .def_property_readonly("single_precision", &ElementMatrix::isSinglePrecision)
+        .def_buffer([](ElementMatrix& matrix) {
+            if (matrix.isSinglePrecision()) {
+                return py::buffer_info(
+                    const_cast<float*>(matrix.floatData()), sizeof(float), py::format_descriptor<float>::format(), 2,
+                    {static_cast<py::ssize_t>(matrix.rows()), static_cast<py::ssize_t>(matrix.cols())},
+                    {static_cast<py::ssize_t>(sizeof(float) * matrix.cols()), static_cast<py::ssize_t>(sizeof(float))},
+                    true);
+            }
+            return py::buffer_info(
+                const_cast<double*>(matrix.data()), sizeof(double), py::format_descriptor<double>::format(), 2,
+                {static_cast<py::ssize_t>(matrix.rows()), static_cast<py::ssize_t>(matrix.cols())},
+                {static_cast<py::ssize_t>(sizeof(double) * matrix.cols()), static_cast<py::ssize_t>(sizeof(double))},
+                true);
+        });
+
+    py::class_<KDTree, std::shared_ptr<KDTree>>(m, "ElementIndex")
+        .def(py::init([](std::shared_ptr<ElementMatrix> elements, int leaf_size, std::optional<std::vector<double>> ux) {
+                 std::shared_ptr<const ElementMatrix> matrix(std::move(elements));
+                 py::gil_scoped_release release;
+                 if (ux) {
+                     return std::make_shared<KDTree>(std::move(matrix), std::move(*ux), leaf_size);
+                 }
+                 return std::make_shared<KDTree>(std::move(matrix), leaf_size);
+             }),
+             py::arg("elements"), py::arg("leaf_size") = 16, py::arg("ux") = py::none());
+
     py::class_<Hypersphere>(m, "Hypersphere")
-        .def(py::init<const std::vector<double>&, double, const std::vector<std::vector<double>>&>(),
+        .def(py::init([](const std::vector<double>& center, double radius, std::shared_ptr<ElementMatrix> initial_elements,
+                         std::optional<std::vector<double>> ux) {
+                 std::shared_ptr<const ElementMatrix> elements(std::move(initial_elements));
+                 if (ux) {
+                     return new Hypersphere(center, radius, std::move(elements), std::move(*ux));
+                 }
+                 return new Hypersphere(center, radius, std::move(elements));
+             }),
+             py::arg("center"), py::arg("radius"), py::arg("initial_elements"), py::arg("ux") = py::none())
+        .def(py::init([](const std::vector<double>& center, double radius, const DoubleArray& initial_elements) {
+                 return new Hypersphere(center, radius, element_matrix_view<double>(initial_elements, std::nullopt));
+             }),
              py::arg("center"), py::arg("radius"), py::arg("initial_elements"))
         .def("set_center", &Hypersphere::setCenter, py::arg("new_center"))
         .def("get_center", &Hypersphere::getCenter)
         .def("set_radius", &Hypersphere::setRadius, py::arg("new_radius"))
         .def("get_radius", &Hypersphere::getRadius)
         .def("get_ux", &Hypersphere::getUx)
+        .def("set_assignment_source", [](Hypersphere& hypersphere, std::shared_ptr<ElementMatrix> source) {
+            hypersphere.setAssignmentSource(std::move(source));
+        }, py::arg("source"))
         .def("add_assignment", &Hypersphere::addAssignment,
-             py::arg("array"), py::arg("value"), py::arg("weight"))
+             py::arg("index"), py::arg("value"), py::arg("weight"))
         .def("clear_assignments", &Hypersphere::clearAssignments)
-        .def("get_initial_elements", &Hypersphere::getInitialElements)
-        .def("get_assignments", &Hypersphere::getAssignments);
+        .def("num_assignments", &Hypersphere::numAssignments)
+        .def("set_initial_elements", [](Hypersphere& hypersphere, std::shared_ptr<ElementMatrix> elements,
+                                        std::optional<std::vector<double>> ux) {
+            if (ux) {
+                hypersphere.setInitialElements(std::move(elements), std::move(*ux));
+            } else {
+                hypersphere.setInitialElements(std::move(elements));
+            }
+        }, py::arg("elements"), py::arg("ux") = py::none())
+        .def("get_initial_elements", [](const Hypersphere& hypersphere) {
+            return std::const_pointer_cast<ElementMatrix>(hypersphere.getSharedInitialElements());
+        })
+        .def("get_assignment_indices", [](const Hypersphere& hypersphere) {
+            return assignment_view(hypersphere.shareAssignments(), &Assignments::indices);
+        })
+        .def("get_assignment_labels", [](const Hypersphere& hypersphere) {
+            return assignment_view(hypersphere.shareAssignments(), &Assignments::labels);
+        })
+        .def("get_assignment_weights", [](const Hypersphere& hypersphere) {
+            return assignment_view(hypersphere.shareAssignments(), &Assignments::weights);
+        })
+        .def("set_element_index", [](Hypersphere& hypersphere, std::shared_ptr<KDTree> index, double tolerance) {
+            hypersphere.setElementIndex(std::move(index), tolerance);
+        }, py::arg("index"), py::arg("tolerance"))
+        .def("get_index_tolerance", &Hypersphere::getIndexTolerance)
+        .def("set_g_cache", [](Hypersphere& hypersphere, std::shared_ptr<ElementMatrix> source,
+                               std::vector<double> values, double E) {
+            hypersphere.setGCache(std::move(source), std::make_shared<const std::vector<double>>(std::move(values)), E);
+        }, py::arg("source"), py::arg("values"), py::arg("E"))
+        .def("clear_g_cache", &Hypersphere::clearGCache);
 }
\ No newline at end of file
@@ -1,17 +1,40 @@
-#include "include/optimize_hypersphere.h"
+#include "../include/optimize_hypersphere.h"
+#include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <vector>
 
+namespace py = pybind11;
+
 PYBIND11_MODULE(optimize_module, m) {
     m.doc() = "Optimization module for Hypersphere";
 
-    m.def("optimize_hypersphere", &optimize_hypersphere,
-          py::arg("hypersphere"), 
-          py::arg("other_hyperspheres"), 
-          py::arg("num_other_hyperspheres"), 
-          py::arg("c1"), 
-          py::arg("learning_rate"), 
-          py::arg("max_iterations"), 
-          py::arg("tolerance"), 
-          py::arg("dim"));
+    py::enum_<OptimizerMode>(m, "OptimizerMode")
+        .value("ANALYTIC", OptimizerMode::Analytic)
+        .value("APPROXIMATE", OptimizerMode::Approximate);
+
+    m.def("optimize", [](Hypersphere& hypersphere,
+                         std::vector<Hypersphere*>& other_hyperspheres,
+                         double c1, double learning_rate, int max_iterations, double tolerance,
+                         OptimizerMode mode) {
+        int dim = static_cast<int>(hypersphere.getCenter().size());
+        py::gil_scoped_release release;
+        return optimize(&hypersphere, other_hyperspheres, c1, learning_rate, max_iterations, tolerance, dim, mode);
+    }, py::arg("hypersphere"),
+       py::arg("other_hyperspheres"),
+       py::arg("c1"),
+       py::arg("learning_rate"),
+       py::arg("max_iterations"),
+       py::arg("tolerance"),
+       py::arg("mode") = OptimizerMode::Analytic,
+       "This function optimizes the radius and center of a hypersphere against the other hyperspheres.");
+
+    m.def("objective", [](const std::vector<Hypersphere*>& hyperspheres,
+                          const std::vector<Hypersphere*>& other_hyperspheres, double c1) {
+        int dim = hyperspheres.empty() ? 0 : static_cast<int>(hyperspheres[0]->getCenter().size());
+        py::gil_scoped_release release;
+        return total_objective(hyperspheres, other_hyperspheres, c1, dim);
+    }, py::arg("hyperspheres"),
+       py::arg("other_hyperspheres"),
+       py::arg("c1"),
+       "This function sums the objective of the hyperspheres at their current centers and radii against the other hyperspheres.");
 }
\ No newline at end of file
@@ -0,0 +1,140 @@
+import itertools
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .HyperionFuzzy import HyperionFuzzy
+from .wrappers import Hypersphere, element_index, element_matrix, g_tables, predict
+
+# Parameters that leave the initialization, and so the G tables of the training rows, unchanged
+SEARCH_PARAMS = ("gamma", "sigma", "E", "learning_rate")
+
+
+def _copy_spheres(hyperspheres, index, tolerance):
+    """Independent copies of a class's spheres that share its initial elements, ux and element index."""
+    copies = []
+    for hs in hyperspheres:
+        copy = Hypersphere(hs.get_center().copy(), hs.get_radius(), hs.instance.get_initial_elements(), hs.get_ux())
+        if index is not None:
+            copy.set_element_index(index, tolerance)
+        copies.append(copy)
+    return copies
+
+
+class HyperparameterSearch:
+    """
+    Grid search over `gamma`, `sigma`, `E` and `learning_rate` of HyperionFuzzy, scored by accuracy.
+    `params` are passed to every HyperionFuzzy of the grid.
+
+    Every grid point starts from the same initialization, seeded by `random_state`. G of the
+    training rows depends on E but not on the other searched parameters, so it is computed once per
+    E and class and shared by all points, with the distances to the elements shared between the E
+    values; G of the scored rows is likewise computed once. The points then train on `n_jobs`
+    threads (-1 for all cores), one fuzzy pass at a time. With `early_stopping`, only the best 1 /
+    `reduction_factor` of the points by score go on to the next pass, so bad configurations stop
+    after a pass or two instead of `max_iterations`.
+    """
+
+    def __init__(self, param_grid: dict, n_jobs=None, early_stopping=True, reduction_factor=2,
+                 random_state=None, **params):
+        unknown = set(param_grid) - set(SEARCH_PARAMS)
+        if unknown:
+            raise ValueError(f"Only {SEARCH_PARAMS} can be searched, got {sorted(unknown)}")
+        if reduction_factor <= 1:
+            raise ValueError(f"reduction_factor must be greater than 1, got {reduction_factor}")
+        self.param_grid = param_grid
+        self.n_jobs = n_jobs
+        self.early_stopping = early_stopping
+        self.reduction_factor = reduction_factor
+        self.random_state = random_state
+        self.params = params
+        self.results_ = None
+        self.best_params_ = None
+        self.best_score_ = None
+        self.best_model_ = None
+
+    def grid(self) -> list:
+        """Every combination of the grid, as dicts of parameter values."""
+        names = list(self.param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(self.param_grid[n] for n in names))]
+
+    def fit(self, data, labels, validation_data=None, validation_labels=None):
+        """
+        Train and score every grid point, given NumPy arrays or a DataFrame and Series. Points are
+        scored on the validation rows when given and on the training rows otherwise. `results_`
+        holds the parameters, last score, fuzzy passes and early stop of every point in grid order.
+        """
+        points = self.grid()
+        base = HyperionFuzzy(random_state=self.random_state, **self.params)
+        transformed = base._transformed_training_data(data)
+        labels = np.asarray(labels)
+        if validation_data is None:
+            validation, validation_labels = transformed, labels
+        else:
+            validation, validation_labels = base.transform(validation_data), np.asarray(validation_labels)
+
+        positive, negative = base.initialize_hyperspheres(transformed, labels)
+        training_matrix = element_matrix(transformed, dtype=base.dtype)
+        models = [HyperionFuzzy(random_state=self.random_state, **dict(self.params, **point)) for point in points]
+        self._share_initialization(models, positive, negative, training_matrix)
+        # Scoring evaluates G at E 0 over the validation rows, which is the same for every point
+        validation_g = [g_tables(validation, spheres[0], [0.0], self.n_jobs)[0] for spheres in (positive, negative)]
+
+        jobs = self._num_threads()
+        active = list(range(len(models)))
+        passes = [0] * len(models)
+        scores = [-math.inf] * len(models)
+        stopped = [False] * len(models)
+        with ThreadPoolExecutor(min(jobs, max(len(models), 1))) as pool:
+            for i in range(base.max_iterations):
+                if not active:
+                    break
+                list(pool.map(lambda m: models[m].fuzzy(training_matrix), active))
+                for m in active:
+                    passes[m] += 1
+                    predictions = predict(validation, models[m].positive_hyperspheres, models[m].negative_hyperspheres,
+                                          models[m].sigma, positive_g=validation_g[0], negative_g=validation_g[1])
+                    scores[m] = np.mean(predictions == validation_labels)
+
+                # Points whose spheres no longer get assignments are done, as in `train`
+                active = [m for m in active
+                          if any(hs.num_assignments for hs in models[m].positive_hyperspheres)
+                          and any(hs.num_assignments for hs in models[m].negative_hyperspheres)]
+                if self.early_stopping and len(active) > 1 and i + 1 < base.max_iterations:
+                    keep = max(1, math.ceil(len(active) / self.reduction_factor))
+                    ranked = sorted(active, key=lambda m: -scores[m])
+                    for m in ranked[keep:]:
+                        stopped[m] = True
+                    active = sorted(ranked[:keep])
+
+        self.results_ = [{"params": point, "score": scores[m], "passes": passes[m], "stopped_early": stopped[m]}
+                         for m, point in enumerate(points)]
+        finished = [m for m in range(len(models)) if not stopped[m]]
+        best = max(finished, key=lambda m: scores[m]) if finished else None
+        if best is not None:
+            self.best_params_, self.best_score_, self.best_model_ = points[best], scores[best], models[best]
+        return self
+
+    def _share_initialization(self, models, positive, negative, training_matrix):
+        """Give every model copies of the initial spheres and the G tables of its E."""
+        Es = sorted({model.E for model in models})
+        for name, spheres in (("positive", positive), ("negative", negative)):
+            elements = spheres[0].instance.get_initial_elements()
+            index = None
+            if self.params.get("g_tolerance", 0.0) > 0:
+                index = element_index(elements, ux=spheres[0].get_ux())
+            tables = dict(zip(Es, g_tables(training_matrix, spheres[0], Es, self.n_jobs)))
+            for model in models:
+                copies = _copy_spheres(spheres, index, model.g_tolerance)
+                for hs in copies:
+                    hs.set_g_cache(training_matrix, tables[model.E], model.E)
+                setattr(model, f"{name}_hyperspheres", copies)
+
+    def _num_threads(self) -> int:
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return os.cpu_count() or 1
+        return max(int(self.n_jobs), 1)
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Micro-batching prediction server for a trained HyperionFuzzy model.
+
+Concurrent single-row requests are queued and coalesced into batches of at most `max_batch_size`
+rows, waiting at most `max_latency` seconds after the first row of a batch for more to arrive. Each
+batch is scored by one call to `HyperionFuzzy.predict` on a worker thread, so the event loop keeps
+queueing requests while the native predict runs, and the results are handed back to each caller.
+
+Over a socket, the protocol is one JSON object per line: `{"id": 1, "row": [0.1, 0.2]}` is answered
+with `{"id": 1, "prediction": 1}` and `{"id": 2, "metrics": true}` with `{"id": 2, "metrics": {...}}`.
+Responses may come back out of order, matched to requests by `id`. Run with
+`python -m hyperion_fuzzy.serving model.hfz --port 8765`.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from .HyperionFuzzy import HyperionFuzzy
+
+
+class PredictionServer:
+    """
+    Coalesces concurrent `predict` calls on `model` into batched native predicts, scored on `n_jobs`
+    threads. Use as `async with PredictionServer(model) as server`, or call `start` and `close`.
+    """
+
+    def __init__(self, model: HyperionFuzzy, max_batch_size: int = 256, max_latency: float = 0.002, n_jobs=None):
+        if not model.positive_hyperspheres or not model.negative_hyperspheres:
+            raise ValueError("PredictionServer needs a trained model")
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        self.model = model
+        self.max_batch_size = int(max_batch_size)
+        self.max_latency = max_latency
+        self.n_jobs = n_jobs
+        self.dim = model.positive_hyperspheres[0].get_center().shape[0]
+        self._queue = None
+        self._batcher = None
+        self._server = None
+        self._requests = 0
+        self._batches = 0
+        self._rows = 0
+        self._max_batch = 0
+        self._max_queue_depth = 0
+        self._predict_seconds = 0.0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Start batching, must be called from the event loop that will serve the requests."""
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batches())
+
+    async def listen(self, host: str = "127.0.0.1", port: int = 0):
+        """Accept requests over TCP on `host` and `port` (0 picks a free port), returning the bound address."""
+        await self.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and batching. Requests still queued fail with a RuntimeError."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("PredictionServer was closed"))
+
+    async def predict(self, row) -> int:
+        """Predict the class of one row of `dim` features, scored in a batch with concurrent requests."""
+        row = np.asarray(row, dtype=np.float64)
+        if row.shape != (self.dim,):
+            raise ValueError(f"row must have {self.dim} features, got shape {row.shape}")
+        if self._batcher is None:
+            raise RuntimeError("PredictionServer is not started")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        self._requests += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    def metrics(self) -> dict:
+        """Requests and batches so far, batch sizes, current and largest queue depth and time in predict."""
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+            "max_batch_size": self._max_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self._max_queue_depth,
+            "predict_seconds": self._predict_seconds,
+        }
+
+    async def _next_batch(self) -> list:
+        """Wait for a request, then gather more until the batch is full or `max_latency` has passed."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # Callers that gave up no longer need their row scored
+            batch = [(row, future) for row, future in batch if not future.done()]
+            if not batch:
+                continue
+            rows = np.stack([row for row, _ in batch])
+            start = time.perf_counter()
+            try:
+                predictions = await loop.run_in_executor(None, self.model.predict, rows, self.n_jobs)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            finally:
+                self._predict_seconds += time.perf_counter() - start
+                self._batches += 1
+                self._rows += len(batch)
+                self._max_batch = max(self._max_batch, len(batch))
+            for (_, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(int(prediction))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(self._respond(line, writer))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        """Answer one request line; failures are reported to the client in an `error` field."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            if request.get("metrics"):
+                response = {"id": request_id, "metrics": self.metrics()}
+            elif "row" in request:
+                response = {"id": request_id, "prediction": await self.predict(request["row"])}
+            else:
+                raise ValueError("request must hold a row or ask for metrics")
+        except Exception as error:
+            response = {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+
+async def _serve(args):
+    model = HyperionFuzzy.load(args.model)
+    async with PredictionServer(model, args.max_batch_size, args.max_latency_ms / 1000.0, args.jobs) as server:
+        host, port = await server.listen(args.host, args.port)
+        print(f"Serving {args.model} on {host}:{port}", flush=True)
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("model", help="model file written by HyperionFuzzy.save")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on, 0 picks a free one")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="most rows scored in one batch")
+    parser.add_argument("--max-latency-ms", type=float, default=2.0,
+                        help="longest wait for more rows after the first row of a batch")
+    parser.add_argument("--jobs", type=int, default=None, help="native threads per batch (-1 for all cores)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+
+
+def iter_chunks(source, labels=None, chunk_size: int = 10000, label_column="label"):
+    """
+    Yield (rows, labels) chunks of at most `chunk_size` rows without loading the whole dataset.
+
+    `source` is a `.npy` file, which is memory-mapped, a CSV file, which is read `chunk_size`
+    rows at a time, or an array. For `.npy` files and arrays, `labels` is a matching `.npy` file
+    or array; when it is None the last column holds the labels. CSV labels come from `label_column`.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.fspath(source).endswith(".csv"):
+        import pandas as pd
+
+        for frame in pd.read_csv(source, chunksize=chunk_size):
+            yield frame.drop(columns=label_column).to_numpy(dtype=np.float64), frame[label_column].to_numpy()
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode="r")
+    if isinstance(labels, (str, os.PathLike)):
+        labels = np.load(labels, mmap_mode="r")
+    if labels is None:
+        source, labels = source[:, :-1], source[:, -1]
+    if len(labels) != source.shape[0]:
+        raise ValueError("labels must have one entry per row")
+
+    for start in range(0, source.shape[0], chunk_size):
+        yield np.asarray(source[start:start + chunk_size]), np.asarray(labels[start:start + chunk_size])
\ No newline at end of file
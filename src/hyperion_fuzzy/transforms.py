@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class Transform(ABC):
+    """
+    Elementwise feature transform over whole arrays. Calls follow the NumPy ufunc convention: the
+    result is written to `out` when it is given, which may be the input itself to transform in place.
+    """
+
+    @abstractmethod
+    def __call__(self, values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Transform `values`, into `out` when given."""
+
+
+class Exp(Transform):
+    """exp(x), the mapping HyperionFuzzy has always used."""
+
+    def __call__(self, values, out=None):
+        return np.exp(values, out=out)
+
+
+class Identity(Transform):
+    """Leaves the features as they are."""
+
+    def __call__(self, values, out=None):
+        if out is None:
+            return np.array(values)
+        if not np.may_share_memory(values, out):
+            out[...] = values
+        return out
+
+
+class Function(Transform):
+    """Wraps a function of one array that has no `out` parameter, its result is copied into `out`."""
+
+    def __init__(self, function):
+        self.function = function
+
+    def __eq__(self, other):
+        return isinstance(other, Function) and other.function == self.function
+
+    def __hash__(self):
+        return hash(self.function)
+
+    def __call__(self, values, out=None):
+        result = self.function(values)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+
+TRANSFORMS = {"exp": Exp(), "identity": Identity()}
+
+
+def get_transform(transform) -> Transform:
+    """Resolve a Transform, the name of a built-in one, or a function of one array."""
+    if isinstance(transform, Transform):
+        return transform
+    if isinstance(transform, str):
+        if transform not in TRANSFORMS:
+            raise ValueError(f"Unknown transform {transform!r}, expected one of {tuple(TRANSFORMS)} or a callable")
+        return TRANSFORMS[transform]
+    if callable(transform):
+        return Function(transform)
+    raise TypeError(f"transform must be a Transform, a name or a callable, got {type(transform).__name__}")
+
+
+def transform_rows(transform: Transform, data, dtype=np.float64, chunk_rows: int = None,
+                   out: np.ndarray = None) -> np.ndarray:
+    """
+    Apply `transform` to a 2D array or DataFrame and return a C-contiguous `dtype` array.
+
+    Rows are converted to `dtype` and transformed in place in the result, `chunk_rows` at a time
+    when set, so the only temporaries are one chunk of converted input. `out` receives the result;
+    passing `data` itself transforms a C-contiguous `dtype` array in place.
+    """
+    frame = hasattr(data, "iloc")
+    values = None if frame else np.asarray(data)
+    shape = tuple(data.shape if frame else values.shape)
+    if len(shape) != 2:
+        raise ValueError("data must be 2D")
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError(f"out must be a writeable C-contiguous {np.dtype(dtype).name} array of shape {shape}")
+
+    step = max(int(chunk_rows), 1) if chunk_rows else max(shape[0], 1)
+    for start in range(0, shape[0], step):
+        block = out[start:start + step]
+        source = data.iloc[start:start + step].to_numpy() if frame else values[start:start + step]
+        if not np.may_share_memory(source, block):
+            block[...] = source
+        transform(block, out=block)
+    return out
\ No newline at end of file
@@ -1,18 +1,78 @@
+import importlib
+
 import numpy as np
 
-# Import the compiled pybind11 modules
-import hypersphere_module  # The module from `hypersphere_bindings.cpp`
-import optimize_module  # The module from `optimize_bindings.cpp`
-import fuzzy_module  # The module from `fuzzy_bindings.cpp`
+
+class _LazyModule:
+    """Stand-in for a compiled pybind11 module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# The compiled pybind11 modules, loaded on first use
+hypersphere_module = _LazyModule("hypersphere_module")  # The module from `hypersphere_bindings.cpp`
+optimize_module = _LazyModule("optimize_module")  # The module from `optimize_bindings.cpp`
+fuzzy_module = _LazyModule("fuzzy_module")  # The module from `fuzzy_bindings.cpp`
+
+# Optimizer mode names and the OptimizerMode members they map to
+_OPTIMIZER_MODES = {
+    "analytic": "ANALYTIC",
+    "approximate": "APPROXIMATE",
+}
+
+
+def element_matrix(data: np.ndarray, weights: np.ndarray = None, dtype=np.float64):
+    """
+    Wrap a 2D array as a native ElementMatrix without copying it.
+    The matrix keeps the array alive and can be shared between hyperspheres.
+    Optional per-row `weights` make each row count as that many elements in G and ux.
+    With `dtype=np.float32` the rows are stored, and G is summed over them, in single precision.
+    """
+    if weights is not None:
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+    return hypersphere_module.ElementMatrix(np.ascontiguousarray(data, dtype=_storage_dtype(dtype)), weights)
+
+
+def _storage_dtype(dtype) -> np.dtype:
+    """Validate a storage precision, float64 or float32."""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float64, np.float32):
+        raise ValueError(f"dtype must be float64 or float32, got {dtype}")
+    return dtype
+
+
+def element_index(elements, leaf_size: int = 16, ux: np.ndarray = None):
+    """
+    Build a KD-tree over an ElementMatrix (or 2D array) for truncated evaluation of G.
+    One index can be shared by every hypersphere built on the same matrix. `ux` must match the
+    spheres' ux and defaults to the mean of the elements.
+    """
+    if not isinstance(elements, hypersphere_module.ElementMatrix):
+        elements = element_matrix(elements)
+    return hypersphere_module.ElementIndex(elements, leaf_size, None if ux is None else np.asarray(ux, dtype=np.float64))
 
 
 class Hypersphere:
-    def __init__(self, center: np.ndarray, radius: float, initial_elements: np.ndarray):
-        """Create a new Hypersphere using pybind11 bindings."""
-        self.instance = hypersphere_module.Hypersphere(center.tolist(), radius, initial_elements.tolist())
+    def __init__(self, center: np.ndarray, radius: float, initial_elements, ux: np.ndarray = None):
+        """
+        Create a new Hypersphere using pybind11 bindings.
+        `initial_elements` is a 2D array or an ElementMatrix shared with other spheres of the same class.
+        A known `ux` (e.g. from a saved model) is used as is instead of being recomputed from the elements.
+        """
+        if not isinstance(initial_elements, hypersphere_module.ElementMatrix):
+            initial_elements = element_matrix(initial_elements)
+        self.instance = hypersphere_module.Hypersphere(
+            center.tolist(), radius, initial_elements, None if ux is None else np.asarray(ux, dtype=np.float64).tolist()
+        )
         self.center = center
         self.radius = radius
-        self.assignments = []
 
     def set_center(self, new_center: np.ndarray):
         self.instance.set_center(new_center.tolist())
@@ -33,54 +93,215 @@ class Hypersphere:
     def get_ux(self) -> np.ndarray:
         return np.array(self.instance.get_ux())
 
-    def add_assignment(self, array: np.ndarray, value: int, weight: float):
-        self.instance.add_assignment(array.tolist(), value, weight)
+    def set_assignment_source(self, data):
+        """Set the training matrix that assignment indices refer to."""
+        if not isinstance(data, hypersphere_module.ElementMatrix):
+            data = element_matrix(data)
+        self.instance.set_assignment_source(data)
+
+    def add_assignment(self, index: int, value: int, weight: float):
+        self.instance.add_assignment(index, value, weight)
 
     def clear_assignments(self):
         self.instance.clear_assignments()
 
+    @property
+    def num_assignments(self) -> int:
+        return self.instance.num_assignments()
+
+    def set_element_index(self, index, tolerance: float):
+        """
+        Attach a KD-tree over this sphere's initial elements. With tolerance > 0, G skips the subtrees
+        whose terms all fall below tolerance times their weight; tolerance 0 evaluates G exactly.
+        """
+        self.instance.set_element_index(index, tolerance)
+
+    def set_g_cache(self, data, values: np.ndarray, E: float):
+        """
+        Use `values` as G of the rows of the ElementMatrix `data` for E, e.g. computed once for spheres with
+        the same elements. Only passes over that same matrix read the cache.
+        """
+        self.instance.set_g_cache(data, np.asarray(values, dtype=np.float64), E)
+
+    def clear_g_cache(self):
+        self.instance.clear_g_cache()
+
+    def set_initial_elements(self, elements, ux: np.ndarray = None):
+        """
+        Replace the initial elements with a 2D array or ElementMatrix and recompute ux, or take `ux`
+        when it is already known. Cached G values and any element index are dropped.
+        """
+        if not isinstance(elements, hypersphere_module.ElementMatrix):
+            elements = element_matrix(elements)
+        self.instance.set_initial_elements(elements, None if ux is None else np.asarray(ux, dtype=np.float64))
+
     def get_initial_elements(self) -> np.ndarray:
-        return np.array(self.instance.get_initial_elements())
+        return np.asarray(self.instance.get_initial_elements())
 
     def get_assignments(self):
-        """Ensure assignments are always up-to-date from C++."""
-        self.assignments = self.instance.get_assignments()
-        return self.assignments
-
-    def optimize(self, other_hyperspheres: list, c1: float, learning_rate: float, max_iterations: int, tolerance: float):
-        """Optimize the hypersphere using the pybind11 binding and sync updates."""
-        self.instance.optimize(
-            [hs.instance for hs in other_hyperspheres], c1, learning_rate, max_iterations, tolerance
+        """
+        Return the (indices, labels, weights) of the assignments as read-only views of the C++ arrays.
+        The views keep the arrays of the current fuzzy pass alive, later passes fill new ones.
+        """
+        return (
+            self.instance.get_assignment_indices(),
+            self.instance.get_assignment_labels(),
+            self.instance.get_assignment_weights(),
+        )
+
+    def optimize(self, other_hyperspheres: list, c1: float, learning_rate: float, max_iterations: int, tolerance: float, mode: str = "analytic") -> int:
+        """
+        Optimize the hypersphere using the pybind11 binding and sync updates.
+        `mode` is "analytic" (closed-form gradient descent) or "approximate" (finite-difference BFGS).
+        Returns the number of optimizer iterations.
+        """
+        iterations = optimize_module.optimize(
+            self.instance, [hs.instance for hs in other_hyperspheres], c1, learning_rate, max_iterations, tolerance,
+            getattr(optimize_module.OptimizerMode, _OPTIMIZER_MODES[mode])
         )
         # Fetch updated values from C++ and update Python attributes
-        self.center = np.array(self.instance.get_center())  
-        self.radius = self.instance.get_radius()  
+        self.center = np.array(self.instance.get_center())
+        self.radius = self.instance.get_radius()
+        return iterations
 
-def fuzzy_contribution(x: np.ndarray, positive_hyperspheres: list, negative_hyperspheres: list, gamma: float, sigma: float, E: float):
+
+def objective(hyperspheres: list, other_hyperspheres: list, c1: float) -> float:
+    """Sum of the optimizer objective of `hyperspheres` at their current centers and radii, lower is better."""
+    return optimize_module.objective(
+        [hs.instance for hs in hyperspheres], [hs.instance for hs in other_hyperspheres], c1
+    )
+
+
+def fuzzy_contribution(x: np.ndarray, index: int, positive_hyperspheres: list, negative_hyperspheres: list, gamma: float, sigma: float, E: float):
     """
     Compute fuzzy contribution using pybind11 bindings.
+    `x` is row `index` of the assignment source set on the hyperspheres.
     """
-    assigned_class, contribution = fuzzy_module.fuzzy_contribution(
-        x.tolist(),
+    return fuzzy_module.fuzzy_contribution(
+        x,
+        index,
         [hs.instance for hs in positive_hyperspheres],
         [hs.instance for hs in negative_hyperspheres],
         gamma, sigma, E
     )
 
-    # Fetch updated assignments from C++ and sync in Python
-    for hs in positive_hyperspheres + negative_hyperspheres:
-        hs.assignments = hs.instance.get_assignments()  # Sync Python object with C++ memory
 
-    return assigned_class, contribution
+def fuzzy_contribution_batch(data, positive_hyperspheres: list, negative_hyperspheres: list, gamma: float, sigma: float, E: float,
+                             start: int = 0, stop: int = None):
+    """
+    Compute fuzzy contributions for rows [start, stop) of a 2D array or ElementMatrix in one native call.
+    Falls back to the per-row path when the batch entry point is not available.
+    """
+    if not isinstance(data, hypersphere_module.ElementMatrix):
+        data = element_matrix(data)
+    positive_instances = [hs.instance for hs in positive_hyperspheres]
+    negative_instances = [hs.instance for hs in negative_hyperspheres]
+
+    if not hasattr(fuzzy_module, "fuzzy_contribution_batch"):
+        for instance in positive_instances + negative_instances:
+            instance.set_assignment_source(data)
+        rows = np.asarray(data)[start:stop]
+        assigned_classes = np.empty(rows.shape[0], dtype=np.int32)
+        contributions = np.empty(rows.shape[0], dtype=np.float64)
+        for i, x in enumerate(rows):
+            assigned_classes[i], contributions[i] = fuzzy_module.fuzzy_contribution(
+                x, start + i, positive_instances, negative_instances, gamma, sigma, E
+            )
+        return assigned_classes, contributions
+
+    return fuzzy_module.fuzzy_contribution_batch(
+        data, positive_instances, negative_instances, gamma, sigma, E, start, -1 if stop is None else stop
+    )
+
+
+def compute_g(data: np.ndarray, hypersphere: Hypersphere, E: float) -> np.ndarray:
+    """Evaluate the conformal factor G of a hypersphere at every row of `data`."""
+    return fuzzy_module.compute_g(np.ascontiguousarray(data, dtype=np.float64), hypersphere.instance, E)
+
+
+def compute_kernel(data: np.ndarray, hypersphere: Hypersphere, sigma: float, E: float) -> np.ndarray:
+    """Evaluate the conformal kernel between every row of `data` and the center of a hypersphere."""
+    return fuzzy_module.compute_kernel(np.ascontiguousarray(data, dtype=np.float64), hypersphere.instance, sigma, E)
+
+
+def precompute_g(data: np.ndarray, hyperspheres: list, E: float):
+    """
+    Cache the conformal factor G of every training row on each hypersphere.
+    Batched contributions over the same matrix and E read G from this cache. Spheres with the same
+    initial elements, ux and element index, such as the spheres of one class, share one cache.
+    """
+    if not isinstance(data, hypersphere_module.ElementMatrix):
+        data = element_matrix(data)
+    fuzzy_module.compute_g_cache(data, [hs.instance for hs in hyperspheres], E)
+
+
+def g_tables(data, hypersphere: Hypersphere, Es, n_jobs: int = None) -> np.ndarray:
+    """
+    G of a hypersphere at every row of a 2D array or ElementMatrix for each E, as a (len(Es) x rows) array.
+    The distances to the elements are computed once for all E, on `n_jobs` native threads.
+    """
+    if not isinstance(data, hypersphere_module.ElementMatrix):
+        data = element_matrix(data)
+    return fuzzy_module.compute_g_tables(data, hypersphere.instance, [float(E) for E in Es], _num_threads(n_jobs))
+
+
+def count_evaluations(enabled: bool, reset: bool = True):
+    """Enable or disable the native counts of G and kernel evaluations, by default restarting them from zero."""
+    if reset:
+        fuzzy_module.reset_counters()
+    fuzzy_module.set_counting(enabled)
+
 
+def evaluation_counts() -> dict:
+    """
+    Evaluations counted since the last reset: G evaluations, kernels to sphere centers evaluated by
+    predict and fuzzy_contribution, and kernels they pruned because a bound showed the sphere could not be nearest.
+    """
+    return {
+        "g_evaluations": fuzzy_module.g_evaluations(),
+        "kernel_evaluations": fuzzy_module.kernel_evaluations(),
+        "pruned_kernels": fuzzy_module.pruned_kernels(),
+    }
 
-def predict(transformed_data: np.ndarray, positive_hyperspheres: list, negative_hyperspheres: list, sigma: float):
+
+def predict(transformed_data: np.ndarray, positive_hyperspheres: list, negative_hyperspheres: list, sigma: float,
+            n_jobs: int = None, positive_g: np.ndarray = None, negative_g: np.ndarray = None) -> np.ndarray:
     """
     Predict class labels for transformed data using hyperspheres.
+    Rows are scored natively without the GIL, split across `n_jobs` threads (-1 uses every core).
+    `positive_g` and `negative_g` may hold G at E 0 of every row for the spheres of a class, which
+    must then share their elements, ux and index; it is used instead of being evaluated again.
     """
     return fuzzy_module.predict(
-        transformed_data.tolist(),
+        np.ascontiguousarray(transformed_data, dtype=np.float64),
         [hs.instance for hs in positive_hyperspheres],
         [hs.instance for hs in negative_hyperspheres],
-        sigma
-    )
\ No newline at end of file
+        sigma,
+        _num_threads(n_jobs),
+        positive_g,
+        negative_g
+    )
+
+
+def class_scores(transformed_data: np.ndarray, models: list, sigma: float, n_jobs: int = None) -> np.ndarray:
+    """
+    Score every class of a one-vs-rest model in one native pass over the rows. `models` holds a
+    (positive_hyperspheres, negative_hyperspheres) pair per class; the (rows x classes) result is
+    positive where that class's binary predict would return 1.
+    """
+    return fuzzy_module.class_scores(
+        np.ascontiguousarray(transformed_data, dtype=np.float64),
+        [[hs.instance for hs in positive] for positive, _ in models],
+        [[hs.instance for hs in negative] for _, negative in models],
+        sigma,
+        _num_threads(n_jobs)
+    )
+
+
+def _num_threads(n_jobs: int = None) -> int:
+    """Map an n_jobs value to the native thread count, where 0 means every hardware thread."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return 0
+    return max(int(n_jobs), 1)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _two_blobs(n=400, seed=0, frame=False):
+    """Two shuffled 2D Gaussian classes of n / 2 rows each, labeled 1 around (0, 0) and -1 around (1, 1)."""
+    rng = np.random.default_rng(seed)
+    data = np.vstack([rng.normal(0.0, 0.3, (n // 2, 2)), rng.normal(1.0, 0.3, (n // 2, 2))])
+    labels = np.r_[np.ones(n // 2), -np.ones(n // 2)]
+    order = rng.permutation(n)
+    data, labels = data[order], labels[order]
+    if frame:
+        return pd.DataFrame(data), pd.Series(labels)
+    return data, labels
+
+
+def _centers(spheres):
+    """Centers of a list of hyperspheres, or of every sphere of a model, positive ones first."""
+    if hasattr(spheres, "positive_hyperspheres"):
+        spheres = spheres.positive_hyperspheres + spheres.negative_hyperspheres
+    return np.array([hs.get_center() for hs in spheres])
+
+
+@pytest.fixture
+def make_data():
+    return _two_blobs
+
+
+@pytest.fixture
+def centers():
+    return _centers
\ No newline at end of file
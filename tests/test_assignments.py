@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import element_matrix
+
+
+def test_assignment_views_survive_later_passes(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data[:100], labels[:100])
+    held = [hs.get_assignments() for hs in model.positive_hyperspheres + model.negative_hyperspheres]
+    copies = [tuple(np.array(a) for a in views) for views in held]
+    assert sum(len(indices) for indices, _, _ in copies) == 100
+
+    # A larger matrix grows the arrays, and clearing them must not reach the held views either
+    model.fuzzy(element_matrix(model.transform(data)))
+    model.fuzzy(element_matrix(model.transform(data[:50])))
+    for views, expected in zip(held, copies):
+        for view, values in zip(views, expected):
+            assert not view.flags.writeable
+            np.testing.assert_array_equal(view, values)
+
+    current = [hs.get_assignments()[0] for hs in model.positive_hyperspheres + model.negative_hyperspheres]
+    assert sum(len(indices) for indices in current) == 50
\ No newline at end of file
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy import benchmark
+
+
+def test_cases_vary_one_axis_at_a_time():
+    cases = list(benchmark.cases(["predict", "g"], benchmark.QUICK_BASE, benchmark.QUICK_AXES))
+    predict = [params for name, params in cases if name == "predict"]
+    g = [params for name, params in cases if name == "g"]
+
+    assert len(predict) == 5
+    assert {params["threads"] for params in g} == {1}
+    for params in predict:
+        assert sum(params[axis] != benchmark.QUICK_BASE[axis] for axis in params) <= 1
+
+
+def test_run_emits_json_results(tmp_path):
+    output = tmp_path / "results.json"
+    benchmark.main(["--quick", "--repeat", "1", "--no-isolate", "--benchmark", "g", "--output", str(output)])
+
+    results = json.loads(output.read_text())
+    assert results["schema"] == benchmark.SCHEMA
+    assert len(results["results"]) == 4
+    for result in results["results"]:
+        assert result["benchmark"] == "g"
+        assert result["seconds"]["min"] >= 0
+        assert result["peak_rss_kib"] > 0
\ No newline at end of file
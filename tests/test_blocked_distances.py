@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import Hypersphere, compute_g, element_matrix, g_tables, predict
+
+
+def reference_g(data, elements, weights, ux, E):
+    distance2 = ((data[:, None, :] - elements[None, :, :]) ** 2).sum(axis=2)
+    ux_distance2 = ((elements - ux) ** 2).sum(axis=1)
+    return (weights * np.exp(-distance2 / (ux_distance2 + E))).sum(axis=1)
+
+
+@pytest.mark.parametrize("dim", [1, 3, 17])
+@pytest.mark.parametrize("offset", [0.0, 1e4])
+def test_blocked_g_matches_pairwise_distances(dim, offset):
+    # Far from the origin the norms dwarf the distances, where |x|^2 + |e|^2 - 2 x.e cancels
+    rng = np.random.default_rng(dim)
+    scale = 1e-3 if offset else 0.3
+    elements = offset + np.exp(rng.normal(0.0, scale, (300, dim)))
+    weights = rng.random(300) + 0.5
+    # Rows on and next to elements, and more rows than one block
+    data = np.vstack([elements[:20], elements[:20] + 1e-9, offset + np.exp(rng.normal(0.0, scale, (150, dim)))])
+    hs = Hypersphere(elements[0].copy(), 1.0, element_matrix(elements, weights))
+
+    for E in (1e-7, 1.0):
+        expected = reference_g(data, elements, weights, hs.get_ux(), E)
+        np.testing.assert_allclose(compute_g(data, hs, E), expected, rtol=1e-11)
+        np.testing.assert_allclose(g_tables(data, hs, [E], n_jobs=2)[0], expected, rtol=1e-11)
+        np.testing.assert_allclose(compute_g(data[:1], hs, E), expected[:1], rtol=1e-11)
+
+
+def test_blocked_predict_matches_per_row_g():
+    rng = np.random.default_rng(0)
+    data = np.vstack([rng.normal(0.0, 0.3, (300, 3)), rng.normal(1.0, 0.3, (300, 3))])
+    labels = np.r_[np.ones(300), -np.ones(300)]
+    model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=2, random_state=0)
+    model.train(data, labels)
+
+    transformed = model.transform(data)
+    per_row = [compute_g(transformed[i:i + 1], spheres[0], 0.0)[0] for spheres in
+               (model.positive_hyperspheres, model.negative_hyperspheres) for i in range(len(transformed))]
+    known = np.reshape(per_row, (2, -1))
+    np.testing.assert_array_equal(
+        model.predict(data),
+        predict(transformed, model.positive_hyperspheres, model.negative_hyperspheres, model.sigma,
+                positive_g=known[0], negative_g=known[1]))
\ No newline at end of file
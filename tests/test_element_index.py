@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.wrappers import Hypersphere, compute_g, element_index, element_matrix
+
+
+def exact_g(data, elements, weights, ux, E):
+    distance2 = ((data[:, None, :] - elements[None, :, :]) ** 2).sum(axis=2)
+    scale = ((elements - ux) ** 2).sum(axis=1) + E
+    return (weights * np.exp(-distance2 / scale)).sum(axis=1)
+
+
+@pytest.mark.parametrize("num_elements, dim, leaf_size", [
+    (300, 2, 1), (300, 2, 16), (300, 3, 300), (300, 1, 1000), (1, 2, 16), (1, 3, 1), (40, 2, 0),
+])
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("tolerance", [1e-6, 1e-3, 0.1, 0.5])
+def test_truncated_g_stays_within_the_tolerance_bound(num_elements, dim, leaf_size, weighted, tolerance):
+    rng = np.random.default_rng(num_elements + dim)
+    elements = rng.normal(0.0, 1.0, (num_elements, dim))
+    weights = rng.random(num_elements) + 0.5 if weighted else np.ones(num_elements)
+    matrix = element_matrix(elements, weights if weighted else None)
+    data = np.vstack([rng.normal(0.0, 1.5, (200, dim)), elements[:5], np.full((1, dim), 25.0)])
+    E = 1e-7
+
+    hs = Hypersphere(np.zeros(dim), 1.0, matrix)
+    exact = exact_g(data, elements, weights, hs.get_ux(), E)
+    np.testing.assert_allclose(compute_g(data, hs, E), exact, rtol=1e-12, atol=1e-300)
+
+    hs.set_element_index(element_index(matrix, leaf_size=leaf_size), tolerance)
+    truncated = compute_g(data, hs, E)
+    # Every skipped element contributes less than the tolerance times its weight
+    assert np.all(truncated <= exact * (1 + 1e-12))
+    assert np.all(exact - truncated <= tolerance * weights.sum() * (1 + 1e-12))
+
+
+def test_truncation_skips_far_elements_and_zero_tolerance_is_exact():
+    rng = np.random.default_rng(0)
+    elements = rng.normal(0.0, 1.0, (2000, 2))
+    matrix = element_matrix(elements)
+    data = rng.normal(0.0, 1.5, (100, 2))
+    hs = Hypersphere(np.zeros(2), 1.0, matrix)
+    exact = compute_g(data, hs, 1e-7)
+
+    index = element_index(matrix)
+    hs.set_element_index(index, 0.0)
+    np.testing.assert_array_equal(compute_g(data, hs, 1e-7), exact)
+
+    hs.set_element_index(index, 1e-3)
+    truncated = compute_g(data, hs, 1e-7)
+    assert np.any(truncated < exact)
+    with pytest.raises(ValueError):
+        hs.set_element_index(index, 1.0)
+    with pytest.raises(ValueError):
+        hs.set_element_index(element_index(elements), 1e-3)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import (count_evaluations, element_matrix, evaluation_counts, fuzzy_contribution_batch,
+                                     precompute_g)
+
+
+def contributions(model, matrix):
+    return fuzzy_contribution_batch(matrix, model.positive_hyperspheres, model.negative_hyperspheres,
+                                    model.gamma, model.sigma, model.E)
+
+
+def test_g_cache_only_serves_the_matrix_it_was_computed_for(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data[:200], labels[:200])
+    spheres = model.positive_hyperspheres + model.negative_hyperspheres
+
+    # Same number of rows as the training matrix the spheres cached G for, but other rows
+    other = element_matrix(model.transform(data[200:]))
+    classes, values = contributions(model, other)
+    for hs in spheres:
+        hs.clear_g_cache()
+    expected_classes, expected = contributions(model, other)
+    np.testing.assert_array_equal(classes, expected_classes)
+    np.testing.assert_array_equal(values, expected)
+
+    precompute_g(other, spheres, model.E)
+    count_evaluations(True)
+    try:
+        cached_classes, cached = contributions(model, other)
+        counts = evaluation_counts()
+    finally:
+        count_evaluations(False)
+    assert counts["g_evaluations"] == 0
+    np.testing.assert_array_equal(cached_classes, expected_classes)
+    np.testing.assert_allclose(cached, expected, rtol=1e-12)
+
+    with pytest.raises(ValueError):
+        spheres[0].set_g_cache(other, np.ones(10), model.E)
+
+def test_g_cache_is_computed_once_per_class(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data, labels)
+    spheres = model.positive_hyperspheres + model.negative_hyperspheres
+    matrix = element_matrix(model.transform(data))
+
+    count_evaluations(True)
+    try:
+        precompute_g(matrix, spheres, model.E)
+        counts = evaluation_counts()
+    finally:
+        count_evaluations(False)
+    assert counts["g_evaluations"] == 2 * matrix.rows
+
+    classes, values = contributions(model, matrix)
+    for hs in spheres:
+        hs.clear_g_cache()
+    expected_classes, expected = contributions(model, matrix)
+    np.testing.assert_array_equal(classes, expected_classes)
+    np.testing.assert_allclose(values, expected, rtol=1e-12)
\ No newline at end of file
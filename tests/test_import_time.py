@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import subprocess
+
+import pytest
+
+pytest.importorskip("hypersphere_module")
+
+# Time the package may add on top of importing NumPy
+IMPORT_BUDGET_SECONDS = 0.25
+
+HEAVY_MODULES = ("pandas", "scipy", "memory_profiler", "psutil")
+NATIVE_MODULES = ("hypersphere_module", "fuzzy_module", "optimize_module")
+
+
+def run_python(code):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))] + sys.path)
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_import_is_lazy_and_within_budget():
+    result = run_python(
+        "import json, sys, time\n"
+        "import numpy\n"
+        "start = time.perf_counter()\n"
+        "import hyperion_fuzzy.HyperionFuzzy\n"
+        "seconds = time.perf_counter() - start\n"
+        "print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))\n"
+    )
+
+    assert not set(HEAVY_MODULES + NATIVE_MODULES) & set(result["modules"])
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+def test_numpy_train_and_predict_do_not_need_pandas():
+    result = run_python(
+        "import json, sys\n"
+        "import numpy as np\n"
+        "from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy\n"
+        "rng = np.random.default_rng(0)\n"
+        "data = np.vstack([rng.normal(0.0, 0.3, (100, 2)), rng.normal(1.0, 0.3, (100, 2))])\n"
+        "labels = np.r_[np.ones(100), -np.ones(100)]\n"
+        "model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2)\n"
+        "model.train(data, labels)\n"
+        "predictions = model.predict(data)\n"
+        "print(json.dumps({'predictions': len(predictions), 'modules': sorted(sys.modules)}))\n"
+    )
+
+    assert result["predictions"] == 200
+    assert not set(HEAVY_MODULES) & set(result["modules"])
\ No newline at end of file
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.landmarks import kmeans_plus_plus
+
+
+def test_kmeans_plus_plus_spreads_picks_over_distinct_rows():
+    rng = np.random.default_rng(0)
+    clusters = np.repeat(np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]]), 50, axis=0)
+    picks = kmeans_plus_plus(clusters + rng.normal(0.0, 0.01, clusters.shape), 3, rng)
+    assert len({tuple(np.round(p, -1)) for p in picks}) == 3
+
+
+@pytest.mark.parametrize("init", ["random", "k-means++"])
+def test_random_state_makes_training_reproducible(make_data, centers, init):
+    data, labels = make_data()
+    models = []
+    for seed in (7, 7, 8):
+        model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=2, init=init, random_state=seed)
+        model.train(data, labels)
+        models.append(model)
+
+    np.testing.assert_array_equal(centers(models[0]), centers(models[1]))
+    assert not np.array_equal(centers(models[0]), centers(models[2]))
+    np.testing.assert_array_equal(models[0].predict(data), models[1].predict(data))
+
+
+def test_restarts_keep_the_lowest_objective_regardless_of_threads(make_data, centers):
+    data, labels = make_data()
+    params = dict(num_clusters=3, sigma=0.5, max_iterations=2, init="k-means++", n_init=4, random_state=1)
+    serial = HyperionFuzzy(**params)
+    serial.train(data, labels)
+    threaded = HyperionFuzzy(restart_jobs=2, **params)
+    threaded.train(data, labels)
+
+    assert len(serial.restart_objectives) == 4
+    assert serial.objective() == min(serial.restart_objectives)
+    assert serial.restart_objectives == threaded.restart_objectives
+    np.testing.assert_array_equal(centers(serial), centers(threaded))
+    np.testing.assert_array_equal(serial.predict(data), threaded.predict(data))
+
+
+def test_unknown_init_is_rejected():
+    with pytest.raises(ValueError):
+        HyperionFuzzy(init="farthest")
\ No newline at end of file
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import count_evaluations, evaluation_counts
+
+
+def test_train_is_silent_and_collects_nothing_by_default(make_data, capsys):
+    data, labels = make_data(frame=True)
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2)
+    model.train(data, labels)
+
+    assert capsys.readouterr().out == ""
+    assert model.stats is None
+
+
+def test_train_reports_phases_and_counters_to_the_callback(make_data):
+    data, labels = make_data(frame=True)
+    received = []
+    np.random.seed(0)
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, instrument=received.append)
+    model.train(data, labels)
+
+    assert received == [model.stats]
+    stats = model.stats
+    assert set(stats["phases"]) >= {"transform", "init", "contribution", "optimize"}
+    assert stats["seconds"] >= sum(stats["phases"].values()) - 1e-6
+    assert stats["counters"]["fuzzy_passes"] == len(model.optimization_log)
+    assert stats["counters"]["optimizer_iterations"] == sum(r["optimizer_iterations"] for r in model.optimization_log)
+    # Caching G for every training row takes one evaluation per row and class, shared by its spheres
+    assert stats["counters"]["g_evaluations"] >= 2 * len(data)
+    assert stats["peak_rss_kib"] > 0
+
+
+def test_counting_is_off_outside_instrumented_fits(make_data):
+    data, labels = make_data(frame=True)
+    count_evaluations(False)
+    HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2).train(data, labels)
+    assert evaluation_counts() == {"g_evaluations": 0, "kernel_evaluations": 0, "pruned_kernels": 0}
\ No newline at end of file
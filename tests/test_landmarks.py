@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.landmarks import summarize, g_error
+from hyperion_fuzzy.wrappers import Hypersphere, element_matrix
+
+
+def test_summarize_preserves_the_class_mean():
+    data = np.random.default_rng(0).random((500, 3))
+    landmarks, counts = summarize(data, 20, seed=0)
+
+    assert landmarks.shape[0] <= 20
+    assert counts.sum() == data.shape[0]
+    np.testing.assert_allclose(np.average(landmarks, axis=0, weights=counts), data.mean(axis=0))
+
+    sphere = Hypersphere(np.zeros(3), 0.0, element_matrix(landmarks, counts))
+    np.testing.assert_allclose(sphere.get_ux(), data.mean(axis=0))
+
+
+def test_g_error_shrinks_with_more_landmarks():
+    data = np.random.default_rng(1).random((400, 2))
+    exact = element_matrix(data)
+
+    errors = []
+    for num_landmarks in (5, 100):
+        landmarks, counts = summarize(data, num_landmarks, seed=0)
+        errors.append(g_error(data[:50], exact, element_matrix(landmarks, counts), 1e-7)["mean_relative_error"])
+
+    assert errors[1] < errors[0]
+    assert g_error(data[:50], exact, exact, 1e-7)["max_relative_error"] == 0.0
\ No newline at end of file
@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.multiclass import OneVsRestHyperionFuzzy
+from hyperion_fuzzy.wrappers import predict
+
+
+def make_data(n=150, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = {"a": (0.0, 0.0), "b": (1.0, 0.0), "c": (0.0, 1.0)}
+    data = np.vstack([rng.normal(center, 0.3, (n, 2)) for center in centers.values()])
+    labels = np.repeat(list(centers), n)
+    order = rng.permutation(len(data))
+    return data[order], labels[order]
+
+
+def test_one_model_per_class_scored_in_one_pass():
+    data, labels = make_data()
+    model = OneVsRestHyperionFuzzy(random_state=0, num_clusters=2, sigma=0.5, max_iterations=2).fit(data, labels)
+
+    assert list(model.classes_) == ["a", "b", "c"]
+    assert len(model.models) == 3
+    scores = model.decision_function(data)
+    assert scores.shape == (len(data), 3)
+
+    transformed = model.models[0].transform(data)
+    for c, binary in enumerate(model.models):
+        binary_predictions = predict(transformed, binary.positive_hyperspheres, binary.negative_hyperspheres, binary.sigma)
+        np.testing.assert_array_equal(np.sign(scores[:, c]), binary_predictions)
+    np.testing.assert_array_equal(model.predict(data), model.classes_[scores.argmax(axis=1)])
+
+
+def test_process_pool_matches_serial_training():
+    data, labels = make_data()
+    params = dict(random_state=3, num_clusters=2, sigma=0.5, max_iterations=2)
+    serial = OneVsRestHyperionFuzzy(**params).fit(data, labels)
+    pooled = OneVsRestHyperionFuzzy(n_jobs=2, **params).fit(data, labels)
+
+    for a, b in zip(serial.models, pooled.models):
+        for hs_a, hs_b in zip(a.positive_hyperspheres + a.negative_hyperspheres,
+                              b.positive_hyperspheres + b.negative_hyperspheres):
+            np.testing.assert_array_equal(hs_a.get_center(), hs_b.get_center())
+            assert hs_a.get_radius() == hs_b.get_radius()
+    np.testing.assert_array_equal(serial.decision_function(data), pooled.decision_function(data, n_jobs=2))
+
+
+def test_process_pool_keeps_a_custom_transform():
+    data, labels = make_data()
+    params = dict(random_state=3, num_clusters=2, sigma=0.5, max_iterations=2, feature_transform=np.tanh)
+    serial = OneVsRestHyperionFuzzy(**params).fit(data, labels)
+    pooled = OneVsRestHyperionFuzzy(n_jobs=2, **params).fit(data, labels)
+
+    assert all(model.feature_transform is np.tanh for model in pooled.models)
+    np.testing.assert_array_equal(pooled.predict(data), serial.predict(data))
+
+
+def test_single_class_is_rejected():
+    data, _ = make_data()
+    with pytest.raises(ValueError):
+        OneVsRestHyperionFuzzy().fit(data, np.ones(len(data)))
\ No newline at end of file
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("optimize_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import Hypersphere, element_matrix, objective
+
+
+def assigned_spheres(num_other_points=30, dim=3, seed=0):
+    """A sphere with 30 weighted assignments against one holding `num_other_points` points of the other class."""
+    rng = np.random.default_rng(seed)
+    points = element_matrix(rng.normal(0.0, 1.0, (30 + num_other_points, dim)))
+    sphere = Hypersphere(rng.normal(0.0, 0.5, dim), 0.8, rng.random((10, dim)))
+    other = Hypersphere(rng.normal(0.0, 0.5, dim), 0.4, rng.random((10, dim)))
+    for hs in (sphere, other):
+        hs.set_assignment_source(points)
+    for i in range(30):
+        sphere.add_assignment(i, 1, rng.random())
+    for i in range(30, 30 + num_other_points):
+        other.add_assignment(i, -1, rng.random())
+    return sphere, other
+
+
+def test_analytic_gradient_matches_finite_differences():
+    sphere, other = assigned_spheres()
+    radius, center = sphere.get_radius(), sphere.get_center().copy()
+
+    # One analytic step with learning rate 1 moves the parameters by exactly minus the gradient
+    assert sphere.optimize([other], 1.0, 1.0, 1, 0.0, "analytic") == 1
+    gradient = np.r_[radius - sphere.get_radius(), center - sphere.get_center()]
+
+    def value(params):
+        sphere.set_radius(params[0])
+        sphere.set_center(params[1:])
+        return objective([sphere], [other], 1.0)
+
+    params = np.r_[radius, center]
+    step = 1e-6
+    numeric = np.array([(value(params + step * e) - value(params - step * e)) / (2 * step)
+                        for e in np.eye(len(params))])
+    np.testing.assert_allclose(gradient, numeric, rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("learning_rate", [0.25, 0.05])
+def test_analytic_and_approximate_reach_the_same_minimum(learning_rate):
+    # Against points of the other class the objective decreases without bound as the center moves
+    # away from them, so the modes are compared where the minimum exists: at radius 0
+    results = {}
+    for mode in ("analytic", "approximate"):
+        sphere, other = assigned_spheres(num_other_points=0)
+        center = sphere.get_center().copy()
+        iterations = sphere.optimize([other], 1.0, learning_rate, 500, 1e-14, mode)
+        assert 0 < iterations < 500
+        np.testing.assert_array_equal(sphere.get_center(), center)
+        results[mode] = objective([sphere], [other], 1.0)
+
+    sphere, _ = assigned_spheres(num_other_points=0)
+    minimum = sum(sphere.get_assignments()[2])
+    assert results["analytic"] == pytest.approx(minimum, abs=1e-9)
+    assert results["approximate"] == pytest.approx(minimum, abs=1e-9)
+
+
+@pytest.mark.parametrize("optimizer", ["analytic", "approximate"])
+def test_models_train_with_either_optimizer(make_data, optimizer):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, optimizer=optimizer, random_state=0)
+    model.train(data, labels)
+    assert sum(report["optimize_calls"] for report in model.optimization_log) > 0
+    assert set(model.predict(data)) <= {1, -1}
+
+
+def test_unknown_optimizer_is_rejected():
+    with pytest.raises(ValueError):
+        HyperionFuzzy(optimizer="newton")
\ No newline at end of file
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+
+
+@pytest.mark.parametrize("params", [{}, {"g_tolerance": 1e-3}, {"dtype": np.float32}, {"num_landmarks": 40}])
+def test_threaded_predictions_match_serial(make_data, params):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=2, random_state=0, **params)
+    model.train(data, labels)
+    new_data = np.random.default_rng(1).normal(0.5, 0.5, (500, 2))
+
+    expected = model.predict(new_data, n_jobs=1)
+    for n_jobs in (2, 3, -1):
+        np.testing.assert_array_equal(model.predict(new_data, n_jobs=n_jobs), expected)
+
+
+def test_concurrent_predicts_on_a_fresh_model(make_data, tmp_path):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=2, random_state=0)
+    model.train(data, labels)
+    path = tmp_path / "model.hfz"
+    model.save(path)
+    new_data = np.random.default_rng(1).normal(0.5, 0.5, (2000, 2))
+    expected = HyperionFuzzy.load(path).predict(new_data)
+
+    # A loaded model has not filled its center G, bound and element caches yet, so all four calls try to
+    # fill them at once; the cache mutex must make them agree
+    for _ in range(5):
+        fresh = HyperionFuzzy.load(path)
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda n_jobs: fresh.predict(new_data, n_jobs=n_jobs), [1, 2, 4, -1]))
+        for predictions in results:
+            np.testing.assert_array_equal(predictions, expected)
\ No newline at end of file
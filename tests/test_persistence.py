@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.transforms import Exp, Identity
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(0)
+    data = np.vstack([rng.normal(0.0, 0.3, (300, 2)), rng.normal(1.0, 0.3, (300, 2))])
+    labels = np.r_[np.ones(300), -np.ones(300)]
+    np.random.seed(0)
+    model = HyperionFuzzy(num_clusters=3, sigma=0.5, max_iterations=2, num_landmarks=50)
+    model.partial_fit(data, labels)
+    return model
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_load_restores_predictions(model, tmp_path, mmap):
+    path = tmp_path / "model.hfz"
+    model.save(path)
+    loaded = HyperionFuzzy.load(path, mmap=mmap)
+
+    assert loaded.num_landmarks == 50 and loaded.sigma == 0.5
+    for original, restored in zip(model.positive_hyperspheres + model.negative_hyperspheres,
+                                  loaded.positive_hyperspheres + loaded.negative_hyperspheres):
+        np.testing.assert_array_equal(restored.get_center(), original.get_center())
+        np.testing.assert_array_equal(restored.get_ux(), original.get_ux())
+        assert restored.get_radius() == original.get_radius()
+
+    new_data = pd.DataFrame(np.random.default_rng(1).normal(0.5, 0.5, (100, 2)))
+    np.testing.assert_array_equal(loaded.predict(new_data), model.predict(new_data))
+
+
+def test_mmap_load_shares_the_file_mapping(model, tmp_path):
+    path = tmp_path / "model.hfz"
+    model.save(path)
+    loaded = HyperionFuzzy.load(path, mmap=True)
+
+    elements = np.asarray(loaded.positive_hyperspheres[0].instance.get_initial_elements())
+    np.testing.assert_array_equal(elements, model.positive_hyperspheres[0].get_initial_elements())
+
+    # Rewriting the file in place shows through the native elements, so they were never copied
+    contents = path.read_bytes()
+    offset = contents.index(elements[0].tobytes())
+    with open(path, "r+b") as file:
+        file.seek(offset)
+        file.write(np.array([123.0]).tobytes())
+    assert np.asarray(loaded.positive_hyperspheres[1].instance.get_initial_elements())[0, 0] == 123.0
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "model.hfz"
+    path.write_bytes(b"not a model at all")
+    with pytest.raises(ValueError):
+        HyperionFuzzy.load(path)
+
+
+def test_load_after_update_keeps_the_element_index(make_data, tmp_path):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, g_tolerance=1e-3, random_state=0)
+    model.train(data[:200], labels[:200])
+    model.update(data[200:], labels[200:])
+    path = tmp_path / "model.hfz"
+    model.save(path)
+
+    loaded = HyperionFuzzy.load(path)
+    for original, restored in zip(model.positive_hyperspheres + model.negative_hyperspheres,
+                                  loaded.positive_hyperspheres + loaded.negative_hyperspheres):
+        np.testing.assert_array_equal(restored.get_ux(), original.get_ux())
+        assert restored.instance.get_index_tolerance() == 1e-3
+    np.testing.assert_array_equal(loaded.predict(data), model.predict(data))
+
+
+@pytest.mark.parametrize("random_state, stored", [
+    (np.random.default_rng(3), None),
+    (np.random.SeedSequence(7), 7),
+    (np.int64(5), 5),
+])
+def test_save_stores_random_state_as_a_plain_seed(make_data, tmp_path, random_state, stored):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, random_state=random_state)
+    model.train(data, labels)
+    path = tmp_path / "model.hfz"
+    model.save(path)
+
+    loaded = HyperionFuzzy.load(path)
+    assert loaded.random_state == stored
+    np.testing.assert_array_equal(loaded.predict(data), model.predict(data))
+
+@pytest.mark.parametrize("transform, stored", [(Identity(), "identity"), ("identity", "identity"), (Exp(), "exp")])
+def test_save_stores_built_in_transforms_by_name(make_data, tmp_path, transform, stored):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, feature_transform=transform, random_state=0)
+    model.train(data, labels)
+    path = tmp_path / "model.hfz"
+    model.save(path)
+
+    loaded = HyperionFuzzy.load(path)
+    assert loaded.feature_transform == stored
+    np.testing.assert_array_equal(loaded.predict(data), model.predict(data))
+
+
+def test_save_rejects_transforms_it_cannot_store(make_data, tmp_path):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, feature_transform=np.tanh, random_state=0)
+    model.train(data, labels)
+    with pytest.raises(ValueError):
+        model.save(tmp_path / "model.hfz")
\ No newline at end of file
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import (compute_kernel, count_evaluations, element_matrix, evaluation_counts,
+                                     fuzzy_contribution, predict)
+
+
+def trained_model(num_clusters=8, sigma=0.2, seed=0, **params):
+    rng = np.random.default_rng(seed)
+    data = np.vstack([rng.normal(-0.5, 0.5, (300, 3)), rng.normal(0.5, 0.5, (300, 3))])
+    labels = np.r_[np.ones(300), -np.ones(300)]
+    order = rng.permutation(len(data))
+    np.random.seed(seed)
+    model = HyperionFuzzy(num_clusters=num_clusters, sigma=sigma, max_iterations=1, **params)
+    model.train(data[order], labels[order])
+    return model, np.exp(data[order])
+
+
+def nearest(kernels):
+    return kernels.min(axis=0), kernels.argmin(axis=0)
+
+
+@pytest.mark.parametrize("params", [{}, {"g_tolerance": 1e-6}, {"dtype": np.float32}])
+def test_pruned_predict_matches_every_kernel(params):
+    model, transformed = trained_model(**params)
+    transformed = transformed.astype(model.dtype)
+    positive = np.array([compute_kernel(transformed, hs, model.sigma, 0.0) for hs in model.positive_hyperspheres])
+    negative = np.array([compute_kernel(transformed, hs, model.sigma, 0.0) for hs in model.negative_hyperspheres])
+    expected = np.sign(negative.min(axis=0) - positive.min(axis=0))
+
+    count_evaluations(True)
+    try:
+        predictions = predict(transformed, model.positive_hyperspheres, model.negative_hyperspheres, model.sigma)
+        counts = evaluation_counts()
+    finally:
+        count_evaluations(False)
+
+    np.testing.assert_array_equal(predictions, expected)
+    spheres = len(model.positive_hyperspheres) + len(model.negative_hyperspheres)
+    assert counts["kernel_evaluations"] + counts["pruned_kernels"] == spheres * len(transformed)
+    if model.dtype == np.float64:
+        assert counts["pruned_kernels"] > 0
+
+
+def test_pruned_fuzzy_contribution_picks_the_nearest_spheres():
+    model, transformed = trained_model()
+    E = model.E
+    positive = np.array([compute_kernel(transformed, hs, model.sigma, E) for hs in model.positive_hyperspheres])
+    negative = np.array([compute_kernel(transformed, hs, model.sigma, E) for hs in model.negative_hyperspheres])
+    min_positive, nearest_positive = nearest(positive)
+    min_negative, nearest_negative = nearest(negative)
+
+    source = element_matrix(transformed)
+    for hs in model.positive_hyperspheres + model.negative_hyperspheres:
+        hs.set_assignment_source(source)
+        hs.clear_assignments()
+
+    count_evaluations(True)
+    try:
+        classes = [fuzzy_contribution(x, i, model.positive_hyperspheres, model.negative_hyperspheres,
+                                      model.gamma, model.sigma, E)[0] for i, x in enumerate(transformed)]
+        counts = evaluation_counts()
+    finally:
+        count_evaluations(False)
+
+    np.testing.assert_array_equal(classes, np.sign(min_negative - min_positive))
+    for side, spheres, chosen in ((1, model.positive_hyperspheres, nearest_positive),
+                                  (-1, model.negative_hyperspheres, nearest_negative)):
+        for j, hs in enumerate(spheres):
+            expected = np.flatnonzero((np.asarray(classes) == side) & (chosen == j))
+            np.testing.assert_array_equal(np.sort(hs.instance.get_assignment_indices()), expected)
+    assert counts["pruned_kernels"] > 0
\ No newline at end of file
@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import element_matrix
+
+
+def assigned_so_far(model):
+    return sum(hs.num_assignments for hs in model.positive_hyperspheres + model.negative_hyperspheres)
+
+
+def spheres_with_assignments(model):
+    return sum(1 for hs in model.positive_hyperspheres + model.negative_hyperspheres if hs.num_assignments)
+
+
+def test_batch_schedule_optimizes_every_batch_of_samples(make_data, monkeypatch):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, optimize_schedule="batch",
+                          optimize_batch_size=64, random_state=0)
+    optimized_after = []
+    optimize = HyperionFuzzy._optimize_hyperspheres
+
+    def record(self, report):
+        optimized_after.append(assigned_so_far(self))
+        optimize(self, report)
+
+    monkeypatch.setattr(HyperionFuzzy, "_optimize_hyperspheres", record)
+    model.train(data, labels)
+
+    assert optimized_after == [*range(64, 400, 64), 400]
+    report = model.optimization_log[-1]
+    assert report["schedule"] == "batch" and report["blocks"] == 7
+    assert report["optimize_calls"] >= 7
+
+
+def test_batch_schedule_keeps_every_block_of_a_plain_array(make_data):
+    data, labels = make_data()
+    params = dict(num_clusters=2, sigma=0.5, max_iterations=1, optimize_schedule="batch", optimize_batch_size=64,
+                  random_state=0)
+    plain, wrapped = HyperionFuzzy(**params), HyperionFuzzy(**params)
+    plain.train(data, labels)
+    wrapped.train(data, labels)
+
+    transformed = plain.transform(data)
+    assigned, contributions = plain.fuzzy(transformed)
+    expected_assigned, expected_contributions = wrapped.fuzzy(element_matrix(transformed))
+    assert assigned_so_far(plain) == assigned_so_far(wrapped) == 400
+    np.testing.assert_array_equal(assigned, expected_assigned)
+    np.testing.assert_array_equal(contributions, expected_contributions)
+
+
+def test_epoch_schedule_optimizes_once_per_pass(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data, labels)
+    report = model.optimization_log[-1]
+    assert report["blocks"] == 1 and report["skipped_spheres"] == 0
+    assert report["optimize_calls"] == spheres_with_assignments(model)
+
+
+def test_threshold_schedule_skips_spheres_whose_assignments_barely_moved(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, optimize_schedule="threshold",
+                          optimize_threshold=10.0, random_state=0)
+    model.train(data, labels)
+    first = model.optimization_log[-1]
+    assert first["optimize_calls"] == spheres_with_assignments(model) and first["skipped_spheres"] == 0
+
+    # Counts that moved by at most 10 times their last optimized value are skipped
+    model.fuzzy(element_matrix(model.transform(data)))
+    again = model.optimization_log[-1]
+    assert again["optimize_calls"] == 0
+    assert again["skipped_spheres"] == spheres_with_assignments(model)
+
+    # A quarter of the rows moves every count by far more than 5%
+    model.optimize_threshold = 0.05
+    model.fuzzy(element_matrix(model.transform(data[:100])))
+    quarter = model.optimization_log[-1]
+    assert quarter["skipped_spheres"] == 0
+    assert quarter["optimize_calls"] == spheres_with_assignments(model)
+
+
+@pytest.mark.parametrize("params", [
+    {"optimize_schedule": "sometimes"},
+    {"optimize_schedule": "batch", "optimize_batch_size": 0},
+    {"optimize_schedule": "threshold", "optimize_threshold": -0.1},
+])
+def test_invalid_schedules_are_rejected(make_data, params):
+    with pytest.raises(ValueError):
+        HyperionFuzzy(**params)
+
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data, labels)
+    for name, value in params.items():
+        setattr(model, name, value)
+    with pytest.raises(ValueError):
+        model.fuzzy(element_matrix(model.transform(data)))
\ No newline at end of file
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.search import HyperparameterSearch
+from hyperion_fuzzy.wrappers import Hypersphere, compute_g, element_matrix, g_tables
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_g_tables_match_g_for_every_E(weighted):
+    rng = np.random.default_rng(0)
+    elements = rng.random((60, 3))
+    hs = Hypersphere(rng.random(3), 0.5, element_matrix(elements, rng.random(60) + 0.5 if weighted else None))
+    data = rng.random((50, 3))
+    Es = [1e-7, 0.01, 1.0]
+    tables = g_tables(data, hs, Es, n_jobs=2)
+    assert tables.shape == (3, 50)
+    for table, E in zip(tables, Es):
+        np.testing.assert_array_equal(table, compute_g(data, hs, E))
+
+
+@pytest.mark.parametrize("extra", [{}, {"g_tolerance": 1e-3}])
+def test_grid_points_match_separate_training(make_data, centers, extra):
+    data, labels = make_data()
+    params = dict(num_clusters=2, max_iterations=3, init="k-means++", **extra)
+    grid = {"sigma": [0.3, 0.5], "E": [1e-7, 0.1], "gamma": [1.0, 2.0]}
+    search = HyperparameterSearch(grid, n_jobs=2, early_stopping=False, random_state=4, **params)
+    search.fit(data, labels)
+
+    assert len(search.results_) == 8
+    for result in search.results_:
+        model = HyperionFuzzy(random_state=4, **params, **result["params"])
+        model.train(data, labels)
+        assert result["passes"] == len(model.optimization_log)
+        assert result["score"] == np.mean(model.predict(data) == labels)
+    best = HyperionFuzzy(random_state=4, **params, **search.best_params_)
+    best.train(data, labels)
+    np.testing.assert_array_equal(centers(search.best_model_), centers(best))
+    assert search.best_score_ == max(result["score"] for result in search.results_)
+
+
+def test_early_stopping_drops_the_worst_points_after_each_pass(make_data):
+    data, labels = make_data()
+    validation, validation_labels = make_data(seed=1)
+    grid = {"sigma": [0.05, 0.1, 0.3, 0.5], "gamma": [0.5, 1.0]}
+    search = HyperparameterSearch(grid, random_state=0, num_clusters=2, max_iterations=3)
+    search.fit(data, labels, validation, validation_labels)
+
+    stopped = [result for result in search.results_ if result["stopped_early"]]
+    assert stopped and all(result["passes"] < 3 for result in stopped)
+    assert sum(result["passes"] for result in search.results_) < 3 * len(search.results_)
+    assert not any(result["stopped_early"] for result in search.results_ if result["params"] == search.best_params_)
+    assert search.best_score_ == np.mean(search.best_model_.predict(validation) == validation_labels)
+
+
+def test_only_parameters_sharing_the_initialization_can_be_searched():
+    with pytest.raises(ValueError):
+        HyperparameterSearch({"num_clusters": [2, 3]})
\ No newline at end of file
@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.serving import PredictionServer
+
+
+@pytest.fixture
+def trained(make_data):
+    data, labels = make_data(200)
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, random_state=0)
+    model.train(data, labels)
+    return model, data
+
+
+def test_concurrent_requests_are_batched(trained):
+    model, data = trained
+    expected = model.predict(data)
+
+    async def run():
+        async with PredictionServer(model, max_batch_size=32, max_latency=0.05) as server:
+            predictions = await asyncio.gather(*(server.predict(row) for row in data))
+            with pytest.raises(ValueError):
+                await server.predict(data[0, :1])
+            return predictions, server.metrics()
+
+    predictions, metrics = asyncio.run(run())
+    np.testing.assert_array_equal(predictions, expected)
+    assert metrics["requests"] == len(data)
+    assert metrics["batches"] < len(data)
+    assert metrics["max_batch_size"] == 32
+    assert metrics["mean_batch_size"] == len(data) / metrics["batches"]
+    assert metrics["max_queue_depth"] == len(data)
+    assert metrics["queue_depth"] == 0
+
+
+def test_pipelined_socket_requests_get_their_own_answers(trained):
+    model, data = trained
+    expected = model.predict(data[:50])
+
+    async def run():
+        async with PredictionServer(model, max_batch_size=16, max_latency=0.05) as server:
+            host, port = await server.listen()
+            reader, writer = await asyncio.open_connection(host, port)
+            lines = [{"id": i, "row": row.tolist()} for i, row in enumerate(data[:50])]
+            lines.insert(10, {"id": "bad", "row": [1.0]})
+            writer.write(b"".join(json.dumps(line).encode() + b"\n" for line in lines) + b"not json\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(len(lines) + 1)]
+
+            writer.write(json.dumps({"id": "metrics", "metrics": True}).encode() + b"\n")
+            writer.write_eof()
+            metrics = json.loads(await reader.readline())
+            assert await reader.readline() == b""
+            writer.close()
+            return responses, metrics
+
+    responses, metrics = asyncio.run(run())
+    predictions = {r["id"]: r["prediction"] for r in responses if "prediction" in r}
+    assert [predictions[i] for i in range(50)] == expected.tolist()
+    errors = {r["id"]: r["error"] for r in responses if "error" in r}
+    assert set(errors) == {"bad", None}
+    assert errors["bad"].startswith("ValueError")
+
+    assert metrics["id"] == "metrics"
+    assert metrics["metrics"]["requests"] == 50
+    assert 1 < metrics["metrics"]["batches"] < 50
+    assert metrics["metrics"]["max_batch_size"] <= 16
\ No newline at end of file
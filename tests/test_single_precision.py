@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.wrappers import Hypersphere, compute_g, element_index, element_matrix
+
+
+def test_single_precision_g_matches_double():
+    rng = np.random.default_rng(0)
+    elements = np.exp(rng.normal(0.0, 0.5, (2000, 3)))
+    queries = np.exp(rng.normal(0.0, 0.5, (50, 3)))
+    double = element_matrix(elements)
+    single = element_matrix(elements, dtype=np.float32)
+
+    assert single.single_precision and not double.single_precision
+    assert np.asarray(single).dtype == np.float32
+
+    expected = compute_g(queries, Hypersphere(np.zeros(3), 1.0, double), 1e-7)
+    np.testing.assert_allclose(compute_g(queries, Hypersphere(np.zeros(3), 1.0, single), 1e-7), expected, rtol=1e-5)
+
+    indexed = Hypersphere(np.zeros(3), 1.0, single)
+    indexed.set_element_index(element_index(single), 1e-9)
+    np.testing.assert_allclose(compute_g(queries, indexed, 1e-7), expected, rtol=1e-5)
+
+
+def test_float32_model_agrees_with_float64(tmp_path):
+    rng = np.random.default_rng(1)
+    data = np.vstack([rng.normal(0.0, 0.5, (300, 2)), rng.normal(0.7, 0.5, (300, 2))])
+    labels = np.r_[np.ones(300), -np.ones(300)]
+
+    models = []
+    for dtype in (np.float64, np.float32):
+        np.random.seed(0)
+        model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, dtype=dtype)
+        model.train(data, labels)
+        models.append(model)
+
+    for double, single in zip(models[0].positive_hyperspheres, models[1].positive_hyperspheres):
+        np.testing.assert_allclose(single.get_center(), double.get_center(), atol=1e-4)
+    assert np.mean(models[0].predict(data) == models[1].predict(data)) > 0.99
+
+    models[1].save(tmp_path / "model.hfz")
+    loaded = HyperionFuzzy.load(tmp_path / "model.hfz", mmap=True)
+    assert loaded.dtype == np.float32
+    assert np.asarray(loaded.positive_hyperspheres[0].instance.get_initial_elements()).dtype == np.float32
+    np.testing.assert_array_equal(loaded.predict(data), models[1].predict(data))
+
+
+def test_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        HyperionFuzzy(dtype=np.float16)
\ No newline at end of file
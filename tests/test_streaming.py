@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.streaming import iter_chunks
+
+
+def test_iter_chunks_reads_npy_and_csv(make_data, tmp_path):
+    data, labels = make_data(1200)
+    np.save(tmp_path / "data.npy", np.c_[data, labels])
+    pd.DataFrame(np.c_[data, labels], columns=["a", "b", "label"]).to_csv(tmp_path / "data.csv", index=False)
+
+    for source in (tmp_path / "data.npy", str(tmp_path / "data.csv")):
+        chunks = list(iter_chunks(source, chunk_size=500))
+        assert [chunk.shape[0] for chunk, _ in chunks] == [500, 500, 200]
+        np.testing.assert_allclose(np.vstack([chunk for chunk, _ in chunks]), data)
+        np.testing.assert_array_equal(np.concatenate([chunk_labels for _, chunk_labels in chunks]), labels)
+
+
+def test_fit_stream_keeps_a_bounded_summary_with_the_running_mean(make_data, tmp_path):
+    data, labels = make_data(1200)
+    np.save(tmp_path / "data.npy", np.c_[data, labels])
+
+    np.random.seed(0)
+    model = HyperionFuzzy(num_clusters=2, max_iterations=2, num_landmarks=40)
+    model.fit_stream(tmp_path / "data.npy", chunk_size=300)
+
+    assert len(model.optimization_log) == 4
+    for hyperspheres, label in ((model.positive_hyperspheres, 1), (model.negative_hyperspheres, -1)):
+        assert hyperspheres[0].instance.get_initial_elements().rows <= 40
+        np.testing.assert_allclose(hyperspheres[0].get_ux(), np.exp(data[labels == label]).mean(axis=0))
\ No newline at end of file
@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+from hyperion_fuzzy.transforms import Exp, Transform, get_transform, transform_rows
+
+
+class CountingExp(Exp):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, values, out=None):
+        self.calls += 1
+        return super().__call__(values, out)
+
+
+def test_chunked_frame_and_in_place_transforms_match_exp(make_data):
+    data, _ = make_data()
+    expected = np.exp(data)
+    np.testing.assert_array_equal(transform_rows(Exp(), data), expected)
+    np.testing.assert_array_equal(transform_rows(Exp(), pd.DataFrame(data), chunk_rows=64), expected)
+    np.testing.assert_array_equal(transform_rows(Exp(), data, np.float32, chunk_rows=7),
+                                  np.exp(data.astype(np.float32)))
+
+    in_place = data.copy()
+    assert transform_rows(Exp(), in_place, out=in_place) is in_place
+    np.testing.assert_array_equal(in_place, expected)
+    with pytest.raises(ValueError):
+        transform_rows(Exp(), data, out=np.empty((1, 2)))
+
+
+def test_callables_names_and_overridden_mapping_are_transforms(make_data):
+    data, _ = make_data()
+    np.testing.assert_array_equal(get_transform(np.sqrt)(np.abs(data)), np.sqrt(np.abs(data)))
+    np.testing.assert_array_equal(HyperionFuzzy(feature_transform="identity").transform(data), data)
+    with pytest.raises(ValueError):
+        HyperionFuzzy(feature_transform="log")
+
+    class Unfinished(Transform):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished()
+
+    class Squared(HyperionFuzzy):
+        def polynomial_mapping(self, x):
+            return x * x
+
+    np.testing.assert_array_equal(Squared().transform(pd.DataFrame(data)), data * data)
+
+
+def test_refits_on_the_same_data_reuse_the_transformed_matrix(make_data):
+    data, labels = make_data()
+    transform = CountingExp()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, feature_transform=transform, random_state=0)
+    model.train(data, labels)
+    first = model.predict(data)
+    # One transform for training and one for predict
+    assert transform.calls == 2
+
+    model.sigma = 0.3
+    model.train(data, labels)
+    model.sigma = 0.5
+    model.train(data, labels)
+    assert transform.calls == 2
+    np.testing.assert_array_equal(model.predict(data), first)
+
+    model.clear_transform_cache()
+    model.train(data, labels)
+    assert transform.calls == 4
\ No newline at end of file
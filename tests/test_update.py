@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hypersphere_module")
+pytest.importorskip("fuzzy_module")
+
+from hyperion_fuzzy.HyperionFuzzy import HyperionFuzzy
+
+
+def test_update_appends_rows_and_keeps_ux_the_running_mean(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, random_state=0)
+    model.train(data[:200], labels[:200])
+
+    model.update(data[200:300], labels[200:300])
+    model.update(data[300:], labels[300:])
+    transformed = model.transform(data)
+    for hyperspheres, label in ((model.positive_hyperspheres, 1), (model.negative_hyperspheres, -1)):
+        class_rows = transformed[labels == label]
+        elements = hyperspheres[0].get_initial_elements()
+        assert elements.shape == class_rows.shape
+        np.testing.assert_allclose(hyperspheres[0].get_ux(), class_rows.mean(axis=0))
+    assert set(model.predict(data)) <= {1, -1}
+
+
+def test_update_starts_from_the_current_model_and_leaves_other_classes_alone(make_data, centers):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=2, g_tolerance=1e-3, random_state=0)
+    model.train(data[:200], labels[:200])
+    model.max_iterations = 0
+    before = centers(model)
+    negative_elements = model.negative_hyperspheres[0].get_initial_elements()
+
+    positive = labels[200:] == 1
+    model.update(data[200:][positive], labels[200:][positive])
+    # No passes, so the spheres keep the centers they had
+    np.testing.assert_array_equal(centers(model), before)
+    np.testing.assert_array_equal(model.negative_hyperspheres[0].get_initial_elements(), negative_elements)
+    assert model.positive_hyperspheres[0].get_initial_elements().shape[0] == (labels == 1).sum()
+
+
+def test_appends_reuse_the_element_buffer(make_data):
+    data, labels = make_data()
+    model = HyperionFuzzy(num_clusters=2, sigma=0.5, max_iterations=1, random_state=0)
+    model.train(data[:200], labels[:200])
+    model.update(data[200:220], labels[200:220])
+    buffer = model._element_buffers["positive"]
+    model.update(data[220:240], labels[220:240])
+    assert model._element_buffers["positive"] is buffer
+    assert np.shares_memory(model.positive_hyperspheres[0].get_initial_elements(), buffer)
+
+
+def test_update_needs_a_trained_model(make_data):
+    data, labels = make_data()
+    with pytest.raises(ValueError):
+        HyperionFuzzy().update(data, labels)
\ No newline at end of file